@@ -1,7 +1,22 @@
 # -*- coding: utf-8 -*-
-"""Main module that sets up and starts the game."""
-
+"""Main module that sets up and starts the game.
+
+Pass --profile SECONDS to record a profiling capture (see profiling.py)
+of the first SECONDS seconds in the overworld, and --record FILE or
+--replay FILE to record or replay a session's input (see replay.py).
+Pass --trace CATEGORIES to pick the trace log categories to record (see
+tracelog.py), and --asset-workers N to set the number of threads that decode
+assets (see assetloader.py). Pass --build-all to build every tile, object,
+item, spell and map at startup rather than on first use, and
+--exit-after-start to quit once the first frame is shown (see the startup
+benchmark in benchmark.py).
+"""
+
+import argparse
+import logging
 import pygame
+import assetloader
+import compositor
 import display
 import equipmentslot
 import game
@@ -10,34 +25,134 @@ import language
 import interaction
 import items
 import mapdata
+import profiling
+import replay
 import resources
 import spells
 import tile
 import timekeeper
+import tracelog
 import viewingdata
 import interactiveobj
 
-def setup():
-    """Initializes game parts."""
+# Class methods that build every entry of a registry up front. Otherwise
+# each registry builds an entry the first time it is asked for.
+REGISTRY_BUILDERS = [
+    display.Display.init_fonts,
+    tile.Tile.build_tiles,
+    interactiveobj.InteractiveObject.build_misc_objects,
+    resources.Resource.build_resources,
+    equipmentslot.EquipmentSlot.build_equipment_slots,
+    items.Item.build_standard_items,
+    spells.Spell.build_spells,
+    gamemap.Map.build_maps,
+]
+
+def setup(build_all=False):
+    """Initializes game parts.
+
+    Fonts, tiles, interactive objects, equipment slots, items, spells and
+    maps are built the first time they are asked for.
+
+    Args:
+        build_all: if True, builds every entry of those registries now
+            instead, so that bad game data is reported at startup.
+    """
 
     interaction.Interaction.init_interactions()
-    display.Display.init_fonts()
     display.Display.init_background_patterns()
-    tile.Tile.build_tiles()
-    interactiveobj.InteractiveObject.build_misc_objects()
-    resources.Resource.build_resources()
-    equipmentslot.EquipmentSlot.build_equipment_slots()
-    items.Item.build_standard_items()
-    spells.Spell.build_spells()
 
     # Load characters. # TODO
 
-    gamemap.Map.build_maps()
+    if build_all:
+        for builder in REGISTRY_BUILDERS:
+            builder()
 
-def main():
+def main(argv=None):
     """Sets up and runs the game."""
 
+    parser = argparse.ArgumentParser(description="Runs the game.")
+    parser.add_argument(
+        '--profile',
+        type=float,
+        metavar='SECONDS',
+        help='record a profiling capture of the first SECONDS seconds '
+            'in the overworld',
+    )
+    parser.add_argument(
+        '--profile-output',
+        metavar='PREFIX',
+        help='file path prefix for the profiling capture files',
+    )
+    parser.add_argument(
+        '--record',
+        metavar='FILE',
+        help='record the input for this session to a replay file',
+    )
+    parser.add_argument(
+        '--replay',
+        metavar='FILE',
+        help='replay the input from a replay file',
+    )
+    parser.add_argument(
+        '--exit-after-replay',
+        action='store_true',
+        help='quit once the replay is over instead of carrying on live',
+    )
+    parser.add_argument(
+        '--trace',
+        metavar='CATEGORIES',
+        help='comma-separated trace log categories to record, or all or '
+            'none (default: {0})'.format(', '.join(
+                name for category, name in sorted(tracelog.CATEGORY_NAMES.items())
+                if category & tracelog.DEFAULT_TRACE_CATEGORIES
+            )),
+    )
+    parser.add_argument(
+        '--asset-workers',
+        type=int,
+        metavar='N',
+        help='number of threads that decode assets, or 0 to decode them '
+            'all on the main thread (default: one per CPU, up to {0})'.format(
+                assetloader.DEFAULT_MAX_WORKERS
+            ),
+    )
+    parser.add_argument(
+        '--build-all',
+        action='store_true',
+        help='build every tile, object, item, spell and map at startup '
+            'instead of on first use',
+    )
+    parser.add_argument(
+        '--exit-after-start',
+        action='store_true',
+        help='quit once the first frame is shown',
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.trace is not None:
+        try:
+            tracelog.TraceLog.set_categories(
+                tracelog.parse_categories(args.trace)
+            )
+        except ValueError as err:
+            parser.error(str(err))
+
+    tracelog.TraceLog.install_crash_dump()
+
     timekeeper.Timekeeper.init_clock()
+    compositor.Compositor.init_compositor()
+
+    # Start before anything draws from the random module.
+    if args.replay:
+        replay.Replay.start_replay(
+            args.replay,
+            exit_at_end=args.exit_after_replay,
+        )
+    elif args.record:
+        replay.Replay.start_recording(args.record)
 
     game_name = game.GAME_TITLE
     game_surface = pygame.display.set_mode(
@@ -49,7 +164,14 @@ def main():
 
     pygame.display.set_caption(game_name)
 
-    setup()
+    start_map_id = mapdata.R0_A0_ID
+
+    # Decode the start map's assets first, and the rest behind them.
+    if args.asset_workers != 0:
+        assetloader.AssetLoader.start(num_workers=args.asset_workers)
+        assetloader.AssetLoader.request_startup_assets(start_map_id)
+
+    setup(build_all=args.build_all)
 
     game_obj = game.Game(game_surface, game_language=language.LANG_ESPANOL)
 
@@ -59,11 +181,21 @@ def main():
 
     # Set map and blit.
     game_obj.set_and_blit_game_map(
-        mapdata.R0_A0_ID,
+        start_map_id,
         protag_tile_loc
     )
 
-    pygame.display.update()
+    compositor.Compositor.present()
+
+    if args.exit_after_start:
+        assetloader.AssetLoader.stop()
+        return
+
+    if args.profile:
+        profiling.Profiler.start_capture(
+            duration_s=args.profile,
+            output_prefix=args.profile_output,
+        )
 
     # Start looping overworld.
     game_obj.handle_overworld_loop()
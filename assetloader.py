@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""This module contains the AssetLoader class for decoding assets on worker
+threads.
+
+AssetLoader runs a pool of worker threads that read and decode image files
+and open TTF fonts. Requests go on a priority queue, so the assets needed
+first are decoded first. Converting an image for the display has to happen
+on the main thread, so decoded images wait there until
+imageloader.ImageLoader asks for them or until poll converts a few of them
+after a clock tick.
+
+At startup, adventure.py queues the start map's tiles and objects, the
+protagonist's sprites and the fonts ahead of everything else. Whenever the
+protagonist enters a map, the assets of its adjacent maps are queued to
+stream in while playing.
+"""
+
+import collections
+import hashlib
+import io
+import logging
+import os
+import queue
+import threading
+import time
+import pygame
+import fontinfo
+import imageloader
+import mapdata
+import objdata
+import tiledata
+import timekeeper
+
+### PRIORITIES ###
+# Lower values are decoded first.
+PRIORITY_START = 0x1
+PRIORITY_STARTUP = 0x2
+PRIORITY_STREAM = 0x3
+PRIORITY_STOP = 0x100
+
+### ASSET TYPES ###
+ASSET_IMAGE = 0x1
+ASSET_FONT = 0x2
+
+### JOB STATES ###
+JOB_QUEUED = 0x1
+JOB_RUNNING = 0x2
+JOB_DONE = 0x3
+
+# Most worker threads to start.
+DEFAULT_MAX_WORKERS = 4
+
+# Most milliseconds poll spends converting decoded images per call.
+POLL_BUDGET_MS = 2
+
+def get_object_image_paths(object_id):
+    """Returns a set of the image paths of an interactive object, and of
+    the object it is replaced with, if any."""
+
+    ret_paths = set()
+    seen_ids = set()
+
+    while (object_id is not None) and (object_id not in seen_ids):
+        seen_ids.add(object_id)
+
+        object_data = objdata.MISC_OBJECT_DATA.get(
+            object_id,
+            objdata.RESOURCE_DATA.get(object_id, None),
+        )
+
+        if not object_data:
+            break
+
+        ret_paths.update(get_image_info_paths(
+            object_data.get(objdata.IMAGE_INFO_DICT_FIELD, {})
+        ))
+
+        object_id = object_data.get(objdata.REPLACEMENT_OBJECT_ID_FIELD, None)
+
+    return ret_paths
+
+def get_image_info_paths(image_info_dict):
+    """Returns a set of the image paths in an image info dict that maps
+    image sequence IDs to image paths or [image path list, duration]
+    lists."""
+
+    ret_paths = set()
+
+    for image_sequence_info in image_info_dict.values():
+        if isinstance(image_sequence_info, str):
+            ret_paths.add(image_sequence_info)
+        elif isinstance(image_sequence_info, list):
+            ret_paths.update(image_sequence_info[0])
+
+    return ret_paths
+
+def get_map_image_paths(map_id):
+    """Returns a set of the image paths of the tiles and initial interactive
+    objects of a map in mapdata.MAP_DATA."""
+
+    ret_paths = set()
+    map_data = mapdata.MAP_DATA.get(map_id, None)
+
+    if map_data:
+        legend = map_data.get(mapdata.MAP_TILE_GRID_KEY_FIELD, {})
+        used_chars = set(''.join(
+            map_data.get(mapdata.MAP_TILE_GRID_FIELD, [])
+        ))
+
+        for tile_char in used_chars:
+            tile_data = tiledata.TILE_DATA.get(legend.get(tile_char, None), {})
+            ret_paths.update(
+                tile_data.get(tiledata.TILE_IMAGE_PATHS_FIELD, None) or []
+            )
+
+        for object_id in set(
+                map_data.get(mapdata.MAP_INTER_OBJ_DICT_FIELD, {}).values()
+            ):
+            ret_paths.update(get_object_image_paths(object_id))
+
+    return ret_paths
+
+class AssetLoader(object):
+    """Decodes images and fonts on a pool of worker threads.
+
+    The user should not generate AssetLoader objects, as the class
+    is primarily for class methods related to loading assets.
+    """
+
+    # Worker threads, and the queue of (priority, sequence number,
+    # asset key) tuples they take requests from. Asset keys are
+    # (ASSET_IMAGE, path) or (ASSET_FONT, path, size) tuples.
+    _workers = []
+    _request_queue = None
+
+    # Sequence number for the next request, so that requests with the
+    # same priority are decoded in the order they were made.
+    _next_sequence_number = 0
+
+    # Maps asset keys to [JOB state, result, threading.Event] lists for
+    # requested assets that have not been taken yet. Results are
+    # (content hash, Surface) tuples for images and Font objects for fonts,
+    # or None if decoding failed. Guarded by _lock.
+    _jobs = {}
+    _lock = threading.Lock()
+
+    # Keys of decoded images for poll to convert, oldest first.
+    _decoded_image_keys = collections.deque()
+
+    @classmethod
+    def start(cls, num_workers=None):
+        """Starts the worker threads and has imageloader.ImageLoader and
+        the font setup take their decoded assets from them.
+
+        Args:
+            cls: class object.
+            num_workers: number of worker threads. Defaults to the number
+                of CPUs, up to DEFAULT_MAX_WORKERS.
+        """
+
+        if cls._workers:
+            return
+
+        if num_workers is None:
+            num_workers = min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+
+        cls._request_queue = queue.PriorityQueue()
+
+        for i in range(num_workers):
+            worker = threading.Thread(
+                target=cls._run_worker,
+                name="AssetLoader-{0}".format(i),
+                daemon=True,
+            )
+            worker.start()
+            cls._workers.append(worker)
+
+        imageloader.ImageLoader.set_decoded_image_source(cls.take_image)
+        timekeeper.Timekeeper.add_post_tick_callback(cls.poll)
+
+        LOGGER.info("Started asset loader with %d workers", num_workers)
+
+    @classmethod
+    def stop(cls):
+        """Stops the worker threads once they finish their current assets.
+
+        Assets that were requested but not decoded yet are dropped.
+        """
+
+        if not cls._workers:
+            return
+
+        imageloader.ImageLoader.set_decoded_image_source(None)
+
+        with cls._lock:
+            cls._jobs = {}
+        cls._decoded_image_keys.clear()
+
+        for worker in cls._workers:
+            cls._request_queue.put((PRIORITY_STOP, 0, None))
+
+        for worker in cls._workers:
+            worker.join()
+
+        cls._workers = []
+        cls._request_queue = None
+
+    @classmethod
+    def is_running(cls):
+        """Returns True if the worker threads are running."""
+
+        return bool(cls._workers)
+
+    @classmethod
+    def _request(cls, asset_key, priority):
+        """Queues an asset to decode, unless it is already requested."""
+
+        if not cls._workers:
+            return
+
+        with cls._lock:
+            if asset_key in cls._jobs:
+                return
+
+            cls._jobs[asset_key] = [JOB_QUEUED, None, threading.Event()]
+            sequence_number = cls._next_sequence_number
+            cls._next_sequence_number = cls._next_sequence_number + 1
+
+        cls._request_queue.put((priority, sequence_number, asset_key))
+
+    @classmethod
+    def request_images(cls, image_paths, priority=PRIORITY_STREAM):
+        """Queues the files for images to decode, skipping images that are
+        already loaded. Images in the atlas queue their atlas sheet.
+
+        Args:
+            cls: class object.
+            image_paths: iterable of image paths, as given in imagepaths.
+            priority: PRIORITY value for the requests.
+        """
+
+        for source_path in imageloader.ImageLoader.get_source_paths(
+                image_paths
+            ):
+            cls._request((ASSET_IMAGE, source_path), priority)
+
+    @classmethod
+    def request_font(cls, font_path, font_size, priority=PRIORITY_START):
+        """Queues a font to open."""
+
+        cls._request((ASSET_FONT, font_path, font_size), priority)
+
+    @classmethod
+    def request_map(cls, map_id, priority=PRIORITY_STREAM):
+        """Queues the images for a map's tiles and initial interactive
+        objects."""
+
+        cls.request_images(sorted(get_map_image_paths(map_id)), priority)
+
+    @classmethod
+    def request_adjacent_maps(cls, map_obj, priority=PRIORITY_STREAM):
+        """Queues the images for the maps adjacent to a map, so that they
+        stream in before the protagonist gets there."""
+
+        if cls._workers and map_obj:
+            for adj_map_info in map_obj.adj_map_dict.values():
+                cls.request_map(adj_map_info[0], priority)
+
+    @classmethod
+    def request_startup_assets(cls, start_map_id):
+        """Queues the assets that starting the game loads: the fonts, the
+        start map and the protagonist first, then every other tile and
+        interactive object, ready for when they are first built.
+
+        Args:
+            cls: class object.
+            start_map_id: ID of the map the game starts on.
+        """
+
+        if not cls._workers:
+            return
+
+        for font_info in fontinfo.FONT_INFO.values():
+            cls.request_font(
+                font_info.get(
+                    fontinfo.FONT_PATH_FIELD,
+                    fontinfo.FONT_PATH_DEFAULT,
+                ),
+                font_info.get(
+                    fontinfo.FONT_SIZE_FIELD,
+                    fontinfo.FONT_SIZE_DEFAULT,
+                ),
+                PRIORITY_START,
+            )
+
+        cls.request_images(
+            sorted(
+                get_map_image_paths(start_map_id).union(
+                    get_image_info_paths(objdata.IMAGE_INFO_DICT_PROTAG)
+                )
+            ),
+            PRIORITY_START,
+        )
+
+        other_paths = set()
+
+        for tile_data in tiledata.TILE_DATA.values():
+            other_paths.update(
+                tile_data.get(tiledata.TILE_IMAGE_PATHS_FIELD, None) or []
+            )
+
+        for object_id in list(objdata.MISC_OBJECT_DATA) \
+                + list(objdata.RESOURCE_DATA):
+            other_paths.update(get_object_image_paths(object_id))
+
+        cls.request_images(sorted(other_paths), PRIORITY_STARTUP)
+
+    @classmethod
+    def _run_worker(cls):
+        """Decodes requested assets until told to stop."""
+
+        while True:
+            priority, sequence_number, asset_key = cls._request_queue.get()
+
+            if asset_key is None:
+                break
+
+            with cls._lock:
+                job = cls._jobs.get(asset_key, None)
+
+                # Skip jobs that were taken or dropped before they started.
+                if (job is None) or (job[0] != JOB_QUEUED):
+                    continue
+
+                job[0] = JOB_RUNNING
+
+            result = None
+
+            try:
+                if asset_key[0] == ASSET_IMAGE:
+                    with open(asset_key[1], 'rb') as image_file:
+                        image_data = image_file.read()
+
+                    result = (
+                        hashlib.sha1(image_data).digest(),
+                        pygame.image.load(io.BytesIO(image_data), asset_key[1]),
+                    )
+                else:
+                    result = pygame.font.Font(asset_key[1], asset_key[2])
+            except (IOError, pygame.error) as err:
+                LOGGER.warning("Failed to decode %s: %s", asset_key[1], err)
+            except Exception:
+                LOGGER.exception("Unexpected error decoding %s", asset_key[1])
+            finally:
+                # Always give the job up, so that a waiting _take returns
+                # (with None if the decode failed) instead of hanging.
+                with cls._lock:
+                    job[0] = JOB_DONE
+                    job[1] = result
+
+                job[2].set()
+
+            if (asset_key[0] == ASSET_IMAGE) and result:
+                cls._decoded_image_keys.append(asset_key)
+
+    @classmethod
+    def _take(cls, asset_key):
+        """Takes the result for a requested asset, waiting for it if a
+        worker is decoding it.
+
+        Returns:
+            the result, or None if the asset was not requested, failed to
+            decode, or had not been started (in which case the caller should
+            decode it itself rather than wait).
+        """
+
+        with cls._lock:
+            job = cls._jobs.pop(asset_key, None)
+
+            if (job is None) or (job[0] == JOB_QUEUED):
+                # Not started, so the worker will skip it.
+                return None
+
+        job[2].wait()
+
+        return job[1]
+
+    @classmethod
+    def take_image(cls, image_path):
+        """Returns a (content hash, unconverted Surface) tuple for a
+        requested image, or None if it should be loaded directly."""
+
+        return cls._take((ASSET_IMAGE, image_path))
+
+    @classmethod
+    def get_font(cls, font_path, font_size):
+        """Returns a Font, opened by a worker if it was requested, and
+        opened here otherwise."""
+
+        font_obj = cls._take((ASSET_FONT, font_path, font_size))
+
+        if font_obj is None:
+            font_obj = pygame.font.Font(font_path, font_size)
+
+        return font_obj
+
+    @classmethod
+    def poll(cls):
+        """Converts decoded images into the image cache, for up to
+        POLL_BUDGET_MS milliseconds.
+
+        Call from the main thread, such as after each clock tick.
+        """
+
+        if not cls._decoded_image_keys:
+            return
+
+        end_time = time.perf_counter() + (POLL_BUDGET_MS / 1000.0)
+
+        while cls._decoded_image_keys and (time.perf_counter() < end_time):
+            asset_key = cls._decoded_image_keys.popleft()
+
+            with cls._lock:
+                job = cls._jobs.get(asset_key, None)
+
+                if (job is None) or (job[0] != JOB_DONE):
+                    # Already taken.
+                    continue
+
+                del cls._jobs[asset_key]
+
+            content_hash, image = job[1]
+            imageloader.ImageLoader.add_decoded_image(
+                asset_key[1],
+                content_hash,
+                image,
+            )
+
+    @classmethod
+    def get_pending_count(cls):
+        """Returns the number of requested assets that have not been
+        taken yet."""
+
+        with cls._lock:
+            return len(cls._jobs)
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
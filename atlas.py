@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""Packs the images referenced from imagepaths into texture atlas sheets.
+
+Run from the game directory after adding or changing images, for example:
+
+    python atlas.py
+    python atlas.py --sheet-size 2048
+
+Writes the sheets and an index to imageloader.ATLAS_DIR, which
+imageloader.ImageLoader reads at run time to hand out subsurfaces of the
+sheets in place of separately loaded images. Images larger than
+--max-image-size in either dimension, such as full-screen backgrounds, are
+left out and keep loading from their own files. Delete the atlas directory
+to go back to loading every image from its own file.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+import imageloader
+import imagepaths
+
+# Width and height of each atlas sheet in pixels.
+DEFAULT_SHEET_SIZE = 1024
+
+# Images larger than this many pixels in either dimension are not packed.
+DEFAULT_MAX_IMAGE_SIZE = 256
+
+def get_image_paths():
+    """Returns a sorted list of the distinct image file paths in
+    imagepaths."""
+
+    return sorted(set(
+        value for name, value in vars(imagepaths).items()
+        if name.isupper()
+            and isinstance(value, str)
+            and value.lower().endswith('.png')
+    ))
+
+def pack_images(image_sizes, sheet_size):
+    """Packs images onto sheets in rows (shelves), tallest images first.
+
+    Args:
+        image_sizes: dict mapping image paths to (width, height) tuples. No
+            image may be larger than sheet_size in either dimension.
+        sheet_size: width and height of each sheet in pixels.
+
+    Returns:
+        tuple of a dict mapping image paths to (sheet index, x, y) tuples,
+        and a list of the used height of each sheet.
+    """
+
+    placements = {}
+    sheet_heights = []
+
+    sheet_index = -1
+    shelf_x = 0
+    shelf_y = 0
+    shelf_height = 0
+
+    sorted_paths = sorted(
+        image_sizes,
+        key=lambda path: (-image_sizes[path][1], -image_sizes[path][0], path),
+    )
+
+    for image_path in sorted_paths:
+        width, height = image_sizes[image_path]
+
+        if (sheet_index < 0) or (shelf_x + width > sheet_size):
+            # Start a new shelf below the current one.
+            shelf_x = 0
+            shelf_y = shelf_y + shelf_height
+            shelf_height = 0
+
+        if (sheet_index < 0) or (shelf_y + height > sheet_size):
+            # Start a new sheet.
+            sheet_index = sheet_index + 1
+            sheet_heights.append(0)
+            shelf_x = 0
+            shelf_y = 0
+            shelf_height = 0
+
+        placements[image_path] = (sheet_index, shelf_x, shelf_y)
+
+        shelf_x = shelf_x + width
+        shelf_height = max(shelf_height, height)
+        sheet_heights[sheet_index] = max(
+            sheet_heights[sheet_index],
+            shelf_y + height,
+        )
+
+    return (placements, sheet_heights)
+
+def build_atlas(
+        image_paths,
+        output_dir=imageloader.ATLAS_DIR,
+        sheet_size=DEFAULT_SHEET_SIZE,
+        max_image_size=DEFAULT_MAX_IMAGE_SIZE,
+    ):
+    """Packs images into atlas sheets and writes the sheets and index.
+
+    Args:
+        image_paths: list of image file paths to pack. Missing and
+            oversized images are skipped.
+        output_dir: directory to write the sheets and index to.
+        sheet_size: width and height of each sheet in pixels.
+        max_image_size: largest width or height of an image to pack.
+
+    Returns:
+        dict with the numbers of images packed and skipped, and the number
+        of sheets written.
+    """
+
+    max_image_size = min(max_image_size, sheet_size)
+
+    images = {}
+    num_skipped = 0
+
+    for image_path in image_paths:
+        if not os.path.isfile(image_path):
+            print("Skipping missing image {0}".format(image_path))
+            num_skipped = num_skipped + 1
+            continue
+
+        image = pygame.image.load(image_path)
+
+        if (image.get_width() > max_image_size) \
+                or (image.get_height() > max_image_size):
+            num_skipped = num_skipped + 1
+            continue
+
+        images[image_path] = image
+
+    placements, sheet_heights = pack_images(
+        dict((path, image.get_size()) for path, image in images.items()),
+        sheet_size,
+    )
+
+    sheets = [
+        pygame.Surface((sheet_size, sheet_height), pygame.SRCALPHA, 32)
+        for sheet_height in sheet_heights
+    ]
+
+    index_images = {}
+
+    for image_path, (sheet_index, x, y) in placements.items():
+        image = images[image_path]
+        sheets[sheet_index].blit(image, (x, y))
+
+        index_images[image_path] = [
+            sheet_index,
+            x,
+            y,
+            image.get_width(),
+            image.get_height(),
+        ]
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    sheet_names = []
+    for sheet_index, sheet in enumerate(sheets):
+        sheet_name = "atlas_{0}.png".format(sheet_index)
+        pygame.image.save(sheet, os.path.join(output_dir, sheet_name))
+        sheet_names.append(sheet_name)
+
+    with open(os.path.join(output_dir, 'atlas_index.json'), 'w') as index_file:
+        json.dump(
+            {
+                'version': imageloader.ATLAS_FORMAT_VERSION,
+                'sheets': sheet_names,
+                'images': index_images,
+            },
+            index_file,
+            indent=1,
+            sort_keys=True,
+        )
+
+    return {
+        'packed': len(index_images),
+        'skipped': num_skipped,
+        'sheets': len(sheets),
+    }
+
+def main(argv=None):
+    """Parses the command line and builds the atlas."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--sheet-size',
+        type=int,
+        default=DEFAULT_SHEET_SIZE,
+        help='width and height of each sheet in pixels',
+    )
+    parser.add_argument(
+        '--max-image-size',
+        type=int,
+        default=DEFAULT_MAX_IMAGE_SIZE,
+        help='largest width or height of an image to pack',
+    )
+    parser.add_argument(
+        '--output-dir',
+        default=imageloader.ATLAS_DIR,
+        help='directory to write the sheets and index to',
+    )
+    args = parser.parse_args(argv)
+
+    pygame.init()
+
+    result = build_atlas(
+        get_image_paths(),
+        output_dir=args.output_dir,
+        sheet_size=args.sheet_size,
+        max_image_size=args.max_image_size,
+    )
+
+    print(
+        "Packed {0} images onto {1} sheets in {2} ({3} left out)".format(
+            result['packed'],
+            result['sheets'],
+            args.output_dir,
+            result['skipped'],
+        )
+    )
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
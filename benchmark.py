@@ -0,0 +1,1313 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for the game's hot paths.
+
+Run from the game directory, for example:
+
+    python benchmark.py blits
+    python benchmark.py pathfinding
+    python benchmark.py routes --sizes 2,4,6
+    python benchmark.py images
+    python benchmark.py walk --output walk.json
+    python benchmark.py startup
+
+Benchmarks run headless through the SDL dummy video driver unless
+SDL_VIDEODRIVER is already set.
+"""
+
+import argparse
+import collections
+import heapq
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows.
+    resource = None
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+import adventure
+import atlas
+import compositor
+import directions
+import game
+import gamemap
+import imageloader
+import interactiveobj
+import language
+import mapdata
+import pathfinding
+import renderbatch
+import routeplanner
+import tiledata
+import timekeeper
+import viewing
+import viewingdata
+
+# Ticks between key presses while a scripted walk waits on a menu or
+# text box, and ticks before a gathering interaction is ended early.
+WALK_KEY_PRESS_INTERVAL_TICKS = 5
+WALK_GATHERING_TIMEOUT_TICKS = 300
+
+# Most milliseconds a cold start may take, from launching adventure.py to
+# its first frame being shown. The startup benchmark fails when the median
+# cold start goes over it.
+COLD_START_BUDGET_MS = 500
+
+# Map ID of the first map in the synthetic worlds built by the routes
+# benchmark. Each world size gets its own block of IDs.
+ROUTE_TEST_MAP_ID_BASE = 0x10000
+ROUTE_TEST_MAP_ID_BLOCK = 0x1000
+
+# Stands in for a Connector on the synthetic maps, with the fields the route
+# planner reads.
+RouteTestConnector = collections.namedtuple(
+    'RouteTestConnector',
+    ['dest_area', 'dest_x_coord', 'dest_y_coord'],
+)
+
+# Chance that a scripted walk keeps going in the same direction.
+WALK_STRAIGHT_PROBABILITY = 0.7
+
+# Step offsets for each direction.
+WALK_DIRECTION_OFFSETS = {
+    directions.DIR_NORTH: (0, -1),
+    directions.DIR_EAST: (1, 0),
+    directions.DIR_SOUTH: (0, 1),
+    directions.DIR_WEST: (-1, 0),
+}
+
+def init_game_data():
+    """Sets up pygame, the main display, and the game data.
+
+    Returns:
+        pygame Surface for the main display.
+    """
+
+    pygame.init()
+    pygame.font.init()
+    timekeeper.Timekeeper.init_clock()
+    main_display_surface = pygame.display.set_mode(
+        (
+            viewingdata.MAIN_DISPLAY_WIDTH,
+            viewingdata.MAIN_DISPLAY_HEIGHT
+        )
+    )
+    adventure.setup(build_all=True)
+
+    return main_display_surface
+
+def time_call(func, repeat, number):
+    """Returns the best time in milliseconds for a single call of func.
+
+    Args:
+        func: callable to time.
+        repeat: number of timing runs. The fastest run is used.
+        number: number of calls per timing run.
+    """
+
+    return min(timeit.repeat(func, repeat=repeat, number=number)) \
+        * 1000 / number
+
+def benchmark_blits(args):
+    """Compares per-sprite blits with batched Surface.blits submission.
+
+    Blits a full viewport of Tiles (without the pre-rendered tile layer)
+    and the interactive objects in view, once per image with Surface.blit
+    and once per layer with Surface.blits.
+    """
+
+    main_display_surface = init_game_data()
+    map_obj = gamemap.Map.get_map(args.map_id)
+
+    map_obj.top_left_position = \
+        viewing.OverworldViewing.get_centered_map_top_left_pixel(
+            (map_obj.width // 2, map_obj.height // 2)
+        )
+    tile_subset_rect = viewing.OverworldViewing.calculate_tile_viewing_rect(
+        map_obj,
+        viewing.OverworldViewing.get_top_left_ow_viewing_tile(
+            map_obj.top_left_position
+        )
+    )
+
+    tile_layer_chunks = map_obj.tile_layer_chunks
+    map_obj.tile_layer_chunks = {}
+
+    print(
+        "Map {0}, viewport tiles {1}".format(args.map_id, tile_subset_rect)
+    )
+
+    try:
+        for layer_name, blit_func in [
+                ('tiles', map_obj.blit_tiles),
+                ('objects', map_obj.blit_interactive_objects),
+            ]:
+            results = {}
+            for use_blits in (False, True):
+                renderbatch.RenderBatch.use_blits = use_blits
+                results[use_blits] = time_call(
+                    lambda: blit_func(
+                        main_display_surface,
+                        tile_subset_rect=tile_subset_rect,
+                        blit_time_ms=0,
+                    ),
+                    args.repeat,
+                    args.number,
+                )
+
+            print(
+                "{0:<8} blit: {1:8.3f} ms  blits: {2:8.3f} ms  ({3:.2f}x)".format(
+                    layer_name,
+                    results[False],
+                    results[True],
+                    results[False] / results[True],
+                )
+            )
+    finally:
+        renderbatch.RenderBatch.use_blits = True
+        map_obj.tile_layer_chunks = tile_layer_chunks
+
+def benchmark_pathfinding(args):
+    """Times A* and jump point search over every map in mapdata.MAP_DATA.
+
+    Plans paths between random pairs of passable tiles on each map,
+    without the path cache, and checks that both searches find paths of
+    the same length.
+    """
+
+    init_game_data()
+    rng = random.Random(args.seed)
+
+    for map_id in sorted(mapdata.MAP_DATA):
+        map_obj = gamemap.Map.get_map(map_id)
+        plane = map_obj.get_passability_plane(args.transport)
+
+        passable_locs = [
+            (tile_index % map_obj.width, tile_index // map_obj.width)
+            for tile_index, passable in enumerate(plane)
+            if passable
+        ]
+
+        if not passable_locs:
+            print("Map {0}: no passable tiles".format(map_id))
+            continue
+
+        queries = [
+            (rng.choice(passable_locs), rng.choice(passable_locs))
+            for _ in range(args.queries)
+        ]
+
+        print(
+            "Map {0} ({1}x{2}), {3} queries".format(
+                map_id,
+                map_obj.width,
+                map_obj.height,
+                len(queries),
+            )
+        )
+
+        path_lengths = {}
+        for search_name, use_jps in [('astar', False), ('jps', True)]:
+            lengths = []
+            expansions = 0
+            total_ms = 0.0
+            worst_ms = 0.0
+
+            for start_loc, dest_loc in queries:
+                def plan_path():
+                    return pathfinding.Pathfinder.find_path(
+                        map_obj,
+                        start_loc,
+                        dest_loc,
+                        args.transport,
+                        use_jps=use_jps,
+                        use_cache=False,
+                    )
+
+                query_ms = time_call(plan_path, args.repeat, 1)
+                total_ms = total_ms + query_ms
+                worst_ms = max(worst_ms, query_ms)
+
+                path = plan_path()
+                expansions = expansions \
+                    + pathfinding.Pathfinder.get_last_expansion_count()
+                lengths.append(None if path is None else len(path))
+
+            path_lengths[search_name] = lengths
+
+            print(
+                "  {0:<6} mean: {1:8.3f} ms  worst: {2:8.3f} ms  "
+                "mean expansions: {3:8.1f}".format(
+                    search_name,
+                    total_ms / len(queries),
+                    worst_ms,
+                    expansions / float(len(queries)),
+                )
+            )
+
+        mismatches = sum(
+            1 for astar_length, jps_length in zip(
+                path_lengths['astar'],
+                path_lengths['jps'],
+            )
+            if astar_length != jps_length
+        )
+        if mismatches:
+            print("  {0} path length mismatches".format(mismatches))
+
+def get_passable_locations(map_obj, transport_flag):
+    """Returns a list of the (x, y) tile locations on the map that allow
+    transport_flag and are not occupied."""
+
+    plane = map_obj.get_passability_plane(transport_flag)
+
+    return [
+        (tile_index % map_obj.width, tile_index // map_obj.width)
+        for tile_index, passable in enumerate(plane)
+        if passable
+    ]
+
+def get_largest_region_locations(map_obj, transport_flag):
+    """Returns a list of the passable (x, y) tile locations in the map's
+    largest connected region for transport_flag, or every passable
+    location if the map has no region labels for it."""
+
+    passable_locs = get_passable_locations(map_obj, transport_flag)
+    labels = map_obj.region_labels.get(transport_flag, None)
+
+    if labels is None:
+        return passable_locs
+
+    region_sizes = collections.Counter(
+        labels[(loc[1] * map_obj.width) + loc[0]] for loc in passable_locs
+    )
+    largest_label = region_sizes.most_common(1)[0][0]
+
+    return [
+        loc for loc in passable_locs
+        if labels[(loc[1] * map_obj.width) + loc[0]] == largest_label
+    ]
+
+def get_border_entrance(passable_locs, map_obj, direction):
+    """Returns the passable location closest to the middle of the map's
+    border on the side of the direction, or to that border if no location
+    on it is passable."""
+
+    mid_x = map_obj.width // 2
+    mid_y = map_obj.height // 2
+
+    if direction == directions.DIR_NORTH:
+        key = lambda loc: (loc[1], abs(loc[0] - mid_x))
+    elif direction == directions.DIR_SOUTH:
+        key = lambda loc: (-loc[1], abs(loc[0] - mid_x))
+    elif direction == directions.DIR_WEST:
+        key = lambda loc: (loc[0], abs(loc[1] - mid_y))
+    else:
+        key = lambda loc: (-loc[0], abs(loc[1] - mid_y))
+
+    return min(passable_locs, key=key)
+
+def get_route_test_tile_ids(transport_flag):
+    """Returns a tuple of the lowest tile ID that allows transport_flag and
+    the lowest tile ID that does not."""
+
+    open_ids = []
+    blocked_ids = []
+
+    for tile_id, tile_data in sorted(tiledata.TILE_DATA.items()):
+        allowed_transport = tile_data.get(
+            tiledata.TILE_ALLOWED_TRANSPORT_FIELD,
+            tiledata.DEFAULT_TRANSPORTATION,
+        )
+
+        if allowed_transport & transport_flag:
+            open_ids.append(tile_id)
+        else:
+            blocked_ids.append(tile_id)
+
+    return (open_ids[0], blocked_ids[0])
+
+def build_route_test_world(grid_size, map_id_base, args, rng):
+    """Builds a grid_size by grid_size world of randomly blocked maps,
+    linked to their neighbors by adjacent map entries and to a diagonal
+    neighbor by a connector tile.
+
+    The maps are added to the map listing, but not to mapdata.MAP_DATA.
+    Links are kept inside the largest connected region of each map, so
+    that most queries have a route.
+
+    Returns:
+        dict mapping (column, row) grid positions to (map, list of tile
+        locations in its largest region) tuples.
+    """
+
+    open_id, blocked_id = get_route_test_tile_ids(args.transport)
+
+    world = {}
+    for row in range(grid_size):
+        for col in range(grid_size):
+            tile_grid = [
+                [
+                    blocked_id if rng.random() < args.obstacles else open_id
+                    for x in range(args.map_size)
+                ]
+                for y in range(args.map_size)
+            ]
+
+            map_obj = gamemap.Map(map_id_base + (row * grid_size) + col, tile_grid)
+            map_obj.init_interactive_obj({})
+            map_obj.build_region_labels()
+            gamemap.Map.map_listing[map_obj.map_id] = map_obj
+
+            world[(col, row)] = (
+                map_obj,
+                get_largest_region_locations(map_obj, args.transport),
+            )
+
+    # Walking past a border arrives near the middle of the opposite border.
+    border_links = [
+        (directions.DIR_EAST, directions.DIR_WEST, 1, 0),
+        (directions.DIR_WEST, directions.DIR_EAST, -1, 0),
+        (directions.DIR_SOUTH, directions.DIR_NORTH, 0, 1),
+        (directions.DIR_NORTH, directions.DIR_SOUTH, 0, -1),
+    ]
+
+    for (col, row), (map_obj, region_locs) in world.items():
+        for direction, entry_side, step_col, step_row in border_links:
+            dest_info = world.get((col + step_col, row + step_row), None)
+            if dest_info:
+                map_obj.add_adjacent_map(
+                    direction,
+                    dest_info[0].map_id,
+                    get_border_entrance(dest_info[1], dest_info[0], entry_side),
+                )
+
+        dest_info = world.get((col + 1, row + 1), None)
+        if dest_info:
+            dest_loc = rng.choice(dest_info[1])
+            map_obj.connector_tile_dict[rng.choice(region_locs)] = \
+                RouteTestConnector(dest_info[0].map_id, dest_loc[0], dest_loc[1])
+
+    return world
+
+def get_flat_route_length(start_map_id, start_loc, dest_map_id, dest_loc, transport):
+    """Returns the length of the shortest route found by searching every
+    tile of every map at once, or None if there is no route.
+
+    Counts the same costs as routeplanner.RoutePlanner: one per step, plus
+    the map border and connector crossing costs.
+    """
+
+    start_node = (start_map_id, tuple(start_loc))
+    dest_node = (dest_map_id, tuple(dest_loc))
+    costs = {start_node: 0}
+    open_heap = [(0, start_node)]
+
+    while open_heap:
+        cost, node = heapq.heappop(open_heap)
+
+        if node == dest_node:
+            return cost
+
+        if cost != costs[node]:
+            continue
+
+        map_id, (x, y) = node
+        map_obj = gamemap.Map.get_map(map_id)
+
+        next_nodes = []
+        for direction, (step_x, step_y) in WALK_DIRECTION_OFFSETS.items():
+            next_loc = (x + step_x, y + step_y)
+
+            if map_obj.location_within_bounds(next_loc):
+                if map_obj.can_occupy(next_loc, transport):
+                    next_nodes.append(((map_id, next_loc), 1))
+            elif direction in map_obj.adj_map_dict:
+                adj_map_id, adj_loc = map_obj.adj_map_dict[direction]
+                if gamemap.Map.get_map(adj_map_id).can_occupy(adj_loc, transport):
+                    next_nodes.append((
+                        (adj_map_id, tuple(adj_loc)),
+                        routeplanner.BORDER_CROSSING_COST,
+                    ))
+
+        connector_obj = map_obj.connector_tile_dict.get((x, y), None)
+        if connector_obj:
+            connector_dest = (connector_obj.dest_x_coord, connector_obj.dest_y_coord)
+            if gamemap.Map.get_map(connector_obj.dest_area).can_occupy(
+                    connector_dest,
+                    transport,
+                ):
+                next_nodes.append((
+                    (connector_obj.dest_area, connector_dest),
+                    routeplanner.CONNECTOR_CROSSING_COST,
+                ))
+
+        for next_node, step_cost in next_nodes:
+            next_cost = cost + step_cost
+            if next_cost < costs.get(next_node, next_cost + 1):
+                costs[next_node] = next_cost
+                heapq.heappush(open_heap, (next_cost, next_node))
+
+    return None
+
+def check_route(route, start_map_id, start_loc, dest_map_id, dest_loc, transport):
+    """Checks that the legs of a route join up into a walk from the start
+    to the destination.
+
+    Returns:
+        tuple of the route length, counted as in get_flat_route_length, and
+        a string describing the first problem found, or None.
+    """
+
+    leg_map_id = start_map_id
+    leg_start_loc = tuple(start_loc)
+    length = 0
+
+    for leg_index, (map_id, leg_loc, path, exit_direction) in enumerate(route):
+        if (map_id, tuple(leg_loc)) != (leg_map_id, leg_start_loc):
+            return (None, "leg {0} starts at {1} {2}, expected {3} {4}".format(
+                leg_index, map_id, leg_loc, leg_map_id, leg_start_loc
+            ))
+
+        map_obj = gamemap.Map.get_map(map_id)
+        curr_loc = leg_start_loc
+
+        for next_loc in path:
+            if (abs(next_loc[0] - curr_loc[0]) + abs(next_loc[1] - curr_loc[1]) != 1) \
+                    or not map_obj.can_occupy(next_loc, transport):
+                return (None, "leg {0} steps from {1} to {2}".format(
+                    leg_index, curr_loc, next_loc
+                ))
+            curr_loc = tuple(next_loc)
+
+        length = length + len(path)
+
+        if leg_index == len(route) - 1:
+            if (map_id, curr_loc) != (dest_map_id, tuple(dest_loc)):
+                return (None, "route ends at {0} {1}".format(map_id, curr_loc))
+        elif exit_direction is not None:
+            step_x, step_y = WALK_DIRECTION_OFFSETS[exit_direction]
+            if map_obj.location_within_bounds(
+                    (curr_loc[0] + step_x, curr_loc[1] + step_y)
+                ):
+                return (None, "leg {0} exits {1} away from the border at {2}".format(
+                    leg_index, exit_direction, curr_loc
+                ))
+
+            leg_map_id, leg_start_loc = map_obj.adj_map_dict[exit_direction]
+            leg_start_loc = tuple(leg_start_loc)
+            length = length + routeplanner.BORDER_CROSSING_COST
+        else:
+            connector_obj = map_obj.connector_tile_dict.get(curr_loc, None)
+            if not connector_obj:
+                return (None, "leg {0} ends off a connector at {1}".format(
+                    leg_index, curr_loc
+                ))
+
+            leg_map_id = connector_obj.dest_area
+            leg_start_loc = (connector_obj.dest_x_coord, connector_obj.dest_y_coord)
+            length = length + routeplanner.CONNECTOR_CROSSING_COST
+
+    return (length, None)
+
+def benchmark_routes(args):
+    """Times routeplanner.RoutePlanner on synthetic worlds of growing size.
+
+    The shipped maps are not linked to each other, so each world is a
+    square grid of randomly blocked maps, linked by adjacent map entries
+    and connectors (see build_route_test_world). Plans routes between random
+    passable tiles on random maps, checks that the legs join up and that
+    each route is as short as a search over every tile of the world, and
+    compares the time of both.
+    """
+
+    init_game_data()
+    rng = random.Random(args.seed)
+
+    for size_index, grid_size in enumerate(args.sizes):
+        routeplanner.RoutePlanner.clear_world_graph()
+        pathfinding.Pathfinder.clear_cache()
+
+        world = build_route_test_world(
+            grid_size,
+            ROUTE_TEST_MAP_ID_BASE + (size_index * ROUTE_TEST_MAP_ID_BLOCK),
+            args,
+            rng,
+        )
+        world_info = list(world.values())
+
+        queries = []
+        for _ in range(args.queries):
+            start_map, start_locs = rng.choice(world_info)
+            dest_map, dest_locs = rng.choice(world_info)
+            queries.append((
+                start_map.map_id,
+                rng.choice(start_locs),
+                dest_map.map_id,
+                rng.choice(dest_locs),
+            ))
+
+        start_time = time.perf_counter()
+        routeplanner.RoutePlanner.build_world_graph()
+        graph_ms = (time.perf_counter() - start_time) * 1000
+
+        first_query_ms = None
+        route_ms = []
+        flat_ms = []
+        num_routes = 0
+        num_legs = 0
+        problems = []
+
+        for query in queries:
+            start_time = time.perf_counter()
+            route = routeplanner.RoutePlanner.plan_route(*(query + (args.transport,)))
+            query_ms = (time.perf_counter() - start_time) * 1000
+
+            if first_query_ms is None:
+                first_query_ms = query_ms
+            else:
+                route_ms.append(query_ms)
+
+            start_time = time.perf_counter()
+            flat_length = get_flat_route_length(*(query + (args.transport,)))
+            flat_ms.append((time.perf_counter() - start_time) * 1000)
+
+            if route is None:
+                if flat_length is not None:
+                    problems.append("{0}: no route, expected {1} long".format(
+                        query, flat_length
+                    ))
+                continue
+
+            num_routes = num_routes + 1
+            num_legs = num_legs + len(route)
+
+            length, problem = check_route(route, *(query + (args.transport,)))
+            if problem:
+                problems.append("{0}: {1}".format(query, problem))
+            elif length != flat_length:
+                problems.append("{0}: route {1} long, expected {2}".format(
+                    query, length, flat_length
+                ))
+
+        print(
+            "{0}x{0} maps ({1} tiles), {2} queries, {3} routes, "
+            "{4:.1f} legs per route".format(
+                grid_size,
+                sum(
+                    map_obj.width * map_obj.height
+                    for map_obj, region_locs in world_info
+                ),
+                len(queries),
+                num_routes,
+                num_legs / float(num_routes) if num_routes else 0.0,
+            )
+        )
+        print(
+            "  graph: {0:8.3f} ms  first route: {1:8.3f} ms  "
+            "route mean: {2:8.3f} ms  flat search mean: {3:8.3f} ms".format(
+                graph_ms,
+                first_query_ms or 0.0,
+                statistics.mean(route_ms) if route_ms else 0.0,
+                statistics.mean(flat_ms),
+            )
+        )
+
+        for problem in problems:
+            print("  MISMATCH " + problem)
+
+        for map_obj, region_locs in world_info:
+            del gamemap.Map.map_listing[map_obj.map_id]
+
+    routeplanner.RoutePlanner.clear_world_graph()
+
+def benchmark_images(args):
+    """Compares loading images fresh with loading them from the image cache.
+
+    Reports how the image loads made while setting up the game data were
+    served, then times loading every image in imagepaths with
+    pygame.image.load and convert_alpha, as the constructors did before the
+    cache, and through imageloader.ImageLoader once cached.
+    """
+
+    init_game_data()
+
+    load_counts = imageloader.ImageLoader.get_load_counts()
+    cache_stats = imageloader.ImageLoader.get_cache_stats()
+
+    print(
+        "Setup: {0} cache hits, {1} file decodes, {2} atlas images "
+        "on {3} sheets, {4} cached images ({5:.1f} KB), {6} held and "
+        "never evicted ({7:.1f} KB)".format(
+            load_counts['cache_hits'],
+            load_counts['file_loads'],
+            load_counts['atlas_loads'],
+            load_counts['sheet_loads'],
+            cache_stats['images'],
+            cache_stats['bytes'] / 1024.0,
+            cache_stats['held_images'],
+            cache_stats['held_bytes'] / 1024.0,
+        )
+    )
+
+    image_paths = [
+        image_path for image_path in atlas.get_image_paths()
+        if os.path.isfile(image_path)
+    ]
+
+    def load_fresh():
+        for image_path in image_paths:
+            pygame.image.load(image_path).convert_alpha()
+
+    def load_cached():
+        for image_path in image_paths:
+            imageloader.ImageLoader.load_image(image_path)
+            imageloader.ImageLoader.release_image(image_path)
+
+    # Make sure every image is cached before timing cache hits.
+    load_cached()
+
+    fresh_ms = time_call(load_fresh, args.repeat, args.number)
+    cached_ms = time_call(load_cached, args.repeat, args.number)
+
+    print(
+        "{0} images  fresh: {1:8.3f} ms  cached: {2:8.3f} ms  ({3:.1f}x)".format(
+            len(image_paths),
+            fresh_ms,
+            cached_ms,
+            fresh_ms / cached_ms,
+        )
+    )
+
+class ScriptedKeyPresser(object):
+    """Presses keys from a clock tick callback, so that scripted runs can
+    get through menus and text boxes that block until a key is pressed.
+
+    Attributes:
+        key: pygame key to press every WALK_KEY_PRESS_INTERVAL_TICKS ticks,
+            or None to press nothing.
+        final_key: pygame key to press instead once final_after_ticks
+            ticks have passed, or None.
+        final_after_ticks: number of ticks to press key for before
+            switching to final_key.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.final_key = None
+        self.final_after_ticks = None
+        self._num_ticks = 0
+
+        timekeeper.Timekeeper.add_post_tick_callback(self.on_tick)
+
+    def start(self, key, final_key=None, final_after_ticks=None):
+        """Starts pressing key."""
+
+        self.key = key
+        self.final_key = final_key
+        self.final_after_ticks = final_after_ticks
+        self._num_ticks = 0
+
+    def stop(self):
+        """Stops pressing keys and drops any presses not yet handled."""
+
+        self.key = None
+        pygame.event.clear()
+
+    def on_tick(self):
+        """Posts the next key press if one is due."""
+
+        if self.key is None:
+            return
+
+        self._num_ticks = self._num_ticks + 1
+
+        if (self._num_ticks % WALK_KEY_PRESS_INTERVAL_TICKS) == 0:
+            key = self.key
+            if (self.final_key is not None) \
+                    and (self._num_ticks >= self.final_after_ticks):
+                key = self.final_key
+
+            pygame.event.post(
+                pygame.event.Event(pygame.KEYDOWN, key=key, mod=0)
+            )
+
+def get_walk_start_location(map_obj):
+    """Returns the walkable tile closest to the middle of the Map's largest
+    walkable region, or None if no tile is walkable."""
+
+    regions = map_obj.get_regions(tiledata.WALKABLE_F)
+
+    if not regions:
+        return None
+
+    region_locs = max(regions.values(), key=len)
+    middle_loc = (map_obj.width // 2, map_obj.height // 2)
+
+    return min(
+        region_locs,
+        key=lambda tile_loc: (
+            abs(tile_loc[0] - middle_loc[0]) + abs(tile_loc[1] - middle_loc[1]),
+            tile_loc,
+        )
+    )
+
+def get_gathering_target(map_obj, start_loc):
+    """Finds the nearest resource object on the Map that can be walked up
+    to.
+
+    Returns:
+        tuple of (path to walk, direction to face at the end of the path,
+        resource object bottom left tile location), or None if there
+        is no reachable resource object.
+    """
+
+    # Maps each free tile next to a resource object to the direction
+    # to face and the object's bottom left tile.
+    approach_info = {}
+
+    for bottom_left_loc, obj_info in sorted(
+            map_obj.bottom_left_tile_obj_mapping.items()
+        ):
+        if interactiveobj.InteractiveObject.is_resource_id(obj_info[0]):
+            for collision_loc in sorted(obj_info[1]):
+                for direction, offset in WALK_DIRECTION_OFFSETS.items():
+                    approach_loc = (
+                        collision_loc[0] - offset[0],
+                        collision_loc[1] - offset[1],
+                    )
+
+                    if (approach_loc not in approach_info) \
+                            and map_obj.can_occupy(
+                                approach_loc,
+                                tiledata.WALKABLE_F
+                            ):
+                        approach_info[approach_loc] = (
+                            direction,
+                            bottom_left_loc,
+                        )
+
+    if not approach_info:
+        return None
+
+    path = pathfinding.Pathfinder.find_path_to_nearest(
+        map_obj,
+        start_loc,
+        sorted(approach_info),
+        tiledata.WALKABLE_F,
+    )
+
+    if path is None:
+        return None
+
+    end_loc = path[-1] if path else start_loc
+
+    return (path,) + approach_info[end_loc]
+
+def get_step_time_summary(step_times_ms):
+    """Returns a dict of the mean, median, 95th percentile and worst step
+    times in milliseconds."""
+
+    if not step_times_ms:
+        return None
+
+    sorted_times = sorted(step_times_ms)
+
+    return {
+        'mean': sum(sorted_times) / len(sorted_times),
+        'p50': sorted_times[(len(sorted_times) - 1) // 2],
+        'p95': sorted_times[((len(sorted_times) * 95) - 1) // 100],
+        'max': sorted_times[-1],
+    }
+
+def run_scripted_walk(game_obj, map_obj, key_presser, args):
+    """Replays a scripted walk on a single map.
+
+    The walk is a seeded random walk of args.steps steps, which opens the
+    overworld side menu every args.menu_interval steps, and then walks to
+    the nearest resource object and gathers from it.
+
+    Returns:
+        dict of results for the map.
+    """
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+
+    step_times_ms = []
+    num_blocked_steps = 0
+    num_menus = 0
+    num_gathers = 0
+
+    start_ticks = timekeeper.Timekeeper.get_tick_count()
+    start_time = time.perf_counter()
+
+    def take_step(direction):
+        """Takes a single step and records how long it took."""
+
+        game_obj.turn_protagonist(direction)
+
+        step_start = time.perf_counter()
+        moved = game_obj.move_protagonist(direction, tiledata.WALKABLE_F)
+        game_obj.end_protagonist_step()
+
+        if moved:
+            step_times_ms.append((time.perf_counter() - step_start) * 1000)
+
+        return moved
+
+    direction = rng.choice(sorted(WALK_DIRECTION_OFFSETS))
+
+    for step_index in range(args.steps):
+        curr_loc = map_obj.protagonist_location
+        open_directions = []
+
+        for step_direction, offset in sorted(WALK_DIRECTION_OFFSETS.items()):
+            if map_obj.can_occupy(
+                    (curr_loc[0] + offset[0], curr_loc[1] + offset[1]),
+                    tiledata.WALKABLE_F,
+                ):
+                open_directions.append(step_direction)
+
+        if not open_directions:
+            break
+
+        if (direction not in open_directions) \
+                or (rng.random() >= WALK_STRAIGHT_PROBABILITY):
+            direction = rng.choice(open_directions)
+
+        if not take_step(direction):
+            num_blocked_steps = num_blocked_steps + 1
+
+        if args.menu_interval \
+                and (((step_index + 1) % args.menu_interval) == 0):
+            key_presser.start(pygame.K_ESCAPE)
+            game_obj.display_overworld_side_menu()
+            key_presser.stop()
+            num_menus = num_menus + 1
+
+    if args.gather:
+        gathering_target = get_gathering_target(
+            map_obj,
+            map_obj.protagonist_location,
+        )
+
+        if gathering_target:
+            path, face_direction, target_loc = gathering_target
+            start_loc = map_obj.protagonist_location
+
+            for step_direction in pathfinding.Pathfinder.get_path_directions(
+                    start_loc,
+                    path
+                ):
+                if not take_step(step_direction):
+                    num_blocked_steps = num_blocked_steps + 1
+
+            game_obj.turn_protagonist(face_direction)
+
+            key_presser.start(
+                pygame.K_SPACE,
+                final_key=pygame.K_ESCAPE,
+                final_after_ticks=WALK_GATHERING_TIMEOUT_TICKS,
+            )
+            game_obj.protag_interact(
+                interactiveobj.InteractiveObject.get_interactive_object(
+                    map_obj.get_object_occupying_tile(target_loc).object_id
+                ),
+                target_loc,
+            )
+            key_presser.stop()
+            num_gathers = num_gathers + 1
+
+    wall_ms = (time.perf_counter() - start_time) * 1000
+    num_frames = timekeeper.Timekeeper.get_tick_count() - start_ticks
+
+    return {
+        'map_id': map_obj.map_id,
+        'steps': len(step_times_ms),
+        'blocked_steps': num_blocked_steps,
+        'menus': num_menus,
+        'gathers': num_gathers,
+        'frames': num_frames,
+        'wall_ms': wall_ms,
+        'fps': (num_frames * 1000 / wall_ms) if wall_ms else None,
+        'step_ms': get_step_time_summary(step_times_ms),
+    }
+
+def benchmark_walk(args):
+    """Replays scripted walks over every map in mapdata.MAP_DATA and reports
+    the results as JSON.
+
+    The clock runs in manual mode, so frames are drawn as fast as they can
+    be rather than at the normal tick rate, and the same seed gives the same
+    frames every run. Frames per second and step times therefore measure
+    how much work each frame takes.
+    """
+
+    if args.trace_memory:
+        tracemalloc.start()
+
+    start_time = time.perf_counter()
+
+    main_display_surface = init_game_data()
+    timekeeper.Timekeeper.init_clock(clock_mode=timekeeper.CLOCK_MODE_MANUAL)
+    compositor.Compositor.init_compositor()
+
+    game_obj = game.Game(
+        main_display_surface,
+        game_language=language.LANG_ESPANOL,
+    )
+    game_obj.build_protagonist("Bob")
+
+    startup_ms = (time.perf_counter() - start_time) * 1000
+
+    key_presser = ScriptedKeyPresser()
+    map_results = []
+
+    for map_id in (args.map_id or sorted(mapdata.MAP_DATA)):
+        map_obj = gamemap.Map.get_map(map_id)
+        start_loc = get_walk_start_location(map_obj) if map_obj else None
+
+        if not start_loc:
+            map_results.append({'map_id': map_id, 'skipped': True})
+            continue
+
+        game_obj.set_and_blit_game_map(map_id, start_loc)
+        compositor.Compositor.present(force=True)
+
+        map_results.append(
+            run_scripted_walk(game_obj, map_obj, key_presser, args)
+        )
+
+    results = {
+        'seed': args.seed,
+        'steps_per_map': args.steps,
+        'startup_ms': startup_ms,
+        'maps': map_results,
+        'peak_rss_kb': None,
+        'peak_traced_kb': None,
+    }
+
+    if resource:
+        # ru_maxrss is in kilobytes on Linux.
+        results['peak_rss_kb'] = \
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if args.trace_memory:
+        results['peak_traced_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    output_text = json.dumps(results, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output_text + '\n')
+    else:
+        print(output_text)
+
+def get_import_times(module_name):
+    """Imports a module in a fresh interpreter and returns how long its
+    imports took.
+
+    Args:
+        module_name: name of the module to import.
+
+    Returns:
+        list of (module name, milliseconds) tuples, slowest first: one for
+        the body of each game module imported, and one for each other module
+        a game module imports directly, including everything that module
+        imports in turn.
+    """
+
+    game_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        path for path in (game_dir, env.get('PYTHONPATH', None)) if path
+    )
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module_name],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    def is_game_module(name):
+        return os.path.isfile(
+            os.path.join(game_dir, name.split('.')[0] + '.py')
+        )
+
+    import_times = []
+
+    # Lines are "import time: <self us> | <cumulative us> | <name>", with
+    # the name indented two spaces per level and each module listed after
+    # the modules it imports. Maps levels to the (name, cumulative us)
+    # tuples of modules whose importer has not been listed yet.
+    pending_children = {}
+
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if (len(fields) != 3) or not fields[1].strip().isdigit():
+            continue
+
+        self_us = int(fields[0].split(':')[-1])
+        cumulative_us = int(fields[1])
+        name_field = fields[2][1:]
+        name = name_field.strip()
+        level = (len(name_field) - len(name_field.lstrip())) // 2
+
+        children = pending_children.pop(level + 1, [])
+        pending_children.setdefault(level, []).append((name, cumulative_us))
+
+        if is_game_module(name):
+            import_times.append((name, self_us / 1000.0))
+
+            for child_name, child_cumulative_us in children:
+                if not is_game_module(child_name):
+                    import_times.append(
+                        (child_name, child_cumulative_us / 1000.0)
+                    )
+
+    import_times.sort(key=lambda import_time: -import_time[1])
+
+    return import_times
+
+def time_cold_start(extra_args=()):
+    """Launches adventure.py with --exit-after-start and returns the
+    milliseconds until it exits."""
+
+    command = [
+        sys.executable,
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'adventure.py'),
+        '--exit-after-start',
+    ] + list(extra_args)
+
+    start_time = time.perf_counter()
+    subprocess.run(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    )
+
+    return (time.perf_counter() - start_time) * 1000
+
+def benchmark_startup(args):
+    """Reports where startup time goes and checks the cold start budget.
+
+    Lists the time taken by each import when adventure is imported in a
+    fresh interpreter, and by each of adventure.REGISTRY_BUILDERS, which
+    build the registries that otherwise build each entry on first use. Then
+    launches the game several times, timing it to its first frame, and
+    fails if the median time is over the budget.
+
+    Returns:
+        0 if the median cold start is within the budget, 1 otherwise.
+    """
+
+    import_times = get_import_times('adventure')
+
+    print("Imports: {0:.1f} ms".format(
+        sum(import_ms for name, import_ms in import_times)
+    ))
+    for name, import_ms in import_times[:args.top]:
+        print("  {0:<40} {1:8.2f} ms".format(name, import_ms))
+
+    pygame.init()
+    pygame.font.init()
+    timekeeper.Timekeeper.init_clock()
+    pygame.display.set_mode(
+        (
+            viewingdata.MAIN_DISPLAY_WIDTH,
+            viewingdata.MAIN_DISPLAY_HEIGHT
+        )
+    )
+    adventure.setup()
+
+    builder_times = []
+    for builder in adventure.REGISTRY_BUILDERS:
+        start_time = time.perf_counter()
+        builder()
+        builder_times.append(
+            (builder.__qualname__, (time.perf_counter() - start_time) * 1000)
+        )
+
+    print("Registry builders: {0:.1f} ms (run on first use instead)".format(
+        sum(build_ms for name, build_ms in builder_times)
+    ))
+    for name, build_ms in builder_times:
+        print("  {0:<40} {1:8.2f} ms".format(name, build_ms))
+
+    # Warm the OS file cache so the runs are comparable.
+    time_cold_start()
+
+    cold_start_ms = [time_cold_start() for i in range(args.runs)]
+    build_all_ms = [
+        time_cold_start(['--build-all']) for i in range(args.runs)
+    ]
+
+    median_ms = statistics.median(cold_start_ms)
+
+    print(
+        "Cold start to first frame over {0} runs: median {1:.1f} ms, "
+        "best {2:.1f} ms (with --build-all: median {3:.1f} ms)".format(
+            args.runs,
+            median_ms,
+            min(cold_start_ms),
+            statistics.median(build_all_ms),
+        )
+    )
+
+    if median_ms > args.budget_ms:
+        print("FAIL: over the {0:.0f} ms budget".format(args.budget_ms))
+        return 1
+
+    print("OK: within the {0:.0f} ms budget".format(args.budget_ms))
+    return 0
+
+def main(argv=None):
+    """Parses the command line and runs the chosen benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='benchmark')
+    subparsers.required = True
+
+    blits_parser = subparsers.add_parser(
+        'blits',
+        help='per-sprite blit vs batched Surface.blits',
+    )
+    blits_parser.add_argument('--map-id', type=int, default=mapdata.R0_A0_ID)
+    blits_parser.add_argument('--repeat', type=int, default=5)
+    blits_parser.add_argument('--number', type=int, default=200)
+    blits_parser.set_defaults(func=benchmark_blits)
+
+    pathfinding_parser = subparsers.add_parser(
+        'pathfinding',
+        help='A* vs jump point search over every map',
+    )
+    pathfinding_parser.add_argument(
+        '--transport',
+        type=int,
+        default=tiledata.WALKABLE_F,
+        help='transportation flag to plan paths for',
+    )
+    pathfinding_parser.add_argument('--queries', type=int, default=100)
+    pathfinding_parser.add_argument('--seed', type=int, default=0)
+    pathfinding_parser.add_argument('--repeat', type=int, default=3)
+    pathfinding_parser.set_defaults(func=benchmark_pathfinding)
+
+    routes_parser = subparsers.add_parser(
+        'routes',
+        help='route planning over synthetic linked worlds vs a flat search',
+    )
+    routes_parser.add_argument(
+        '--sizes',
+        type=lambda text: [int(size) for size in text.split(',')],
+        default=[2, 4, 6],
+        help='comma-separated side lengths of the square worlds to build',
+    )
+    routes_parser.add_argument(
+        '--map-size',
+        type=int,
+        default=32,
+        help='width and height of each map in tiles',
+    )
+    routes_parser.add_argument(
+        '--obstacles',
+        type=float,
+        default=0.25,
+        help='fraction of tiles to block',
+    )
+    routes_parser.add_argument(
+        '--transport',
+        type=int,
+        default=tiledata.WALKABLE_F,
+        help='transportation flag to plan routes for',
+    )
+    routes_parser.add_argument('--queries', type=int, default=20)
+    routes_parser.add_argument('--seed', type=int, default=0)
+    routes_parser.set_defaults(func=benchmark_routes)
+
+    images_parser = subparsers.add_parser(
+        'images',
+        help='fresh image loads vs image cache hits',
+    )
+    images_parser.add_argument('--repeat', type=int, default=5)
+    images_parser.add_argument('--number', type=int, default=10)
+    images_parser.set_defaults(func=benchmark_images)
+
+    walk_parser = subparsers.add_parser(
+        'walk',
+        help='scripted walks, menus and gathering over every map, as JSON',
+    )
+    walk_parser.add_argument(
+        '--map-id',
+        type=int,
+        action='append',
+        help='map to walk (can be repeated; default is every map)',
+    )
+    walk_parser.add_argument('--steps', type=int, default=100)
+    walk_parser.add_argument(
+        '--menu-interval',
+        type=int,
+        default=25,
+        help='steps between opening the side menu (0 to never open it)',
+    )
+    walk_parser.add_argument(
+        '--no-gather',
+        dest='gather',
+        action='store_false',
+        help='skip gathering from the nearest resource at the end of a walk',
+    )
+    walk_parser.add_argument('--seed', type=int, default=0)
+    walk_parser.add_argument(
+        '--trace-memory',
+        action='store_true',
+        help='also report peak Python heap use (slows the run down)',
+    )
+    walk_parser.add_argument('--output', help='file to write the JSON to')
+    walk_parser.set_defaults(func=benchmark_walk)
+
+    startup_parser = subparsers.add_parser(
+        'startup',
+        help='import and registry build times, and the cold start budget',
+    )
+    startup_parser.add_argument(
+        '--runs',
+        type=int,
+        default=5,
+        help='number of cold starts to time',
+    )
+    startup_parser.add_argument(
+        '--budget-ms',
+        type=float,
+        default=COLD_START_BUDGET_MS,
+        help='most milliseconds the median cold start may take',
+    )
+    startup_parser.add_argument(
+        '--top',
+        type=int,
+        default=20,
+        help='number of slowest imports to list',
+    )
+    startup_parser.set_defaults(func=benchmark_startup)
+
+    args = parser.parse_args(argv)
+
+    return args.func(args) or 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""This module contains methods and constants for presenting frames.
+
+Rather than pushing the whole window to the screen with every
+pygame.display.update() call, drawing code marks the regions it changed as
+dirty, and the Compositor presents only those regions, at most once per
+clock tick.
+"""
+
+import pygame
+import perfhud
+import timekeeper
+import viewingdata
+
+# If the dirty regions cover more than this fraction of the main display,
+# present the full frame instead.
+FULL_FRAME_DIRTY_AREA_FRACTION = 0.6
+
+class Compositor(object):
+    """Collects dirty regions and presents them to the pygame display.
+
+    The user should not generate Compositor objects, as the class
+    is primarily for class methods related to presenting frames.
+
+    The main display is made up of a base layer (such as the overworld map)
+    that a single owner redraws in full, and overlays (such as text boxes
+    and menus) that get drawn on top of it. Base layer owners call
+    claim_base_layer after each redraw, and mark only the regions that
+    changed since their last redraw. Overlays are marked with mark_overlay,
+    so that their regions can be presented again once the base layer is
+    redrawn over them.
+    """
+
+    # Whether the Compositor should track dirty regions. If False, every
+    # present will update the full frame.
+    enabled = True
+
+    # List of dirty pygame Rects to present.
+    _dirty_rects = []
+
+    # If True, the next present will update the full frame.
+    _full_frame_dirty = True
+
+    # List of pygame Rects for overlays drawn since the last base layer
+    # redraw.
+    _overlay_rects = []
+
+    # Object that drew the base layer, and the state it drew.
+    _base_layer_owner = None
+    _base_layer_state = None
+
+    # Clock tick count for the last present.
+    _last_present_tick = None
+
+    @classmethod
+    def init_compositor(cls):
+        """Sets up the Compositor to present deferred frames on each tick.
+
+        Requires the Timekeeper clock to be set up.
+        """
+
+        cls._dirty_rects = []
+        cls._overlay_rects = []
+        cls._full_frame_dirty = True
+        cls._base_layer_owner = None
+        cls._base_layer_state = None
+        cls._last_present_tick = None
+
+        timekeeper.Timekeeper.add_post_tick_callback(cls.present)
+
+    @classmethod
+    def mark_dirty(cls, rect):
+        """Marks a region of the main display as changed.
+
+        Args:
+            cls: class object.
+            rect: pygame Rect or (x, y, width, height) tuple for the region.
+        """
+
+        if rect:
+            cls._dirty_rects.append(pygame.Rect(rect))
+
+    @classmethod
+    def mark_overlay(cls, rect):
+        """Marks a region of the main display as covered by an overlay.
+
+        The region is marked as dirty, and will be marked as dirty again
+        the next time the base layer is redrawn over it.
+
+        Args:
+            cls: class object.
+            rect: pygame Rect or (x, y, width, height) tuple for the region.
+        """
+
+        if rect:
+            overlay_rect = pygame.Rect(rect)
+            cls._dirty_rects.append(overlay_rect)
+            cls._overlay_rects.append(overlay_rect)
+
+    @classmethod
+    def mark_full_frame_dirty(cls):
+        """Marks the whole main display as changed.
+
+        Whoever owned the base layer will have to mark the full frame
+        as dirty the next time it redraws.
+        """
+
+        cls._full_frame_dirty = True
+        cls._base_layer_owner = None
+        cls._base_layer_state = None
+
+    @classmethod
+    def claim_base_layer(cls, owner, state=None):
+        """Records that the owner has just redrawn the whole base layer.
+
+        Overlays drawn before this call have been drawn over, so their
+        regions are marked as dirty. If a different owner drew the base
+        layer last, or if the owner's state changed, the full frame is
+        marked as dirty.
+
+        Args:
+            cls: class object.
+            owner: the object that redrew the base layer.
+            state: hashable value describing everything about the base
+                layer that is not tracked by dirty regions, such as
+                the current map and its scroll position.
+
+        Returns:
+            True if the owner only needs to mark the regions that changed
+            since its previous redraw, False if the full frame has been
+            marked as dirty.
+        """
+
+        unchanged = (cls._base_layer_owner is owner) \
+            and (cls._base_layer_state == state)
+
+        cls._dirty_rects.extend(cls._overlay_rects)
+        cls._overlay_rects = []
+
+        if not unchanged:
+            cls._full_frame_dirty = True
+
+        cls._base_layer_owner = owner
+        cls._base_layer_state = state
+
+        return unchanged
+
+    @classmethod
+    def present(cls, force=False, full_frame=False):
+        """Presents the dirty regions to the pygame display.
+
+        Presents at most once per clock tick unless force is True. Dirty
+        regions that are not presented are kept for the next present, which
+        happens at the latest right after the next clock tick.
+
+        Frame loops pass force=True for the present at the end of each
+        frame, so that a present made earlier in the same tick, such as
+        one in the middle of a protagonist step, does not hold the end of
+        the frame back until after the next tick.
+
+        Args:
+            cls: class object.
+            force: if True, present even if a present already happened
+                during the current clock tick. Use this at the end of a
+                frame and before pausing without ticking the clock.
+            full_frame: if True, mark the full frame as dirty first.
+
+        Returns:
+            True if the pygame display was updated, False otherwise.
+        """
+
+        if full_frame:
+            cls.mark_full_frame_dirty()
+
+        if not cls._full_frame_dirty and not cls._dirty_rects:
+            return False
+
+        curr_tick = timekeeper.Timekeeper.get_tick_count()
+
+        if (not force) and (curr_tick == cls._last_present_tick):
+            return False
+
+        start_time = perfhud.PerfHud.start_timer()
+
+        if (not cls.enabled) or cls._full_frame_dirty:
+            pygame.display.update()
+        else:
+            # Drop rects that are covered by other dirty rects.
+            present_rects = []
+            for rect in sorted(
+                    cls._dirty_rects,
+                    key=lambda r: r.width * r.height,
+                    reverse=True
+                ):
+                if not any(r.contains(rect) for r in present_rects):
+                    present_rects.append(rect)
+
+            dirty_area = 0
+            for rect in present_rects:
+                dirty_area = dirty_area + (rect.width * rect.height)
+
+            if dirty_area > (
+                    FULL_FRAME_DIRTY_AREA_FRACTION \
+                    * viewingdata.MAIN_DISPLAY_WIDTH \
+                    * viewingdata.MAIN_DISPLAY_HEIGHT
+                ):
+                pygame.display.update()
+            else:
+                pygame.display.update(present_rects)
+
+        cls._dirty_rects = []
+        cls._full_frame_dirty = False
+        cls._last_present_tick = curr_tick
+
+        perfhud.PerfHud.stop_timer(perfhud.SECTION_PRESENT, start_time)
+
+        return True
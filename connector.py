@@ -14,5 +14,4 @@ class Connector:
         self.dest_y_coord = dest_y_coord
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
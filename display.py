@@ -1,10 +1,17 @@
 import logging
 import math
 import pygame
+import assetloader
+import compositor
 import fontinfo
+import imageloader
 import imagepaths
 import language
 import menuoptions
+import perfhud
+import profiling
+import renderbatch
+import tracelog
 import viewingdata
 
 SIZE_TEST_STRING = "abcdefghijklmnopqrstuvwxyz" \
@@ -234,6 +241,11 @@ class Display(object):
         self.background_image = None
         self.get_background_image()
 
+        # If True, blitting the Display marks its area as an overlay for
+        # the compositor. Displays that are redrawn as part of a viewing's
+        # base layer should set this to False.
+        self.is_overlay = True
+
     # Does not update display, caller must do that.
     def blit_background(
             self,
@@ -296,6 +308,9 @@ class Display(object):
                     target_rect,
                 )
 
+            if self.is_overlay:
+                compositor.Compositor.mark_overlay(target_rect)
+
     @classmethod
     def get_background_pattern_default(cls, width, height):
         background = None
@@ -504,9 +519,9 @@ class Display(object):
                 )
         elif self.background_image_path:
             # Load image if path is provided.
-            background = pygame.image.load(
+            background = imageloader.ImageLoader.load_image(
                 self.background_image_path
-            ).convert_alpha()
+            )
         elif self.background_color:
             background = pygame.Surface(
                 (self.display_rect.width, self.display_rect.height),
@@ -571,44 +586,61 @@ class Display(object):
     @classmethod
     def init_background_patterns(cls):
         cls.pattern_data[PATTERN_1_ID] = {}
-        cls.pattern_data[PATTERN_1_ID][NW_CORNER_ID] = pygame.image.load(
+        cls.pattern_data[PATTERN_1_ID][NW_CORNER_ID] = imageloader.ImageLoader.load_image(
             imagepaths.PATTERN_1_CORNER_NW_PATH
-        ).convert_alpha()
-        cls.pattern_data[PATTERN_1_ID][NE_CORNER_ID] = pygame.image.load(
+        )
+        cls.pattern_data[PATTERN_1_ID][NE_CORNER_ID] = imageloader.ImageLoader.load_image(
             imagepaths.PATTERN_1_CORNER_NE_PATH
-        ).convert_alpha()
-        cls.pattern_data[PATTERN_1_ID][SE_CORNER_ID] = pygame.image.load(
+        )
+        cls.pattern_data[PATTERN_1_ID][SE_CORNER_ID] = imageloader.ImageLoader.load_image(
             imagepaths.PATTERN_1_CORNER_SE_PATH
-        ).convert_alpha()
-        cls.pattern_data[PATTERN_1_ID][SW_CORNER_ID] = pygame.image.load(
+        )
+        cls.pattern_data[PATTERN_1_ID][SW_CORNER_ID] = imageloader.ImageLoader.load_image(
             imagepaths.PATTERN_1_CORNER_SW_PATH
-        ).convert_alpha()
+        )
 
     @classmethod
     def add_font_to_listing(cls, font_id, font_obj):
         if font_obj and (font_id is not None):
             cls.font_listing[font_id] = font_obj
 
+    # Returns the font for the given font ID, loading it first if it
+    # has not been loaded yet.
     @classmethod
     def get_font(cls, font_id):
-        return cls.font_listing.get(font_id, None)
+        ret_font = cls.font_listing.get(font_id, None)
 
+        if (ret_font is None) and (font_id in fontinfo.FONT_INFO):
+            ret_font = cls.load_font(font_id)
+
+        return ret_font
+
+    # Loads the font for the given font ID and adds it to the font listing.
+    # Returns the font, or None if it could not be loaded.
     @classmethod
-    def init_fonts(cls):
-        for font_id, font_info in fontinfo.FONT_INFO.items():
-            font_obj = pygame.font.Font(
-                font_info.get(
-                    fontinfo.FONT_PATH_FIELD,
-                    fontinfo.FONT_PATH_DEFAULT,
-                ),
-                font_info.get(
-                    fontinfo.FONT_SIZE_FIELD,
-                    fontinfo.FONT_SIZE_DEFAULT
-                )
+    def load_font(cls, font_id):
+        font_info = fontinfo.FONT_INFO[font_id]
+
+        font_obj = assetloader.AssetLoader.get_font(
+            font_info.get(
+                fontinfo.FONT_PATH_FIELD,
+                fontinfo.FONT_PATH_DEFAULT,
+            ),
+            font_info.get(
+                fontinfo.FONT_SIZE_FIELD,
+                fontinfo.FONT_SIZE_DEFAULT
             )
+        )
+
+        if font_obj:
+            cls.add_font_to_listing(font_id, font_obj)
 
-            if font_obj:
-                cls.add_font_to_listing(font_id, font_obj)
+        return font_obj
+
+    @classmethod
+    def init_fonts(cls):
+        for font_id in fontinfo.FONT_INFO:
+            cls.load_font(font_id)
 
 class TextDisplay(Display):
     # If no background image is specified, default to background_color.
@@ -693,9 +725,9 @@ class TextDisplay(Display):
         self.continue_icon = None
         if continue_icon_image_path:
             # Load image if path is provided.
-            self.continue_icon = pygame.image.load(
+            self.continue_icon = imageloader.ImageLoader.load_image(
                 continue_icon_image_path
-            ).convert_alpha()
+            )
 
     @classmethod
     def get_char_per_line(cls, horizontal_pixels, font_object):
@@ -778,12 +810,6 @@ class TextDisplay(Display):
                 if last_word:
                     ret_list.append(last_word)
 
-        LOGGER.debug(
-            "Converted %s to word list %s",
-            text_string,
-            ret_list,
-        )
-
         return ret_list
 
     # Given a text string to display, returns a list of strings,
@@ -807,12 +833,6 @@ class TextDisplay(Display):
             for line in text_string_lines:
                 word_list = TextDisplay.convert_to_word_list(line)
 
-                LOGGER.debug(
-                    "Get text lines. Text: %s\nWord List:%s",
-                    line,
-                    word_list,
-                )
-
                 curr_length = 0
                 start_index = 0
 
@@ -828,12 +848,6 @@ class TextDisplay(Display):
 
                         word_length = len(word_list[index])
 
-                        LOGGER.debug(
-                            "Word length for %s is %d",
-                            word_list[index],
-                            word_length,
-                        )
-
                         # Check if we can add this word or not.
                         if (curr_length + word_length) > self.char_per_line:
                             # Adding this word would bring us over the limit.
@@ -863,27 +877,20 @@ class TextDisplay(Display):
 
                             if str_to_add:
                                 text_lines.append(str_to_add)
-                                LOGGER.debug(
-                                    "Adding string %s to text lines",
-                                    str_to_add,
-                                )
 
                     if start_index == (num_words - 1):
                         # We still need to add the last word.
                         str_to_add = word_list[start_index]
                         text_lines.append(str_to_add)
-                        LOGGER.debug(
-                            "Adding string %s to text lines",
-                            str_to_add,
-                        )
 
         if text_lines:
             ret_lines = text_lines
 
-        LOGGER.debug(
-            "Converted text \n%s\nto lines\n%s\n",
+        tracelog.TraceLog.record(
+            tracelog.EVENT_TEXT_LINES,
             text_string,
-            ret_lines,
+            len(ret_lines),
+            self.char_per_line,
         )
 
         return ret_lines
@@ -1028,6 +1035,7 @@ class TextDisplay(Display):
     # will correspond to the next. If text_to_display is a list of strings
     # and font_color is a single tuple, then that color will apply
     # to each text string in text_to_display.
+    @profiling.profile_scope('TextDisplay.get_text_pages')
     def get_text_pages(self, text_to_display, font_color=viewingdata.COLOR_BLACK):
         ret_page_list = []
         page_list = []
@@ -1122,6 +1130,8 @@ class TextDisplay(Display):
                 '\n#\n'.join(page.text_lines)
             )
 
+        profiling.Profiler.count('text pages', len(ret_page_list))
+
         return ret_page_list
 
     def get_page_height(self, num_lines_in_page):
@@ -1156,6 +1166,8 @@ class TextDisplay(Display):
             vertical_orientation=ORIENTATION_CENTERED,
         ):
         if surface and text_page:
+            start_time = perfhud.PerfHud.start_timer()
+
             text_space_rect = self.text_space_rect
 
             if alternative_top_left:
@@ -1248,6 +1260,8 @@ class TextDisplay(Display):
                     * self.text_height
                 )
 
+            perfhud.PerfHud.stop_timer(perfhud.SECTION_BLIT_TEXT, start_time)
+
 class MenuDisplay(TextDisplay):
     # If no background image is specified, default to background_color.
     # For best results, ensure that background_image_path points to an image
@@ -1284,9 +1298,9 @@ class MenuDisplay(TextDisplay):
         self.selection_icon = None
         if selection_icon_image_path:
             # Load image if path is provided.
-            self.selection_icon = pygame.image.load(
+            self.selection_icon = imageloader.ImageLoader.load_image(
                 selection_icon_image_path
-            ).convert_alpha()
+            )
 
         if not self.selection_icon:
             LOGGER.error("Error setting up selection icon for menu.")
@@ -1533,9 +1547,9 @@ class IconGridDisplay(Display):
         continue_icon_width = 0
 
         if continue_up_icon_image_path:
-            self.continue_up_icon = pygame.image.load(
+            self.continue_up_icon = imageloader.ImageLoader.load_image(
                 continue_up_icon_image_path
-            ).convert_alpha()
+            )
 
             continue_icon_width = max(
                 continue_icon_width,
@@ -1543,9 +1557,9 @@ class IconGridDisplay(Display):
             )
 
         if continue_down_icon_image_path:
-            self.continue_down_icon = pygame.image.load(
+            self.continue_down_icon = imageloader.ImageLoader.load_image(
                 continue_down_icon_image_path
-            ).convert_alpha()
+            )
 
             continue_icon_width = max(
                 continue_icon_width,
@@ -1604,9 +1618,9 @@ class IconGridDisplay(Display):
 
         self.selection_image = None
         if selection_image_path:
-            self.selection_image = pygame.image.load(
+            self.selection_image = imageloader.ImageLoader.load_image(
                 selection_image_path
-            ).convert_alpha()
+            )
 
         # Set up continue icon rects.
         self.continue_up_rect = None
@@ -1732,6 +1746,8 @@ class IconGridDisplay(Display):
             horizontal_offset = 0
             vertical_offset = 0
 
+            batch = renderbatch.RenderBatch()
+
             # Blit icon and quantity text if needed.
             icon_rect = pygame.Rect(
                 icon_space_rect.x + horizontal_offset,
@@ -1774,26 +1790,28 @@ class IconGridDisplay(Display):
                         center=icon_rect.center
                     )
 
-                    surface.blit(
+                    batch.add(
                         self.selection_image,
                         select_image_rect,
                     )
 
                 if icon_image:
-                    surface.blit(
+                    batch.add(
                         icon_image,
                         icon_rect,
                     )
 
                 if rendered_supertext:
                     text_top_left = icon_rect.topleft
-                    surface.blit(
+                    batch.add(
                         rendered_supertext,
                         text_top_left,
                     )
 
                 curr_index += 1
 
+            batch.submit(surface)
+
             # Blit the up and down arrows if there are icons above/below.
             if (starting_index >= self.num_columns) and show_continue_icon:
                 # We have at least 1 row above us.
@@ -1811,6 +1829,5 @@ class IconGridDisplay(Display):
                 )
 
 # Set up logger.
-logging.basicConfig(level=logging.INFO)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
@@ -14,6 +14,7 @@ import inventory
 import itemdata
 import directions
 import spells
+import timekeeper
 import magicdata
 
 ### CONSTANTS ###
@@ -432,7 +433,7 @@ class Entity(interactiveobj.InteractiveObject):
                     surface,
                     bottom_left_pixel=bottom_left_pixel,
                     top_left_pixel=top_left_pixel,
-                    blit_time_ms=pygame.time.get_ticks(),
+                    blit_time_ms=timekeeper.Timekeeper.get_time_ms(),
                 )
 
     @classmethod
@@ -542,7 +543,7 @@ class Protagonist(Character):
         self.curr_spell_book = magicdata.SPELL_BOOK_NORMAL
 
         # Time in MS of last refresh.
-        self.last_refresh_time_ms = pygame.time.get_ticks()
+        self.last_refresh_time_ms = timekeeper.Timekeeper.get_game_time_ms()
 
         # TODO make max_size constant. Add items here?
         self.tool_inventory = inventory.Inventory.inventory_factory(max_size=10)
@@ -568,8 +569,8 @@ class Protagonist(Character):
     def refresh_self(self):
         """Refreshes self, including attributes like run energy and health."""
 
-        # Get elapsed time since last refresh.
-        curr_time_ms = pygame.time.get_ticks()
+        # Get elapsed game time since last refresh.
+        curr_time_ms = timekeeper.Timekeeper.get_game_time_ms()
 
         elapsed_ms = curr_time_ms - self.last_refresh_time_ms
 
@@ -684,6 +685,5 @@ class Protagonist(Character):
         return protagonist
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
@@ -3,6 +3,7 @@ import display
 import viewingdata
 import equipmentslot
 import equipmentdata
+import imageloader
 import imagepaths
 import language
 import logging
@@ -33,15 +34,15 @@ class EquipmentDisplay(display.Display):
 
         self.selection_image = None
         if selection_image_path:
-            self.selection_image = pygame.image.load(
+            self.selection_image = imageloader.ImageLoader.load_image(
                 selection_image_path
-            ).convert_alpha()
+            )
 
         self.non_selection_image = None
         if non_selection_image_path:
-            self.non_selection_image = pygame.image.load(
+            self.non_selection_image = imageloader.ImageLoader.load_image(
                 non_selection_image_path
-            ).convert_alpha()
+            )
 
         self.icon_display_rect = pygame.Rect(
             display_rect.x + self.horizontal_padding,
@@ -221,6 +222,5 @@ class EquipmentDisplay(display.Display):
                             )
 
 # set up logger
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
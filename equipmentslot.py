@@ -52,9 +52,16 @@ class EquipmentSlot(viewingicon.ViewingIcon):
 
     @classmethod
     def get_slot_object(cls, slot_id):
-        """Returns the slot object for the given slot ID."""
+        """Returns the slot object for the given slot ID, creating it
+        first if it has not been created yet."""
 
-        return cls.slot_listing.get(slot_id, None)
+        ret_slot = cls.slot_listing.get(slot_id, None)
+
+        if (ret_slot is None) \
+                and (slot_id in equipmentdata.EQUIPMENT_SLOT_DATA):
+            ret_slot = cls.equipment_slot_factory(slot_id)
+
+        return ret_slot
 
     # Adds/updates the equipment slot object listing for the given object ID.
     # Returns True upon success, false otherwise.
@@ -90,7 +97,7 @@ class EquipmentSlot(viewingicon.ViewingIcon):
         ret_object = None
 
         # Check if we already have the item made.
-        slot_from_listing = cls.get_slot_object(slot_id)
+        slot_from_listing = cls.slot_listing.get(slot_id, None)
 
         if slot_from_listing:
             # Return the already made item.
@@ -170,6 +177,5 @@ class EquipmentSlot(viewingicon.ViewingIcon):
                 sys.exit(2)
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
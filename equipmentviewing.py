@@ -1,4 +1,5 @@
 import pygame
+import compositor
 import viewing
 import viewingdata
 import equipmentdisplay
@@ -7,6 +8,7 @@ import imagepaths
 import fontinfo
 import menuoptions
 import language
+import replay
 import timekeeper
 import inventory
 import selectionviewing
@@ -656,12 +658,12 @@ class EquipmentViewing(selectionviewing.ItemSelectionGridViewing):
                             reference_entity=reference_entity,
                         )
 
-                    pygame.display.update()
+                    compositor.Compositor.present()
 
                 while not received_input:
                     timekeeper.Timekeeper.tick()
 
-                    for events in pygame.event.get():
+                    for events in replay.Replay.get_events():
                         if events.type == pygame.QUIT:
                             pygame.quit()
                             sys.exit(0)
@@ -724,7 +726,7 @@ class EquipmentViewing(selectionviewing.ItemSelectionGridViewing):
                                     curr_selection_info,
                                     reference_entity=reference_entity,
                                 )
-                            pygame.display.update()
+                            compositor.Compositor.present()
 
                     elif movement_dir is not None:
                         # Move to other slot if possible.
@@ -773,6 +775,5 @@ class EquipmentViewing(selectionviewing.ItemSelectionGridViewing):
         return ret_viewing
 
 # set up logger
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -4,6 +4,8 @@ import pprint
 import re
 import sys
 import pygame
+import assetloader
+import compositor
 import directions
 import display
 import entity
@@ -20,15 +22,22 @@ import language
 import magicdata
 import mapdata
 import menuoptions
+import movement
+import perfhud
+import profiling
+import replay
 import savefiledata
+import scheduler
 import selectionviewing
 import skills
 import spells
 import spellselectionviewing
 import tiledata
 import timekeeper
+import tracelog
 import viewing
 import viewingdata
+import viewingicon
 
 ### GAME CONSTANTS ###
 GAME_TITLE = "Adventure Game v0.1"
@@ -67,56 +76,100 @@ class Game(object):
                 self.main_display_screen,
             )
 
-        # Create inventory viewing and toolbelt viewings for overworld..
-        self.overworld_inventory_viewing = \
-            selectionviewing.ItemSelectionGridViewing.create_item_selection_grid_viewing(
-                self.main_display_screen,
-                itemdata.ITEM_ICON_DIMENSIONS,
-                display_pattern=display.PATTERN_2_ID,
-            )
-
-        self.overworld_toolbelt_viewing = \
-            selectionviewing.ItemSelectionGridViewing.create_item_selection_grid_viewing(
-                self.main_display_screen,
-                itemdata.ITEM_ICON_DIMENSIONS,
-                display_pattern=display.PATTERN_2_ID,
-            )
-
-        self.overworld_equipment_viewing = \
-            equipmentviewing.EquipmentViewing.create_equipment_viewing(
-                self.main_display_screen,
-                itemdata.ITEM_ICON_DIMENSIONS,
-                display_pattern=display.PATTERN_2_ID,
-            )
-
-        self.overworld_spell_viewing = \
-            spellselectionviewing.SpellSelectionViewing.create_spell_selection_viewing(
-                self.main_display_screen,
-                magicdata.SPELL_ICON_DIMENSIONS,
-                display_pattern=display.PATTERN_2_ID,
-            )
-
         if not self.overworld_viewing:
             LOGGER.error("Failed to create overworld viewing.")
             sys.exit(1)
-        elif not self.overworld_inventory_viewing:
-            LOGGER.error("Failed to create overworld inventory viewing.")
-            sys.exit(1)
-        elif not self.overworld_toolbelt_viewing:
-            LOGGER.error("Failed to create overworld toolbelt viewing.")
-            sys.exit(1)
-        elif not self.overworld_equipment_viewing:
-            LOGGER.error("Failed to create overworld equipment viewing.")
-            sys.exit(1)
-        elif not self.overworld_spell_viewing:
-            LOGGER.error("Failed to create overworld spell viewing.")
-            sys.exit(1)
         else:
             LOGGER.debug("Created viewing objects.")
 
+        # The inventory, toolbelt, equipment and spell viewings are created
+        # the first time they are opened.
+        self._overworld_inventory_viewing = None
+        self._overworld_toolbelt_viewing = None
+        self._overworld_equipment_viewing = None
+        self._overworld_spell_viewing = None
+
         # Set default difficulty to normal.
         self.difficulty = DIFFICULTY_NORMAL
 
+    @property
+    def overworld_inventory_viewing(self):
+        """Returns the overworld inventory viewing, creating it first if
+        needed."""
+
+        if self._overworld_inventory_viewing is None:
+            self._overworld_inventory_viewing = \
+                selectionviewing.ItemSelectionGridViewing.create_item_selection_grid_viewing(
+                    self.main_display_screen,
+                    itemdata.ITEM_ICON_DIMENSIONS,
+                    display_pattern=display.PATTERN_2_ID,
+                )
+
+            if not self._overworld_inventory_viewing:
+                LOGGER.error("Failed to create overworld inventory viewing.")
+                sys.exit(1)
+
+        return self._overworld_inventory_viewing
+
+    @property
+    def overworld_toolbelt_viewing(self):
+        """Returns the overworld toolbelt viewing, creating it first if
+        needed."""
+
+        if self._overworld_toolbelt_viewing is None:
+            self._overworld_toolbelt_viewing = \
+                selectionviewing.ItemSelectionGridViewing.create_item_selection_grid_viewing(
+                    self.main_display_screen,
+                    itemdata.ITEM_ICON_DIMENSIONS,
+                    display_pattern=display.PATTERN_2_ID,
+                )
+
+            if not self._overworld_toolbelt_viewing:
+                LOGGER.error("Failed to create overworld toolbelt viewing.")
+                sys.exit(1)
+
+        return self._overworld_toolbelt_viewing
+
+    @property
+    def overworld_equipment_viewing(self):
+        """Returns the overworld equipment viewing, creating it first if
+        needed."""
+
+        if self._overworld_equipment_viewing is None:
+            self._overworld_equipment_viewing = \
+                equipmentviewing.EquipmentViewing.create_equipment_viewing(
+                    self.main_display_screen,
+                    itemdata.ITEM_ICON_DIMENSIONS,
+                    display_pattern=display.PATTERN_2_ID,
+                )
+
+            if not self._overworld_equipment_viewing:
+                LOGGER.error("Failed to create overworld equipment viewing.")
+                sys.exit(1)
+
+        return self._overworld_equipment_viewing
+
+    @property
+    def overworld_spell_viewing(self):
+        """Returns the overworld spell viewing, creating it first if
+        needed."""
+
+        if self._overworld_spell_viewing is None:
+            self._overworld_spell_viewing = \
+                spellselectionviewing.SpellSelectionViewing.create_spell_selection_viewing(
+                    self.main_display_screen,
+                    magicdata.SPELL_ICON_DIMENSIONS,
+                    display_pattern=display.PATTERN_2_ID,
+                )
+
+            if not self._overworld_spell_viewing:
+                LOGGER.error("Failed to create overworld spell viewing.")
+                sys.exit(1)
+
+            self._overworld_spell_viewing.protagonist = self.protagonist
+
+        return self._overworld_spell_viewing
+
     # TODO document
     # centers map automatically depending on where protagonist is
     # DOES NOT UPDATE SURFACE
@@ -140,6 +193,9 @@ class Game(object):
                 protag_tile_location,
             )
 
+            # Stream in the maps the protagonist can walk to next.
+            assetloader.AssetLoader.request_adjacent_maps(curr_map)
+
             LOGGER.info(
                 "Protag location: %s",
                 self.curr_map.protagonist_location
@@ -152,7 +208,9 @@ class Game(object):
         # Associate protag with game and viewing.
         self.protagonist = protagonist
         self.overworld_viewing.protagonist = protagonist
-        self.overworld_spell_viewing.protagonist = protagonist
+
+        if self._overworld_spell_viewing:
+            self._overworld_spell_viewing.protagonist = protagonist
 
     def set_protagonist_tile_position(self, new_position):
         """Sets protagonist position on the current map."""
@@ -270,7 +328,7 @@ class Game(object):
             )
 
             # Update display to show changes.
-            pygame.display.update()
+            compositor.Compositor.present()
 
     # moves protagonist in the direction specified,
     # using the specified transportation type
@@ -278,10 +336,12 @@ class Game(object):
     # screen updates.  Successful moves across different maps will
     # also trigger map changes and associated display changes.
     # Returns True if successful move, False otherwise.
+    @profiling.profile_scope('Game.move_protagonist')
     def move_protagonist(
             self,
             protag_move_dir,
             transportation_type,
+            wait_for_scroll=True,
         ):
         """Moves the protagonist, if possible, in the specified direction using
         the given transportation type, and returns True upon successful move,
@@ -303,6 +363,10 @@ class Game(object):
             transportation_type: transportation flag that indicates what
                 transportation method the protagonist is using (e.g. walking
                 vs. flying vs. sailing)
+            wait_for_scroll: if True, return once the map has scrolled
+                to the new tile. If False, only start the scroll; the caller
+                must then finish it with the overworld viewing's
+                advance_scroll_step.
 
         Returns:
             True upon successful move, False otherwise.
@@ -344,23 +408,14 @@ class Game(object):
         # Check for out of bounds destination.
         if self.curr_map.location_within_bounds(intended_dest_tile_loc):
             # Check if the destination tile is reachable with given
-            # transportation type.
-            if self.curr_map.valid_transportation(
+            # transportation type and not occupied by an interactive object.
+            if self.curr_map.can_occupy(
                     intended_dest_tile_loc,
                     transportation_type
                 ):
-                # Check if the intended dest tile is occupied by
-                # an interactive object.
-                if self.curr_map.tile_occupied(intended_dest_tile_loc):
-                    # Object is in the way.
-                    LOGGER.debug(
-                        "Cannot move to occupied dest tile %s",
-                        intended_dest_tile_loc
-                    )
-                else:
-                    # We can move here.
-                    real_dest_tile_loc = intended_dest_tile_loc
-                    can_move = True
+                # We can move here.
+                real_dest_tile_loc = intended_dest_tile_loc
+                can_move = True
             else:
                 LOGGER.debug(
                     "Cannot move to destination tile %s with transportation type %s",
@@ -377,25 +432,15 @@ class Game(object):
                 dest_map = gamemap.Map.get_map(dest_map_id)
                 real_dest_tile_loc = adj_map_info[1]
 
-                # Make sure dest tile is reachable
-                # with given transportation method.
-                is_valid_transport = dest_map.valid_transportation(
-                    real_dest_tile_loc,
-                    transportation_type
-                )
-
-                if dest_map and is_valid_transport:
-                    # Check if the tile is occupied by an interactive object.
-                    if dest_map.tile_occupied(real_dest_tile_loc):
-                        # Object is in the way.
-                        LOGGER.debug(
-                            "Cannot move to occupied dest tile %s",
-                            real_dest_tile_loc
-                        )
-                    else:
-                        # We can move here.
-                        can_move = True
-                        changing_maps = True
+                # Make sure dest tile is reachable with given
+                # transportation method and not occupied.
+                if dest_map and dest_map.can_occupy(
+                        real_dest_tile_loc,
+                        transportation_type
+                    ):
+                    # We can move here.
+                    can_move = True
+                    changing_maps = True
                 else:
                     LOGGER.debug(
                         "Cannot reach tile position %s on map %s with" + \
@@ -429,11 +474,18 @@ class Game(object):
                 )
             else:
                 # Same map, just scroll.
-                self.overworld_viewing.scroll_map_single_tile(
-                    map_scroll_dir,
-                    protag_move_dir,
-                    run=run,
-                )
+                if wait_for_scroll:
+                    self.overworld_viewing.scroll_map_single_tile(
+                        map_scroll_dir,
+                        protag_move_dir,
+                        run=run,
+                    )
+                else:
+                    self.overworld_viewing.start_scroll_step(
+                        map_scroll_dir,
+                        protag_move_dir,
+                        run=run,
+                    )
 
                 # Reduce run energy if applicable.
                 if run and transportation_type & tiledata.WALKABLE_F:
@@ -451,6 +503,62 @@ class Game(object):
 
         return can_move
 
+    def start_protagonist_step(self, protag_move_dir):
+        """Turns the protagonist and starts a step in the direction without
+        waiting for the map to scroll.
+
+        Args:
+            protag_move_dir: direction ID to move the protagonist in.
+
+        Returns:
+            True if the map started scrolling, False otherwise.
+        """
+
+        # TODO for now, just stick with walking
+        transport_type = tiledata.WALKABLE_F
+
+        # Make protagonist face the direction and update tile
+        # that protagonist is on to clear the previous protagonist
+        # sprite image. This will update display.
+        self.turn_protagonist(protag_move_dir)
+
+        # Attempt to move the protagonist.
+        if self.move_protagonist(
+                protag_move_dir,
+                transport_type,
+                wait_for_scroll=False,
+            ):
+            LOGGER.debug(
+                "Protagonist tile_pos: %s",
+                self.curr_map.protagonist_location
+            )
+
+        return self.overworld_viewing.scroll_step_in_progress()
+
+    def advance_protagonist_step(self, curr_time_ms):
+        """Draws the protagonist step in progress as of the given time.
+
+        Args:
+            curr_time_ms: time in milliseconds, as given by
+                timekeeper.Timekeeper.get_time_ms. If None, finishes the
+                step at once.
+
+        Returns:
+            True once the step is finished, False otherwise.
+        """
+
+        return self.overworld_viewing.advance_scroll_step(curr_time_ms)
+
+    def end_protagonist_step(self):
+        """Updates the map and display after a protagonist step."""
+
+        LOGGER.debug(
+            "Map top left now at %s",
+            self.curr_map.top_left_position
+        )
+
+        self.refresh_and_blit_overworld_viewing()
+
     def turn_protagonist(self, direction_to_face):
         """Turns the protagonist in the specified direction.
 
@@ -580,6 +688,13 @@ class Game(object):
             # Sort inventory first before displaying it.
             self.protagonist.inventory.standard_sort()
 
+            # Load the icons of the items about to be shown.
+            shown_icons = [
+                items.Item.get_item(item_entry[0])
+                for item_entry in self.protagonist.inventory.item_listing_data
+            ]
+            viewingicon.ViewingIcon.prefetch_icons(shown_icons)
+
             done = False
             curr_index = 0
             preset_top_viewing_row_index = None
@@ -693,6 +808,9 @@ class Game(object):
                     else:
                         done = True
 
+            # Hand the item icons back now that the inventory is closed.
+            viewingicon.ViewingIcon.unload_icons(shown_icons)
+
             #self.overworld_viewing.refresh_and_blit_self()
         else:
             LOGGER.warn("No overworld inventory viewing or protagonist set.")
@@ -739,6 +857,14 @@ class Game(object):
         """
 
         if self.overworld_equipment_viewing and self.protagonist:
+            # Load the icons of the equipped items about to be shown.
+            shown_icons = [
+                equipment_info[1]
+                for equipment_info in self.protagonist.equipment_dict.values()
+                if equipment_info
+            ]
+            viewingicon.ViewingIcon.prefetch_icons(shown_icons)
+
             self.overworld_equipment_viewing.blit_selection_background(
                 viewingdata.EQUIPMENT_VIEWING_NAME_INFO,
                 bottom_text=None,
@@ -755,6 +881,9 @@ class Game(object):
             LOGGER.info("Ret info from equipment viewing: %s", ret_info)
             # TODO handle ret_info.
 
+            # Hand the equipment icons back now that the viewing is closed.
+            viewingicon.ViewingIcon.unload_icons(shown_icons)
+
             #self.overworld_viewing.refresh_and_blit_self()
         else:
             LOGGER.warn("No overworld equipment viewing or protagonist set.")
@@ -776,6 +905,13 @@ class Game(object):
             )
             LOGGER.info("%s", spell_book_name_info)
 
+            # Load the icons of the spells about to be shown.
+            shown_icons = [
+                spells.Spell.get_spell(spell_id)
+                for spell_id in (spell_id_list or [])
+            ]
+            viewingicon.ViewingIcon.prefetch_icons(shown_icons)
+
             while not done:
                 ret_info = self.overworld_spell_viewing.handle_selection_area(
                     spell_book_name_info,
@@ -813,6 +949,9 @@ class Game(object):
                     else:
                         done = True
 
+            # Hand the spell icons back now that the spellbook is closed.
+            viewingicon.ViewingIcon.unload_icons(shown_icons)
+
             #self.overworld_viewing.refresh_and_blit_self()
         else:
             LOGGER.warn("No overworld spell viewing or protagonist set.")
@@ -827,7 +966,7 @@ class Game(object):
             self.change_language(language.LANG_ENGLISH)
 
         # Update display.
-        pygame.display.update()
+        compositor.Compositor.present()
 
     def change_language(self, new_language):
         """Changes the game language to the specified language.
@@ -854,7 +993,7 @@ class Game(object):
         self.overworld_viewing.refresh_and_blit_self()
 
         if display_update:
-            pygame.display.update()
+            compositor.Compositor.present()
 
     # Blits text in bottom text box.
     # If refresh_after is True, refreshes
@@ -1103,7 +1242,8 @@ class Game(object):
             )
 
             # Reset last refresh time.
-            self.protagonist.last_refresh_time_ms = pygame.time.get_ticks()
+            self.protagonist.last_refresh_time_ms = \
+                timekeeper.Timekeeper.get_game_time_ms()
 
     def load_saved_map_info(self, save_data):
         """Loads the saved map info contained in save_data.
@@ -1120,7 +1260,8 @@ class Game(object):
                 if map_obj:
                     # TODO load changed map data.
 
-                    map_obj.last_refresh_time_ms = pygame.time.get_ticks()
+                    map_obj.last_refresh_time_ms = \
+                        timekeeper.Timekeeper.get_game_time_ms()
 
             # Set map and protagonist location.
             self.set_and_blit_game_map(
@@ -1341,66 +1482,127 @@ class Game(object):
 
         continue_playing = True
 
-        # pressed keys
-        pressed_right = False
-        pressed_left = False
-        pressed_up = False
-        pressed_down = False
-        protag_move_dir = None
+        # Direction keys and the directions they move in.
+        direction_keys = {
+            pygame.K_RIGHT: directions.DIR_EAST,
+            pygame.K_LEFT: directions.DIR_WEST,
+            pygame.K_UP: directions.DIR_NORTH,
+            pygame.K_DOWN: directions.DIR_SOUTH,
+        }
+
+        movement_controller = movement.MovementController(self)
 
+        # Interact and examine presses wait here until the step in progress
+        # and any queued steps are done. Held directions do not start new
+        # steps while one is waiting.
         interact_in_front = False
         examine_in_front = False
 
-        num_ticks = 0
+        num_sim_steps = 0
+
+        # Whether the overworld needs to be rendered on the next frame, and
+        # the clock time of the next animation change after that, if any.
+        render_needed = True
+        next_render_time_ms = None
 
         while continue_playing:
-            # Tick clock.
-            timekeeper.Timekeeper.tick()
-            num_ticks = num_ticks + 1
+            # Tick clock. Steps are drawn at the scroll frame rate. When
+            # idle, sleep until input arrives or something is due: the next
+            # rendered change, the next refresh or the next world event.
+            if not movement_controller.is_idle():
+                timekeeper.Timekeeper.tick(viewing.SCROLL_FRAME_RATE)
+            elif movement_controller.has_input() \
+                    or interact_in_front or examine_in_front \
+                    or render_needed:
+                timekeeper.Timekeeper.tick()
+            else:
+                next_change_ms = timekeeper.Timekeeper.get_clock_time_for_sim_steps(
+                    timekeeper.OW_REFRESH_TICK_INTERVAL
+                    - (num_sim_steps % timekeeper.OW_REFRESH_TICK_INTERVAL)
+                )
+
+                if next_render_time_ms is not None:
+                    next_change_ms = min(next_change_ms, next_render_time_ms)
 
-            if num_ticks % timekeeper.OW_REFRESH_TICK_INTERVAL == 0:
-                self.refresh_and_blit_overworld_viewing()
-            elif num_ticks % timekeeper.OW_REBLIT_TICK_INTERVAL == 0:
+                next_event_time_ms = scheduler.Scheduler.get_next_due_time_ms()
+                if next_event_time_ms is not None:
+                    next_change_ms = min(
+                        next_change_ms,
+                        timekeeper.Timekeeper.get_clock_time_for_game_time(
+                            next_event_time_ms
+                        ),
+                    )
+
+                # Show everything drawn so far before going idle.
+                compositor.Compositor.present(force=True)
+                timekeeper.Timekeeper.tick_until(next_change_ms)
+
+            # Run the fixed-rate simulation steps that are due, however
+            # long the last frame took.
+            refreshed = False
+            for i in range(timekeeper.Timekeeper.consume_sim_steps()):
+                num_sim_steps = num_sim_steps + 1
+
+                if num_sim_steps % timekeeper.OW_REFRESH_TICK_INTERVAL == 0:
+                    self.overworld_viewing.refresh_self()
+                    refreshed = True
+
+            # Run world events that are due, such as respawns on any map.
+            if scheduler.Scheduler.run_due_events():
+                refreshed = True
+
+            # Render, unless a step is drawing the map, if anything on
+            # screen changed since the last render.
+            curr_time_ms = timekeeper.Timekeeper.get_time_ms()
+            if not movement_controller.is_idle():
+                render_needed = True
+            elif refreshed or render_needed or (
+                    (next_render_time_ms is not None)
+                    and (curr_time_ms >= next_render_time_ms)
+                ):
                 self.overworld_viewing.blit_self()
-                pygame.display.update()
+                compositor.Compositor.present(force=True)
 
-            interact_in_front = False
-            examine_in_front = False
+                render_needed = False
+                next_render_time_ms = \
+                    self.overworld_viewing.get_next_visible_change_ms(
+                        curr_time_ms
+                    )
 
-            for events in pygame.event.get():
+            for events in replay.Replay.get_events():
                 if events.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit(0)
                 elif events.type == pygame.KEYDOWN:
-                    if events.key == pygame.K_RIGHT:
-                        pressed_right = True
-                        protag_move_dir = directions.DIR_EAST
-                        #move_right = True
-                        LOGGER.debug("Right pressed down")
-                    elif events.key == pygame.K_LEFT:
-                        pressed_left = True
-                        protag_move_dir = directions.DIR_WEST
-                        #move_left = True
-                        LOGGER.debug("Left pressed down")
-                    elif events.key == pygame.K_UP:
-                        pressed_up = True
-                        protag_move_dir = directions.DIR_NORTH
-                        #move_up = True
-                        LOGGER.debug("Up pressed down")
-                    elif events.key == pygame.K_DOWN:
-                        pressed_down = True
-                        protag_move_dir = directions.DIR_SOUTH
-                        #move_down = True
-                        LOGGER.debug("Down pressed down")
+                    # Key presses can change what is on screen.
+                    render_needed = True
+
+                    tracelog.TraceLog.record(
+                        tracelog.EVENT_KEY_DOWN,
+                        events.key,
+                    )
+
+                    if events.key in direction_keys:
+                        movement_controller.press_direction(
+                            direction_keys[events.key]
+                        )
                     elif events.key == pygame.K_SPACE:
                         interact_in_front = True
-                        LOGGER.debug("Space pressed down")
                     elif events.key == pygame.K_e:
                         examine_in_front = True
-                        LOGGER.debug("Examine key E pressed down")
                     elif events.key == pygame.K_RETURN:
                         examine_in_front = True
-                        LOGGER.debug("Examine key Return (Enter) pressed down")
+                    elif events.key == pygame.K_F3:
+                        # Toggle the performance overlay, and redraw the
+                        # whole frame to clear it when turned off.
+                        perfhud.PerfHud.toggle()
+                        compositor.Compositor.mark_full_frame_dirty()
+                    elif events.key == pygame.K_F4:
+                        # Start or stop a profiling capture.
+                        profiling.Profiler.toggle_capture()
+                    elif events.key == pygame.K_F5:
+                        # Dump the recent trace events.
+                        tracelog.TraceLog.dump()
                     elif events.key == pygame.K_i:
                         # Language switch initiated.
                         LOGGER.info("Language change toggled.")
@@ -1430,7 +1632,9 @@ class Game(object):
                     elif events.key == pygame.K_2:
                         # Display stats. # TESTING TODO.
                         LOGGER.info("Displaying statistics.")
+                        movement_controller.complete_step()
                         self.display_statistics(self.protagonist)
+                        movement_controller.clear_input()
                     elif events.key == pygame.K_3:
                         # Testing inventory.
                         curr_money = \
@@ -1483,6 +1687,7 @@ class Game(object):
                     elif events.key == pygame.K_ESCAPE:
                         # Display menu.
                         LOGGER.info("Displaying menu.")
+                        movement_controller.complete_step()
                         # TODO get menu options.
                         # TESTING.
                         selected_option_id = self.display_overworld_side_menu()
@@ -1497,53 +1702,23 @@ class Game(object):
                         self.refresh_and_blit_overworld_viewing()
 
                         self.process_ow_side_menu_option(selected_option_id)
+                        movement_controller.clear_input()
                 elif events.type == pygame.KEYUP:
-                    if events.key == pygame.K_RIGHT:
-                        pressed_right = False
-                        #move_right = False
-                        LOGGER.debug("Right released")
-                    elif events.key == pygame.K_LEFT:
-                        pressed_left = False
-                        #move_left = False
-                        LOGGER.debug("Left released")
-                    elif events.key == pygame.K_UP:
-                        pressed_up = False
-                        #move_up = False
-                        LOGGER.debug("Up released")
-                    elif events.key == pygame.K_DOWN:
-                        pressed_down = False
-                        #move_down = False
-                        LOGGER.debug("Down released")
-
-            if pressed_up or pressed_down or pressed_right or pressed_left:
-                # TODO for now, just stick with walking
-                transport_type = tiledata.WALKABLE_F
-
-                # Make protagonist face the direction and update tile
-                # that protagonist is on to clear the previous protagonist
-                # sprite image. This will update display.
-                self.turn_protagonist(protag_move_dir)
-
-                # Blit top display on top of the current viewing.
-                #self.overworld_viewing.blit_top_display()
-
-                # Update display to reflect blit changes.
-                #pygame.display.update()
-
-                # Attempt to move the protagonist.
-                if self.move_protagonist(protag_move_dir, transport_type):
-                    LOGGER.debug(
-                        "Protagonist tile_pos: %s",
-                        self.curr_map.protagonist_location
-                    )
-                    LOGGER.debug(
-                        "Map top left now at %s",
-                        self.curr_map.top_left_position
-                    )
+                    if events.key in direction_keys:
+                        movement_controller.release_direction(
+                            direction_keys[events.key]
+                        )
+                        LOGGER.debug("Direction key %s released", events.key)
 
-                    # Update map and display.
-                    self.refresh_and_blit_overworld_viewing()
-            elif interact_in_front or examine_in_front:
+            # Advance the step in progress, or start the next one.
+            movement_controller.update(
+                timekeeper.Timekeeper.get_time_ms(),
+                repeat_held=not (interact_in_front or examine_in_front),
+            )
+
+            if (interact_in_front or examine_in_front) \
+                    and movement_controller.is_idle() \
+                    and not movement_controller.has_queued_input():
                 LOGGER.debug("Trying to interact/examine in front")
 
                 # Get tile coordinate in front of protagonist.
@@ -1587,8 +1762,13 @@ class Game(object):
                                 refresh_during=True,
                             )
 
+                interact_in_front = False
+                examine_in_front = False
+
+                # Keys released during the interaction were not seen.
+                movement_controller.clear_input()
+
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
@@ -1,21 +1,51 @@
+import array
+import itertools
 import logging
 import random
 import sys
 import pygame
 import interactiveobj
 import objdata
+import resources
 import tile
 import tiledata
 import mapdata
 import directions
+import perfhud
+import profiling
 import imageids
 import viewingdata
 import time
 import timekeeper
+import renderbatch
+import scheduler
 
 ### CLASS NAME ###
 MAP_CLASS = 'Map'
 
+### TILE LAYER CONSTANTS ###
+# If True, Maps pre-render their static ground tiles into chunk Surfaces
+# so that blitting the visible tiles takes a handful of blits rather than
+# one per Tile.
+PRERENDER_TILE_LAYER = True
+
+# Width and height, in Tiles, of each pre-rendered tile layer chunk.
+TILE_LAYER_CHUNK_SIZE = 16
+
+### SPATIAL INDEX CONSTANTS ###
+# Width and height, in Tiles, of each cell in the interactive object
+# spatial index.
+SPATIAL_INDEX_CELL_SIZE = 8
+
+### PASSABILITY CONSTANTS ###
+# Transportation flags that each get their own passability plane.
+PASSABILITY_TRANSPORT_FLAGS = (
+    tiledata.WALKABLE_F,
+    tiledata.CANOEABLE_F,
+    tiledata.SAILABLE_F,
+    tiledata.FLYABLE_F,
+)
+
 class Map:
     # Maps map IDs to map objects.
     map_listing = {}
@@ -23,10 +53,13 @@ class Map:
     ### INITIALIZER METHODS ###
 
     # Create a Map object.
-    # tile_grid must be a List of List of Tiles that contains the tiles for
+    # tile_grid must be a List of List of tile IDs that contains the tiles for
     # the map. tile_grid must have a valid rectangular dimension, meaning
     # each inner List must be of the same size.  tile_grid can contain
-    # None in the inner List to represent missing Tiles.
+    # None or 0 in the inner List to represent missing Tiles.
+    # The Map stores the tile IDs row by row in the tile_ids array, with
+    # a parallel transport_plane bytearray holding the allowed
+    # transportation flags for each Tile.
     #
     # connector_tile_dict must be a dict that maps a tuple of integers
     # (representing the X and Y tile coordinates of the map, NOT
@@ -49,12 +82,25 @@ class Map:
         self.height = 0
         self.width = 0
         self.map_id = map_id
-        self.tile_grid = []
+
+        # Row-major array of tile IDs, indexed by y * width + x.
+        # 0 represents a missing Tile.
+        self.tile_ids = array.array('H')
+
+        # Row-major bytearray of allowed transportation flags
+        # (as defined in tiledata) for each Tile, parallel to tile_ids.
+        # Missing Tiles allow no transportation.
+        self.transport_plane = bytearray()
         self.connector_tile_dict = {}
         self.adj_map_dict = {}
         self.top_left_position = top_left
 
-        self.last_refresh_time_ms = pygame.time.get_ticks()
+        # Incremented whenever the Map's Tiles or interactive objects
+        # change, so that callers can tell whether anything they derived
+        # from the Map is out of date.
+        self.version = 0
+
+        self.last_refresh_time_ms = timekeeper.Timekeeper.get_game_time_ms()
 
         # Maps bottom left tile location tuples
         # to the object ID of the original interactive obj on the tile
@@ -68,11 +114,12 @@ class Map:
 
         # Dict that maps tile location tuple
         # to list of [object ID for object to place on tile
-        # (None if removing object), entry time or time of last refresh
-        # for object, and remaining time in
-        # milliseconds].
+        # (None if removing object), game time in milliseconds that the
+        # action is due at, scheduler event for the action].
+        # The world Scheduler runs the actions when they are due, whether
+        # or not the Map is the current one.
         # TODO - when saving game, update everything. When loading game,
-        # set entry times to current loading time.
+        # reschedule the actions.
         self.pending_spawn_actions = {}
 
         # maps bottom left tile coordinate tuple to
@@ -87,9 +134,45 @@ class Map:
         # should not have an entry for that Tile location.
         self.occupied_tile_dict = {}
 
+        # Row-major bytearray with 1 for each Tile occupied by an
+        # interactive object's collision rect, 0 otherwise.
+        self.occupied_plane = bytearray()
+
+        # Maps each transportation flag in PASSABILITY_TRANSPORT_FLAGS to a
+        # row-major bytearray with 1 for each Tile that allows that
+        # transportation and is not occupied, 0 otherwise.
+        self.passability_planes = {}
+
+        # Maps each transportation flag in PASSABILITY_TRANSPORT_FLAGS to a
+        # row-major array of region labels. Passable Tiles that are
+        # connected to each other share a label, and Tiles that are not
+        # passable have label 0.
+        self.region_labels = {}
+
+        # Next unused region label.
+        self._next_region_label = 1
+
+        # Spatial index for interactive objects. Maps (cell x, cell y)
+        # tuples to sets of bottom left tile location tuples for the
+        # objects whose drawn area overlaps that cell.
+        self.object_index_cells = {}
+
+        # Maps bottom left tile location tuples to the pygame Rect of Tile
+        # coordinates covered by the object's collision tiles and images.
+        self.object_tile_rects = {}
+
         # (x,y) tuple representing location of protagonist.
         self._protagonist_location = None
 
+        # Maps (chunk x, chunk y) tuples to pre-rendered pygame Surfaces
+        # holding the static Tile images for that chunk of the map.
+        # Empty if the tile layer has not been built.
+        self.tile_layer_chunks = {}
+
+        # Set of tile location tuples for animated Tiles, which are left
+        # out of the pre-rendered chunks and blitted individually.
+        self.animated_tile_locations = set()
+
         # maps Tile grid location (x,y) tuple to a
         # [interactive obj, remaining ticks to respawn] list
         # that indicates when the corresponding interactive object should
@@ -99,48 +182,58 @@ class Map:
         if tile_grid:
             grid_width = len(tile_grid[0])
             grid_height = len(tile_grid)
-            valid_grid_dimensions = True
 
             # ensure our grid dimensions are correct
             for grid_row in tile_grid:
                 if grid_width != len(grid_row):
                     # TODO ERROR MESSAGE
                     LOGGER.error("Invalid grid format - check grid dimensions")
-                    valid_grid_dimensions = False
                     pygame.quit()
                     sys.exit(1)
 
-            if valid_grid_dimensions:
-                # build tile grid
-                grid_to_copy = []
-
-                # get the Tile objects and make sure they're all Tiles
-                for grid_row in tile_grid:
-                    row_to_copy = []
-                    for x in grid_row:
-                        if (x is not None) and (not isinstance(x, tile.Tile)):
-                            LOGGER.error("Tile grids can only accept None or Tile objects")
-                            valid_grid_dimensions = False
-                            pygame.quit()
-                            sys.exit(1)
-
-                    row_to_copy = [x for x in grid_row]
-                    grid_to_copy.append(row_to_copy)
-
-                # save grid
-                self.tile_grid = grid_to_copy
-                self.height = grid_height
-                self.width = grid_width
-
-                # get connector tiles
-                if connector_tile_dict:
-                    for x, y in connector_tile_dict.items():
-                        self.connector_tile_dict[x] = y
-
-                # get neighboring maps
-                if adj_map_dict:
-                    for x, y in adj_map_dict.items():
-                        self.adj_map_dict[x] = y
+            # build tile grid
+            self.tile_ids = array.array(
+                'H',
+                [tile_id or 0 for tile_id in itertools.chain.from_iterable(tile_grid)]
+            )
+
+            # make sure they're all known Tiles
+            unknown_tile_ids = set(self.tile_ids).difference(
+                tile.Tile.tile_listing,
+                [0]
+            )
+            if unknown_tile_ids:
+                LOGGER.error(
+                    "Tile grids can only accept None or known tile IDs, got %s",
+                    unknown_tile_ids
+                )
+                pygame.quit()
+                sys.exit(1)
+
+            transport_lookup = dict(
+                (tile_id, tile_obj.allowed_transport)
+                for tile_id, tile_obj in tile.Tile.tile_listing.items()
+            )
+            transport_lookup[0] = tiledata.NO_TRANSPORT_F
+            self.transport_plane = bytearray(
+                [transport_lookup[tile_id] for tile_id in self.tile_ids]
+            )
+
+            self.height = grid_height
+            self.width = grid_width
+
+            self.occupied_plane = bytearray(len(self.tile_ids))
+            self.build_passability_planes()
+
+            # get connector tiles
+            if connector_tile_dict:
+                for x, y in connector_tile_dict.items():
+                    self.connector_tile_dict[x] = y
+
+            # get neighboring maps
+            if adj_map_dict:
+                for x, y in adj_map_dict.items():
+                    self.adj_map_dict[x] = y
 
     # interactive_obj_dict must be a dict that maps a tuple of integers
     # (representing the X and Y tile coordinates of the map, NOT
@@ -213,10 +306,15 @@ class Map:
                     # Clear old tile location
                     self.bottom_left_tile_obj_mapping.pop(self._protagonist_location, None)
                     self.occupied_tile_dict.pop(self._protagonist_location, None)
+                    self.mark_occupancy([self._protagonist_location], False)
+                    self.unindex_object(self._protagonist_location)
 
                 # Mark new location as occupied
                 self.bottom_left_tile_obj_mapping[new_location] = [objdata.PROTAGONIST_ID, set([new_location])]
                 self.occupied_tile_dict[new_location] = new_location
+                self.mark_occupancy([new_location], True)
+                self.index_object(objdata.PROTAGONIST_ID, new_location)
+                self.version = self.version + 1
 
                 LOGGER.debug(
                     "Moving protag away from %s to %s",
@@ -274,7 +372,7 @@ class Map:
         if not obj_to_set:
             LOGGER.debug("Could not find object with ID %d", obj_id)
 
-        if self and obj_to_set and bottom_left_tile_loc and self.tile_grid:
+        if self and obj_to_set and bottom_left_tile_loc and self.tile_ids:
             # Check that each tile in the colliion rect is within map
             # bounds and is not already occupied by another interactive
             # object.
@@ -313,7 +411,10 @@ class Map:
                 for tile_loc in collision_tile_set:
                     self.occupied_tile_dict[tile_loc] = bottom_left_tile_loc
                     LOGGER.debug("Marking %s as occupied",tile_loc)
+                self.mark_occupancy(collision_tile_set, True)
 
+                self.index_object(obj_id, bottom_left_tile_loc)
+                self.version = self.version + 1
                 success = True
 
         return success
@@ -347,7 +448,7 @@ class Map:
     def unset_interactive_object(self, tile_location):
         removed_id = None
 
-        if self and tile_location and self.tile_grid:
+        if self and tile_location and self.tile_ids:
             # make sure (x,y) location is in bounds
             if self.location_within_bounds(tile_location):
                 # Check if the tile location maps to an object's
@@ -376,6 +477,11 @@ class Map:
                         for tile_loc in collision_set:
                             self.occupied_tile_dict.pop(tile_loc, None)
                             LOGGER.debug("Freed tile %s",tile_loc)
+                        self.mark_occupancy(collision_set, False)
+
+                        self.unindex_object(bottom_left_tile_loc)
+
+                        self.version = self.version + 1
 
                         if obj_id is not None:
                             removed_id = obj_id
@@ -401,6 +507,113 @@ class Map:
         # # TODO
         return False
 
+    ### SPATIAL INDEX METHODS ###
+
+    def index_object(self, obj_id, bottom_left_tile_loc):
+        """Adds an interactive object to the spatial index.
+
+        Args:
+            obj_id: object ID for the object.
+            bottom_left_tile_loc: (x, y) tuple for the object's bottom
+                left tile location.
+        """
+
+        obj = interactiveobj.InteractiveObject.get_interactive_object(obj_id)
+
+        if obj:
+            obj_tile_rect = obj.get_drawn_tile_rect(bottom_left_tile_loc)
+        else:
+            obj_tile_rect = pygame.Rect(bottom_left_tile_loc, (1, 1))
+
+        self.unindex_object(bottom_left_tile_loc)
+        self.object_tile_rects[bottom_left_tile_loc] = obj_tile_rect
+
+        for cell in self._get_index_cells(obj_tile_rect):
+            self.object_index_cells.setdefault(cell, set()).add(
+                bottom_left_tile_loc
+            )
+
+    def unindex_object(self, bottom_left_tile_loc):
+        """Removes an interactive object from the spatial index.
+
+        Args:
+            bottom_left_tile_loc: (x, y) tuple for the object's bottom
+                left tile location.
+        """
+
+        obj_tile_rect = self.object_tile_rects.pop(bottom_left_tile_loc, None)
+
+        if obj_tile_rect:
+            for cell in self._get_index_cells(obj_tile_rect):
+                cell_set = self.object_index_cells.get(cell, None)
+
+                if cell_set is not None:
+                    cell_set.discard(bottom_left_tile_loc)
+                    if not cell_set:
+                        del self.object_index_cells[cell]
+
+    def _get_index_cells(self, tile_rect):
+        """Returns the spatial index cells that overlap a Tile rect."""
+
+        return [
+            (cell_x, cell_y)
+            for cell_y in range(
+                tile_rect.top // SPATIAL_INDEX_CELL_SIZE,
+                ((tile_rect.bottom - 1) // SPATIAL_INDEX_CELL_SIZE) + 1
+            )
+            for cell_x in range(
+                tile_rect.left // SPATIAL_INDEX_CELL_SIZE,
+                ((tile_rect.right - 1) // SPATIAL_INDEX_CELL_SIZE) + 1
+            )
+        ]
+
+    def get_objects_in_rect(self, tile_rect=None):
+        """Returns the interactive objects whose drawn area overlaps a rect.
+
+        An object's drawn area covers both its collision tiles and its
+        images, so tall objects whose bottom left tile is outside the rect
+        are still returned if their images reach into it.
+
+        Args:
+            tile_rect: rect of Tile coordinates (top left x, top left y,
+                width, height) to check. Setting to None will return all
+                objects on the Map.
+
+        Returns:
+            list of (bottom left tile location, object ID) tuples in draw
+            order, meaning sorted by bottom left tile row and then by
+            column.
+        """
+
+        if tile_rect is None:
+            tile_rect = pygame.Rect(0, 0, self.width, self.height)
+        else:
+            tile_rect = pygame.Rect(tile_rect)
+
+        found_locations = set()
+
+        if (tile_rect.width > 0) and (tile_rect.height > 0):
+            for cell in self._get_index_cells(tile_rect):
+                cell_set = self.object_index_cells.get(cell, None)
+
+                if cell_set:
+                    for bottom_left_tile_loc in cell_set:
+                        if tile_rect.colliderect(
+                                self.object_tile_rects[bottom_left_tile_loc]
+                            ):
+                            found_locations.add(bottom_left_tile_loc)
+
+        return [
+            (
+                bottom_left_tile_loc,
+                self.bottom_left_tile_obj_mapping[bottom_left_tile_loc][0]
+            )
+            for bottom_left_tile_loc in sorted(
+                found_locations,
+                key=lambda loc: (loc[1], loc[0])
+            )
+        ]
+
     ### OBJECT SEARCH METHODS ###
 
     # Returns None if invalid direction, invalid initial tile position,
@@ -537,14 +750,31 @@ class Map:
                 self.execute_spawn_action(bottom_left_tile_loc, object_id)
             else:
                 # Timed action.
-                spawn_info = [object_id, countdown_ms]
+                due_time_ms = timekeeper.Timekeeper.get_game_time_ms() \
+                    + countdown_ms
+                spawn_event = scheduler.Scheduler.schedule_at(
+                    due_time_ms,
+                    self.run_pending_spawn_action,
+                    (bottom_left_tile_loc,),
+                )
+                spawn_info = [object_id, due_time_ms, spawn_event]
                 self.pending_spawn_actions[bottom_left_tile_loc] = spawn_info
                 LOGGER.info(
                     "Added pending spawn action to tile location %s: %s",
                     bottom_left_tile_loc,
-                    spawn_info
+                    spawn_info[:2]
                 )
 
+    # Removes the pending spawn action for the tile location and
+    # executes it. Called by the world Scheduler when the action is due.
+    def run_pending_spawn_action(self, bottom_left_tile_loc):
+        spawn_action = self.pending_spawn_actions.pop(bottom_left_tile_loc, None)
+
+        if spawn_action:
+            self.execute_spawn_action(bottom_left_tile_loc, spawn_action[0])
+
+        LOGGER.debug("Remaining spawns: %s", self.pending_spawn_actions)
+
     ### TILE-RELATED METHODS ###
 
     def tile_occupied(self, tile_loc):
@@ -573,20 +803,417 @@ class Map:
         ret_tile = None
 
         if self.location_within_bounds(tile_pos):
-            # y,x
-            ret_tile = self.tile_grid[tile_pos[1]][tile_pos[0]]
+            ret_tile = tile.Tile.tile_listing.get(
+                self.tile_ids[(tile_pos[1] * self.width) + tile_pos[0]],
+                None
+            )
 
         return ret_tile
 
+    # Returns the tile ID at the tile position, 0 if the position is out
+    # of bounds or has no Tile.
+    def get_tile_id_from_pos(self, tile_pos):
+        ret_id = 0
+
+        if self.location_within_bounds(tile_pos):
+            ret_id = self.tile_ids[(tile_pos[1] * self.width) + tile_pos[0]]
+
+        return ret_id
+
+    # Returns the allowed transportation flags for the tile position,
+    # NO_TRANSPORT_F if the position is out of bounds or has no Tile.
+    def get_allowed_transport(self, tile_pos):
+        ret_flags = tiledata.NO_TRANSPORT_F
+
+        if self.location_within_bounds(tile_pos):
+            ret_flags = self.transport_plane[
+                (tile_pos[1] * self.width) + tile_pos[0]
+            ]
+
+        return ret_flags
+
+    # Same check as Tile.valid_transportation, but read from the
+    # transport plane.
     def valid_transportation(self, dest_tile_pos, transport_flag):
         ret_val = 0x0
-        dest_tile = self.get_tile_from_pos(dest_tile_pos)
 
-        if dest_tile:
-            ret_val = dest_tile.valid_transportation(transport_flag)
+        if self.location_within_bounds(dest_tile_pos):
+            tile_index = (dest_tile_pos[1] * self.width) + dest_tile_pos[0]
+
+            if self.tile_ids[tile_index]:
+                allowed_transport = self.transport_plane[tile_index]
+                ret_val = bool(transport_flag & allowed_transport) \
+                    or (transport_flag == allowed_transport)
 
         return ret_val
 
+    # Replaces the Tile at tile_loc with the Tile for tile_id, records the
+    # change in changed_tile_mapping, and patches the pre-rendered tile layer.
+    # Returns True if successful, False otherwise.
+    # Caller will need to reblit the map and update the surface to show
+    # the new Tile.
+    def set_tile(self, tile_loc, tile_id):
+        success = False
+        new_tile = tile.Tile.get_tile(tile_id)
+
+        if not new_tile:
+            LOGGER.warn("No tile found for tile id %s", tile_id)
+        elif tile_loc and self.location_within_bounds(tile_loc):
+            tile_index = (tile_loc[1] * self.width) + tile_loc[0]
+            self.tile_ids[tile_index] = tile_id
+            self.transport_plane[tile_index] = new_tile.allowed_transport
+            self.update_passability(tile_index)
+            self.changed_tile_mapping[tile_loc] = tile_id
+            self.version = self.version + 1
+
+            if self.tile_layer_chunks:
+                self.render_tile_layer_cell(tile_loc)
+
+            success = True
+
+        return success
+
+    ### PASSABILITY METHODS ###
+
+    # Builds the passability planes from the transport plane and the
+    # occupied plane. Called once the tile IDs are set; after that,
+    # set_tile and the interactive object setters keep the planes
+    # up to date one Tile at a time.
+    def build_passability_planes(self):
+        self.passability_planes = {}
+
+        for transport_flag in PASSABILITY_TRANSPORT_FLAGS:
+            self.passability_planes[transport_flag] = bytearray(
+                [
+                    1 if ((allowed_transport & transport_flag) and not occupied)
+                    else 0
+                    for allowed_transport, occupied in zip(
+                        self.transport_plane,
+                        self.occupied_plane
+                    )
+                ]
+            )
+
+    # Recomputes the passability of the Tile at the row-major tile index
+    # for every plane.
+    def update_passability(self, tile_index):
+        allowed_transport = self.transport_plane[tile_index]
+        occupied = self.occupied_plane[tile_index]
+
+        for transport_flag, plane in self.passability_planes.items():
+            if (allowed_transport & transport_flag) and not occupied:
+                passable = 1
+            else:
+                passable = 0
+
+            if plane[tile_index] != passable:
+                plane[tile_index] = passable
+
+                if transport_flag in self.region_labels:
+                    self.update_region_labels(transport_flag, tile_index)
+
+    # Marks the tile locations in tile_locs as occupied (if occupied is
+    # True) or free, and updates their passability. Out of bounds
+    # locations are ignored.
+    def mark_occupancy(self, tile_locs, occupied):
+        occupied_value = 1 if occupied else 0
+
+        for tile_loc in tile_locs:
+            if self.location_within_bounds(tile_loc):
+                tile_index = (tile_loc[1] * self.width) + tile_loc[0]
+                self.occupied_plane[tile_index] = occupied_value
+                self.update_passability(tile_index)
+
+    # Returns the row-major bytearray with 1 for each Tile that allows
+    # transport_flag and is not occupied, or None if transport_flag is not
+    # one of PASSABILITY_TRANSPORT_FLAGS. Callers must not modify it.
+    def get_passability_plane(self, transport_flag):
+        return self.passability_planes.get(transport_flag, None)
+
+    # Returns True if something using transport_flag can move onto the
+    # tile location, meaning the location is within bounds, its Tile
+    # allows that transportation, and no interactive object occupies it.
+    def can_occupy(self, tile_loc, transport_flag):
+        x_pos = tile_loc[0]
+        y_pos = tile_loc[1]
+
+        if (x_pos < 0) or (y_pos < 0) \
+                or (x_pos >= self.width) or (y_pos >= self.height):
+            return False
+
+        plane = self.passability_planes.get(transport_flag, None)
+
+        if plane is None:
+            # Combined or unknown flags fall back to the separate checks.
+            return bool(self.valid_transportation(tile_loc, transport_flag)) \
+                and not self.tile_occupied(tile_loc)
+
+        return plane[(y_pos * self.width) + x_pos] == 1
+
+    ### REGION LABEL METHODS ###
+
+    # Builds the region labels for each passability plane, so that
+    # connected passable Tiles share a label. Called by the map factory once
+    # the map's initial interactive objects are placed, rather than
+    # relabelling as each one is placed; after that, update_passability
+    # keeps the labels up to date one Tile at a time.
+    def build_region_labels(self):
+        self.region_labels = {}
+        self._next_region_label = 1
+
+        for transport_flag, plane in self.passability_planes.items():
+            labels = array.array('I', bytes(4 * len(plane)))
+            self.region_labels[transport_flag] = labels
+
+            for tile_index, passable in enumerate(plane):
+                if passable and not labels[tile_index]:
+                    self._flood_region_label(plane, labels, tile_index)
+
+    # Labels every passable Tile connected to the Tile at start_index with
+    # a new region label.
+    def _flood_region_label(self, plane, labels, start_index):
+        new_label = self._next_region_label
+        self._next_region_label = self._next_region_label + 1
+
+        width = self.width
+        height = self.height
+        labels[start_index] = new_label
+        index_stack = [start_index]
+
+        while index_stack:
+            curr_index = index_stack.pop()
+            curr_x = curr_index % width
+            curr_y = curr_index // width
+
+            for next_index, next_x, next_y in (
+                    (curr_index - width, curr_x, curr_y - 1),
+                    (curr_index + 1, curr_x + 1, curr_y),
+                    (curr_index + width, curr_x, curr_y + 1),
+                    (curr_index - 1, curr_x - 1, curr_y),
+                ):
+                if (0 <= next_x < width) and (0 <= next_y < height) \
+                        and plane[next_index] \
+                        and (labels[next_index] != new_label):
+                    labels[next_index] = new_label
+                    index_stack.append(next_index)
+
+    # Returns True if the passable Tiles next to the Tile at tile_index
+    # are connected to each other through the 8 Tiles around it, meaning
+    # that blocking the Tile cannot split their region.
+    def _neighbors_locally_connected(self, plane, tile_index):
+        tile_x = tile_index % self.width
+        tile_y = tile_index // self.width
+
+        # Ring of Tiles around the Tile, in order, starting north.
+        # Consecutive Tiles in the ring are next to each other, and the
+        # even positions are the Tiles directly next to the center.
+        ring_passable = []
+        for offset_x, offset_y in (
+                (0, -1), (1, -1), (1, 0), (1, 1),
+                (0, 1), (-1, 1), (-1, 0), (-1, -1),
+            ):
+            ring_x = tile_x + offset_x
+            ring_y = tile_y + offset_y
+            ring_passable.append(
+                (0 <= ring_x < self.width)
+                and (0 <= ring_y < self.height)
+                and bool(plane[(ring_y * self.width) + ring_x])
+            )
+
+        # Count the runs of passable ring Tiles that hold a Tile directly
+        # next to the center.
+        neighbor_runs = 0
+        for ring_pos in range(0, 8, 2):
+            if ring_passable[ring_pos]:
+                # Only count the neighbor if it starts its run, walking
+                # backwards around the ring.
+                prev_pos = (ring_pos - 1) % 8
+                while (prev_pos != ring_pos) and ring_passable[prev_pos] \
+                        and (prev_pos % 2):
+                    prev_pos = (prev_pos - 1) % 8
+                if (prev_pos == ring_pos) or not ring_passable[prev_pos]:
+                    neighbor_runs = neighbor_runs + 1
+
+        return neighbor_runs <= 1
+
+    # Updates the region labels for transport_flag after the passability
+    # of the Tile at tile_index changed.
+    def update_region_labels(self, transport_flag, tile_index):
+        plane = self.passability_planes[transport_flag]
+        labels = self.region_labels[transport_flag]
+
+        tile_x = tile_index % self.width
+        tile_y = tile_index // self.width
+        neighbor_indices = [
+            next_index for next_index, next_x, next_y in (
+                (tile_index - self.width, tile_x, tile_y - 1),
+                (tile_index + 1, tile_x + 1, tile_y),
+                (tile_index + self.width, tile_x, tile_y + 1),
+                (tile_index - 1, tile_x - 1, tile_y),
+            )
+            if (0 <= next_x < self.width) and (0 <= next_y < self.height) \
+                and plane[next_index]
+        ]
+
+        if plane[tile_index]:
+            # The Tile opened up, and joins every region next to it.
+            neighbor_labels = set(labels[next_index] for next_index in neighbor_indices)
+
+            if len(neighbor_labels) == 1:
+                labels[tile_index] = neighbor_labels.pop()
+            else:
+                self._flood_region_label(plane, labels, tile_index)
+        else:
+            labels[tile_index] = 0
+
+            if not self._neighbors_locally_connected(plane, tile_index):
+                # Blocking the Tile may have split its region. Relabel
+                # from each neighbor that is not yet relabelled.
+                relabelled = set()
+                for next_index in neighbor_indices:
+                    if labels[next_index] not in relabelled:
+                        self._flood_region_label(plane, labels, next_index)
+                        relabelled.add(labels[next_index])
+
+    # Returns the region label for the tile location, or 0 if the tile
+    # location is out of bounds or not passable with transport_flag.
+    def get_region_label(self, tile_loc, transport_flag):
+        labels = self.region_labels.get(transport_flag, None)
+
+        if (labels is None) or not self.location_within_bounds(tile_loc):
+            return 0
+
+        return labels[(tile_loc[1] * self.width) + tile_loc[0]]
+
+    # Returns the set of region labels that something at tile_loc can
+    # move into with transport_flag. If the tile location is itself
+    # occupied (such as by whatever is about to move), these are the
+    # labels of the passable Tiles next to it.
+    def get_region_labels_from(self, tile_loc, transport_flag):
+        tile_label = self.get_region_label(tile_loc, transport_flag)
+
+        if tile_label:
+            return set([tile_label])
+
+        return set(
+            self.get_region_label(adj_tile_loc, transport_flag)
+            for adj_tile_loc in (
+                (tile_loc[0], tile_loc[1] - 1),
+                (tile_loc[0] + 1, tile_loc[1]),
+                (tile_loc[0], tile_loc[1] + 1),
+                (tile_loc[0] - 1, tile_loc[1]),
+            )
+        ).difference([0])
+
+    # Returns True if something at start_loc could reach dest_loc with
+    # transport_flag, going by region labels. Combined transportation
+    # flags have no labels, so they are always considered reachable.
+    def is_reachable(self, start_loc, dest_loc, transport_flag):
+        if transport_flag not in self.region_labels:
+            return True
+
+        return self.get_region_label(dest_loc, transport_flag) \
+            in self.get_region_labels_from(start_loc, transport_flag)
+
+    # Returns a dict mapping each region label for transport_flag to the
+    # list of tile locations in that region.
+    def get_regions(self, transport_flag):
+        regions = {}
+        labels = self.region_labels.get(transport_flag, None)
+
+        if labels:
+            for tile_index, label in enumerate(labels):
+                if label:
+                    regions.setdefault(label, []).append(
+                        (tile_index % self.width, tile_index // self.width)
+                    )
+
+        return regions
+
+    ### TILE LAYER METHODS ###
+
+    def build_tile_layer(self):
+        """Pre-renders the Map's static Tiles into chunk Surfaces.
+
+        Each chunk covers TILE_LAYER_CHUNK_SIZE x TILE_LAYER_CHUNK_SIZE
+        Tiles (less at the right and bottom map edges). Animated Tiles and
+        missing Tiles are left black in the chunks; animated Tiles are
+        instead tracked in animated_tile_locations and blitted on top
+        with their current image.
+        """
+
+        self.tile_layer_chunks = {}
+        self.animated_tile_locations = set()
+
+        if not self.tile_ids:
+            return
+
+        convert_chunks = pygame.display.get_surface() is not None
+
+        for chunk_y in range(0, self.height, TILE_LAYER_CHUNK_SIZE):
+            for chunk_x in range(0, self.width, TILE_LAYER_CHUNK_SIZE):
+                num_tiles_x = min(TILE_LAYER_CHUNK_SIZE, self.width - chunk_x)
+                num_tiles_y = min(TILE_LAYER_CHUNK_SIZE, self.height - chunk_y)
+
+                chunk_surface = pygame.Surface(
+                    (num_tiles_x * tile.TILE_SIZE, num_tiles_y * tile.TILE_SIZE)
+                )
+                if convert_chunks:
+                    chunk_surface = chunk_surface.convert()
+                chunk_surface.fill(viewingdata.COLOR_BLACK)
+
+                self.tile_layer_chunks[(
+                    chunk_x // TILE_LAYER_CHUNK_SIZE,
+                    chunk_y // TILE_LAYER_CHUNK_SIZE,
+                )] = chunk_surface
+
+        for tile_y in range(self.height):
+            for tile_x in range(self.width):
+                self.render_tile_layer_cell((tile_x, tile_y))
+
+        LOGGER.debug(
+            "Built %d tile layer chunks for map %s, %d animated tiles",
+            len(self.tile_layer_chunks),
+            self.map_id,
+            len(self.animated_tile_locations),
+        )
+
+    def render_tile_layer_cell(self, tile_loc):
+        """Redraws a single Tile in its pre-rendered tile layer chunk.
+
+        Args:
+            tile_loc: (x, y) tuple representing the tile grid coordinate
+                of the Tile to redraw.
+        """
+
+        chunk_surface = self.tile_layer_chunks.get(
+            (
+                tile_loc[0] // TILE_LAYER_CHUNK_SIZE,
+                tile_loc[1] // TILE_LAYER_CHUNK_SIZE,
+            ),
+            None
+        )
+
+        if chunk_surface is None:
+            return
+
+        cell_rect = pygame.Rect(
+            (tile_loc[0] % TILE_LAYER_CHUNK_SIZE) * tile.TILE_SIZE,
+            (tile_loc[1] % TILE_LAYER_CHUNK_SIZE) * tile.TILE_SIZE,
+            tile.TILE_SIZE,
+            tile.TILE_SIZE,
+        )
+        chunk_surface.fill(viewingdata.COLOR_BLACK, cell_rect)
+
+        tile_obj = self.get_tile_from_pos(tile_loc)
+        self.animated_tile_locations.discard(tile_loc)
+
+        if tile_obj:
+            if tile_obj.animated:
+                self.animated_tile_locations.add(tile_loc)
+            else:
+                tile_obj.blit_tile(chunk_surface, cell_rect.topleft)
+
     ### BLIT METHODS ###
 
     def blit_tile(
@@ -628,6 +1255,7 @@ class Map:
                     blit_time_ms=blit_time_ms,
                 )
 
+    @profiling.profile_scope('Map.blit_tiles')
     def blit_tiles(
             self,
             surface,
@@ -651,7 +1279,7 @@ class Map:
                 only the first Tile image will be blitted.
         """
 
-        if surface and self.tile_grid and self.top_left_position:
+        if surface and self.tile_ids and self.top_left_position:
             tile_subset = (0, 0, self.width, self.height)
 
             if tile_subset_rect:
@@ -662,7 +1290,13 @@ class Map:
             end_tile_x = start_tile_x + tile_subset[2] - 1
             end_tile_y = start_tile_y + tile_subset[3] - 1
 
-            if (start_tile_x >= 0)                          \
+            if self.tile_layer_chunks:
+                self.blit_tile_layer(
+                    surface,
+                    tile_subset,
+                    blit_time_ms=blit_time_ms,
+                )
+            elif (start_tile_x >= 0)                        \
                     and (start_tile_y >= 0)                 \
                     and (end_tile_x <= self.width)          \
                     and (end_tile_y <= self.height)         \
@@ -672,19 +1306,111 @@ class Map:
                 start_pixel_y = self.top_left_position[1] + (start_tile_y*tile.TILE_SIZE)
 
                 # Blit tiles.
+                batch = renderbatch.RenderBatch()
+                tile_listing = tile.Tile.tile_listing
                 curr_pixel_y = start_pixel_y
                 for grid_row in range(start_tile_y, end_tile_y + 1):
                     curr_pixel_x = start_pixel_x
-                    for tile_index in range(start_tile_x, end_tile_x + 1):
-                        single_tile = self.tile_grid[grid_row][tile_index]
-                        single_tile.blit_tile(
-                            surface,
-                            (curr_pixel_x, curr_pixel_y),
-                            blit_time_ms=blit_time_ms,
-                        )
+                    row_start = grid_row * self.width
+                    for tile_id in self.tile_ids[
+                            row_start + start_tile_x:row_start + end_tile_x + 1
+                        ]:
+                        single_tile = tile_listing.get(tile_id, None)
+                        if single_tile:
+                            batch.add(
+                                single_tile.get_image(blit_time_ms),
+                                (curr_pixel_x, curr_pixel_y),
+                            )
                         curr_pixel_x = curr_pixel_x + tile.TILE_SIZE
                     curr_pixel_y = curr_pixel_y + tile.TILE_SIZE
 
+                batch.submit(surface)
+
+    def blit_tile_layer(
+            self,
+            surface,
+            tile_subset_rect,
+            blit_time_ms=None,
+        ):
+        """Blits a subsection of the pre-rendered tile layer.
+
+        Copies the visible part of each overlapping tile layer chunk with
+        a single blit, then blits the animated Tiles in the subsection
+        with their current image.
+
+        Caller needs to update the pygame display surface.
+
+        Args:
+            surface: pygame Surface object to blit the Tiles on.
+            tile_subset_rect: rect of Tile coordinates (top left x,
+                top left y, width, height) that indicates which
+                Map subsection to blit.
+            blit_time_ms: the system time in milliseconds to use for blitting
+                the animated Tile objects.
+        """
+
+        # Clip subsection to the map.
+        tile_rect = pygame.Rect(tile_subset_rect).clip(
+            pygame.Rect(0, 0, self.width, self.height)
+        )
+
+        if (tile_rect.width <= 0) or (tile_rect.height <= 0):
+            return
+
+        map_left = self.top_left_position[0]
+        map_top = self.top_left_position[1]
+
+        # Blit the static tiles, one blit per chunk.
+        pixel_rect = pygame.Rect(
+            tile_rect.x * tile.TILE_SIZE,
+            tile_rect.y * tile.TILE_SIZE,
+            tile_rect.width * tile.TILE_SIZE,
+            tile_rect.height * tile.TILE_SIZE,
+        )
+        chunk_pixel_size = TILE_LAYER_CHUNK_SIZE * tile.TILE_SIZE
+        batch = renderbatch.RenderBatch()
+
+        for chunk_y in range(
+                tile_rect.top // TILE_LAYER_CHUNK_SIZE,
+                ((tile_rect.bottom - 1) // TILE_LAYER_CHUNK_SIZE) + 1
+            ):
+            for chunk_x in range(
+                    tile_rect.left // TILE_LAYER_CHUNK_SIZE,
+                    ((tile_rect.right - 1) // TILE_LAYER_CHUNK_SIZE) + 1
+                ):
+                chunk_surface = self.tile_layer_chunks.get(
+                    (chunk_x, chunk_y),
+                    None
+                )
+
+                if chunk_surface is None:
+                    continue
+
+                chunk_left = chunk_x * chunk_pixel_size
+                chunk_top = chunk_y * chunk_pixel_size
+                area = pixel_rect.clip(
+                    chunk_surface.get_rect(topleft=(chunk_left, chunk_top))
+                )
+
+                batch.add(
+                    chunk_surface,
+                    (map_left + area.x, map_top + area.y),
+                    area.move(-chunk_left, -chunk_top),
+                )
+
+        # Blit the animated tiles on top.
+        for tile_loc in self.animated_tile_locations:
+            if tile_rect.collidepoint(tile_loc):
+                batch.add(
+                    self.get_tile_from_pos(tile_loc).get_image(blit_time_ms),
+                    (
+                        map_left + (tile_loc[0] * tile.TILE_SIZE),
+                        map_top + (tile_loc[1] * tile.TILE_SIZE),
+                    ),
+                )
+
+        batch.submit(surface)
+
     # Blits spawned interactive objects starting at current
     # top left position of map
     # Caller needs to update surface after method
@@ -692,6 +1418,7 @@ class Map:
     # tiles to include for blitting, rather than blitting the whole map.
     # Setting to None will blit all the current spawned objects on
     # the map.
+    @profiling.profile_scope('Map.blit_interactive_objects')
     def blit_interactive_objects(
             self,
             surface,
@@ -716,7 +1443,7 @@ class Map:
                 only the first object image will be blitted.
         """
 
-        if surface and self.tile_grid and self.top_left_position:
+        if surface and self.tile_ids and self.top_left_position:
             tile_subset = (0, 0, self.width, self.height)
 
             if tile_subset_rect:
@@ -733,46 +1460,204 @@ class Map:
                     and (end_tile_y <= self.height)         \
                     and (end_tile_x >= start_tile_x)        \
                     and (end_tile_y >= start_tile_y):
-                # Check if the Tile is occupied. Go by order of bottom left tile
-                for grid_row in range(start_tile_y, end_tile_y + 1):
-                    for tile_index in range(start_tile_x, end_tile_x + 1):
-                        tile_loc = (tile_index, grid_row)
-
-                        # Check if this tile is a bottom left tile for an
-                        # interactive object.
-                        obj_info = self.bottom_left_tile_obj_mapping.get(tile_loc, None)
-                        if obj_info:
-                            obj_to_blit =                       \
-                                interactiveobj.InteractiveObject.get_interactive_object(obj_info[0])
-
-                            if obj_to_blit:
-                                bottom_left_pixel = None
-
-                                if (obj_info[0] == objdata.PROTAGONIST_ID):
-                                    bottom_left_pixel = viewingdata.CENTER_OW_TILE_BOTTOM_LEFT
-                                    obj_to_blit.blit_onto_surface(
-                                        surface,
-                                        bottom_left_pixel=bottom_left_pixel,
-                                        blit_time_ms=blit_time_ms,
-                                    )
-                                else:
-                                    bottom_left_pixel = (                           \
-                                        self.top_left_position[0]                   \
-                                            + (tile_loc[0] * tile.TILE_SIZE),       \
-                                        self.top_left_position[1]                   \
-                                            + ((tile_loc[1] + 1) * tile.TILE_SIZE)  \
-                                    )
-
-                                    # Blit the object.
-                                    # Use default image ID for overworld.
-                                    # TODO - change this image ID depending
-                                    # on object type?
-                                    obj_to_blit.blit_onto_surface(
-                                        surface,
-                                        bottom_left_pixel=bottom_left_pixel,
-                                        blit_time_ms=blit_time_ms,
-                                    )
+                batch = renderbatch.RenderBatch()
+                get_interactive_object = \
+                    interactiveobj.InteractiveObject.get_interactive_object
+
+                # Go by order of bottom left tile.
+                for tile_loc, obj_id in self.get_objects_in_rect(tile_subset):
+                    obj_to_blit = get_interactive_object(obj_id)
+
+                    if obj_to_blit:
+                        bottom_left_pixel = None
+
+                        if (obj_id == objdata.PROTAGONIST_ID):
+                            bottom_left_pixel = viewingdata.CENTER_OW_TILE_BOTTOM_LEFT
+                        else:
+                            bottom_left_pixel = (                           \
+                                self.top_left_position[0]                   \
+                                    + (tile_loc[0] * tile.TILE_SIZE),       \
+                                self.top_left_position[1]                   \
+                                    + ((tile_loc[1] + 1) * tile.TILE_SIZE)  \
+                            )
+
+                        # Blit the object.
+                        # Use default image ID for overworld.
+                        # TODO - change this image ID depending
+                        # on object type?
+                        image_to_blit = obj_to_blit.get_image(
+                            blit_time_ms=blit_time_ms
+                        )
+
+                        if image_to_blit:
+                            batch.add(
+                                image_to_blit,
+                                (
+                                    bottom_left_pixel[0],
+                                    bottom_left_pixel[1] \
+                                        - image_to_blit.get_height(),
+                                ),
+                            )
+
+                profiling.Profiler.count('objects blitted', len(batch))
+                batch.submit(surface)
+
+    def get_sprite_images(
+            self,
+            tile_subset_rect=None,
+            blit_time_ms=None,
+        ):
+        """Returns the images that blit_map would blit for animated Tiles
+        and interactive objects.
+
+        Static Tiles are left out. Comparing the results for two blit times
+        tells which parts of the display changed in between.
+
+        Args:
+            tile_subset_rect: rect of Tile coordinates (top left x,
+                top left y, width, height) that indicates which
+                Map subsection to check. Setting to None will check the
+                whole Map.
+            blit_time_ms: the system time in milliseconds to use for picking
+                images from image sequences.
+
+        Returns:
+            dict mapping keys that identify each animated Tile or object
+            to a (pygame Surface, pygame Rect) tuple, where the Rect is
+            the display area the image would be blitted to.
+        """
+
+        ret_dict = {}
+
+        if not self.top_left_position:
+            return ret_dict
+
+        tile_rect = pygame.Rect(0, 0, self.width, self.height)
+        if tile_subset_rect:
+            tile_rect = pygame.Rect(tile_subset_rect)
+
+        map_left = self.top_left_position[0]
+        map_top = self.top_left_position[1]
+
+        for tile_loc in self.get_animated_tile_locations():
+            if tile_rect.collidepoint(tile_loc):
+                image = self.get_tile_from_pos(tile_loc).get_image(blit_time_ms)
+                ret_dict[('tile', tile_loc)] = (
+                    image,
+                    image.get_rect(topleft=(
+                        map_left + (tile_loc[0] * tile.TILE_SIZE),
+                        map_top + (tile_loc[1] * tile.TILE_SIZE),
+                    ))
+                )
+
+        for tile_loc, obj_id in self.get_objects_in_rect(tile_rect):
+            obj = interactiveobj.InteractiveObject.get_interactive_object(
+                obj_id
+            )
+            image = None
+            if obj:
+                image = obj.get_image(blit_time_ms=blit_time_ms)
+
+            if image:
+                if obj_id == objdata.PROTAGONIST_ID:
+                    bottom_left_pixel = viewingdata.CENTER_OW_TILE_BOTTOM_LEFT
+                else:
+                    bottom_left_pixel = (
+                        map_left + (tile_loc[0] * tile.TILE_SIZE),
+                        map_top + ((tile_loc[1] + 1) * tile.TILE_SIZE),
+                    )
+
+                ret_dict[('object', tile_loc)] = (
+                    image,
+                    image.get_rect(bottomleft=bottom_left_pixel)
+                )
+
+        return ret_dict
+
+    def get_animated_tile_locations(self):
+        """Returns the tile coordinates of the Map's animated Tiles.
+
+        Uses animated_tile_locations if the tile layer is built, and looks
+        through the Map's Tile IDs otherwise.
+        """
+
+        if self.tile_layer_chunks:
+            return self.animated_tile_locations
+
+        animated_tile_ids = set(
+            tile_id
+            for tile_id, tile_obj in tile.Tile.tile_listing.items()
+            if tile_obj.animated
+        )
+
+        return [
+            (tile_index % self.width, tile_index // self.width)
+            for tile_index, tile_id in enumerate(self.tile_ids)
+            if tile_id in animated_tile_ids
+        ]
+
+    def get_next_animation_change_ms(
+            self,
+            curr_time_ms,
+            tile_subset_rect=None,
+        ):
+        """Returns when the next animated Tile or interactive object image
+        change is due.
+
+        Args:
+            curr_time_ms: the system time in milliseconds to look ahead from.
+            tile_subset_rect: rect of Tile coordinates (top left x,
+                top left y, width, height) that indicates which
+                Map subsection to check. Setting to None will check the
+                whole Map.
+
+        Returns:
+            The earliest time in milliseconds after curr_time_ms at which
+            get_sprite_images would return a different image, or None if
+            nothing in the subsection is animated.
+        """
+
+        tile_rect = pygame.Rect(0, 0, self.width, self.height)
+        if tile_subset_rect:
+            tile_rect = pygame.Rect(tile_subset_rect)
+
+        change_times = []
+
+        if self.tile_layer_chunks:
+            animated_tiles = set(
+                self.get_tile_from_pos(tile_loc)
+                for tile_loc in self.animated_tile_locations
+                if tile_rect.collidepoint(tile_loc)
+            )
+        else:
+            map_tile_ids = set(self.tile_ids)
+            animated_tiles = [
+                tile_obj
+                for tile_id, tile_obj in tile.Tile.tile_listing.items()
+                if tile_obj.animated and (tile_id in map_tile_ids)
+            ]
+
+        for tile_obj in animated_tiles:
+            if tile_obj:
+                change_times.append(tile_obj.get_next_image_change_ms(curr_time_ms))
+
+        for tile_loc, obj_id in self.get_objects_in_rect(tile_rect):
+            obj = interactiveobj.InteractiveObject.get_interactive_object(
+                obj_id
+            )
+            if obj:
+                change_times.append(obj.get_next_image_change_ms(curr_time_ms))
 
+        change_times = [
+            change_time_ms
+            for change_time_ms in change_times
+            if change_time_ms is not None
+        ]
+
+        if not change_times:
+            return None
+
+        return min(change_times)
 
     # blit entire map, including tiles and spawned interactive objects
     # Starts at the map's current top left position
@@ -780,6 +1665,7 @@ class Map:
     # tile_subset_rect is rect of tile coordinates that indicates which
     # tiles and objects to blit, rather than blitting the whole map.
     # Setting to None will blit the whole map
+    @profiling.profile_scope('Map.blit_map')
     def blit_map(
             self,
             surface,
@@ -803,54 +1689,167 @@ class Map:
                 only the first object image will be blitted.
         """
 
-        if self and surface and self.top_left_position and self.tile_grid:
+        if self and surface and self.top_left_position and self.tile_ids:
             # Blit the tiles.
+            start_time = perfhud.PerfHud.start_timer()
             self.blit_tiles(
                 surface,
                 tile_subset_rect=tile_subset_rect,
                 blit_time_ms=blit_time_ms,
             )
+            perfhud.PerfHud.stop_timer(perfhud.SECTION_BLIT_TILES, start_time)
 
             # Next, blit the objects
+            start_time = perfhud.PerfHud.start_timer()
             self.blit_interactive_objects(
                 surface,
                 tile_subset_rect=tile_subset_rect,
                 blit_time_ms=blit_time_ms,
             )
+            perfhud.PerfHud.stop_timer(perfhud.SECTION_BLIT_OBJECTS, start_time)
+
+    @profiling.profile_scope('Map.blit_tiles_in_area')
+    def blit_tiles_in_area(
+            self,
+            surface,
+            area_rect,
+            blit_time_ms=None,
+        ):
+        """Redraws the Tiles that fall within a pixel area of the surface.
+
+        The area is filled black first, so that parts of the area not
+        covered by the Map are cleared. Blitting is clipped to the area.
+
+        Caller needs to update the pygame display surface.
+
+        Args:
+            surface: pygame Surface object to blit the Tiles on.
+            area_rect: pygame Rect of surface pixel coordinates to redraw.
+            blit_time_ms: the system time in milliseconds to use for blitting
+                animated Tiles.
+        """
+
+        area_rect = pygame.Rect(area_rect)
+
+        if surface and self.tile_ids and area_rect.width and area_rect.height:
+            surface.fill(viewingdata.COLOR_BLACK, area_rect)
+
+            # Get the Tiles overlapping the area.
+            start_tile_x = max(
+                0,
+                (area_rect.left - self.top_left_position[0]) // tile.TILE_SIZE
+            )
+            start_tile_y = max(
+                0,
+                (area_rect.top - self.top_left_position[1]) // tile.TILE_SIZE
+            )
+            end_tile_x = min(
+                self.width - 1,
+                (area_rect.right - 1 - self.top_left_position[0]) \
+                    // tile.TILE_SIZE
+            )
+            end_tile_y = min(
+                self.height - 1,
+                (area_rect.bottom - 1 - self.top_left_position[1]) \
+                    // tile.TILE_SIZE
+            )
+
+            if (end_tile_x >= start_tile_x) and (end_tile_y >= start_tile_y):
+                old_clip = surface.get_clip()
+                surface.set_clip(area_rect)
+
+                self.blit_tiles(
+                    surface,
+                    tile_subset_rect=(
+                        start_tile_x,
+                        start_tile_y,
+                        end_tile_x - start_tile_x + 1,
+                        end_tile_y - start_tile_y + 1,
+                    ),
+                    blit_time_ms=blit_time_ms,
+                )
+
+                surface.set_clip(old_clip)
+
+    def redraw_animated_tiles(self, surface, blit_time_ms=None):
+        """Redraws the animated Tiles that fall within the surface with
+        their image at the given time.
+
+        Each Tile's area is filled black first, as in the tile layer chunks,
+        so that the image drawn before does not show through.
+
+        Caller needs to update the pygame display surface.
+
+        Args:
+            surface: pygame Surface object holding the Map's Tiles at the
+                Map's current top left position.
+            blit_time_ms: the system time in milliseconds to use for picking
+                images from image sequences.
+        """
+
+        if not (surface and self.top_left_position and self.tile_ids):
+            return
+
+        surface_rect = surface.get_rect()
+        map_left = self.top_left_position[0]
+        map_top = self.top_left_position[1]
+
+        for tile_loc in self.get_animated_tile_locations():
+            tile_pixel_rect = pygame.Rect(
+                map_left + (tile_loc[0] * tile.TILE_SIZE),
+                map_top + (tile_loc[1] * tile.TILE_SIZE),
+                tile.TILE_SIZE,
+                tile.TILE_SIZE,
+            )
+
+            if surface_rect.colliderect(tile_pixel_rect):
+                surface.fill(viewingdata.COLOR_BLACK, tile_pixel_rect)
+                surface.blit(
+                    self.get_tile_from_pos(tile_loc).get_image(blit_time_ms),
+                    tile_pixel_rect.topleft,
+                )
+
+    # Moves the map's top left position the indicated distance in the
+    # indicated scroll direction, without blitting anything.
+    # Returns the new top left position.
+    def shift_top_left(self, scroll_direction, distance):
+        new_pixel_location = None
+        curr_top_left = self.top_left_position
+
+        if scroll_direction == directions.DIR_NORTH:
+            # scroll up
+            new_pixel_location = (curr_top_left[0], curr_top_left[1] - distance)
+        elif scroll_direction == directions.DIR_EAST:
+            # scroll right
+            new_pixel_location = (curr_top_left[0] + distance, curr_top_left[1])
+        elif scroll_direction == directions.DIR_SOUTH:
+            new_pixel_location = (curr_top_left[0], curr_top_left[1] + distance)
+        elif scroll_direction == directions.DIR_WEST:
+            # scroll left
+            new_pixel_location = (curr_top_left[0] - distance, curr_top_left[1])
+        else:
+            # invalid scroll direction
+            LOGGER.error("Invalid scroll direction %s", scroll_direction)
+            sys.exit(3)
+
+        self.top_left_position = new_pixel_location
+
+        return new_pixel_location
 
     # scroll map in the indicated direction for the indicated distancet
     # also pass in surface object to blit on and update
     # does NOT update the main display - caller will have to do that
+    @profiling.profile_scope('Map.scroll')
     def scroll(self, surface, scroll_direction, distance, tile_subset_rect=None):
         # don't bother if distance <= 0
         if self and surface and (distance > 0):
-            new_pixel_location = None
-            curr_top_left = self.top_left_position
-
-            if scroll_direction == directions.DIR_NORTH:
-                # scroll up
-                new_pixel_location = (curr_top_left[0], curr_top_left[1] - distance)
-            elif scroll_direction == directions.DIR_EAST:
-                # scroll right
-                new_pixel_location = (curr_top_left[0] + distance, curr_top_left[1])
-            elif scroll_direction == directions.DIR_SOUTH:
-                new_pixel_location = (curr_top_left[0], curr_top_left[1] + distance)
-            elif scroll_direction == directions.DIR_WEST:
-                # scroll left
-                new_pixel_location = (curr_top_left[0] - distance, curr_top_left[1])
-            else:
-                # invalid scroll direction
-                LOGGER.error("Invalid scroll direction %s", scroll_direction)
-                sys.exit(3)
-
-            if new_pixel_location:
-                # Update map top left and blit map.
-                self.top_left_position = new_pixel_location
-                self.blit_map(
-                    surface,
-                    tile_subset_rect=tile_subset_rect,
-                    blit_time_ms=pygame.time.get_ticks(),
-                )
+            # Update map top left and blit map.
+            self.shift_top_left(scroll_direction, distance)
+            self.blit_map(
+                surface,
+                tile_subset_rect=tile_subset_rect,
+                blit_time_ms=timekeeper.Timekeeper.get_time_ms(),
+            )
 
     def execute_spawn_action(self, tile_loc, obj_id):
         if tile_loc:
@@ -873,15 +1872,16 @@ class Map:
 
                 self.set_interactive_object(obj_id, tile_loc)
 
-    # Refreshes map. Check for respawns.
+    # Refreshes map. Respawns are run by the world Scheduler instead,
+    # see set_pending_spawn_action.
     # Does not reblit map - caller will have to do that.
     def refresh_self(
             self,
             #surface,
             #tile_subset_rect=None,
         ):
-        # Get elapsed time since last refresh.
-        curr_time_ms = pygame.time.get_ticks()
+        # Get elapsed game time since last refresh.
+        curr_time_ms = timekeeper.Timekeeper.get_game_time_ms()
 
         elapsed_ms = curr_time_ms - self.last_refresh_time_ms
 
@@ -891,40 +1891,6 @@ class Map:
             logger.error("Error with elapsed time %d", elapsed_ms)
             sys.exit(4)
 
-        # Update remaining timers for spawn actions.
-        if self.pending_spawn_actions:
-            LOGGER.debug("Refreshing self.")
-
-            to_finish = []
-
-            for tile_loc_tuple, action_info in self.pending_spawn_actions.items():
-                # action_info is of the form (object ID for object to place on
-                # tile (None if removing object), and remaining time in
-                # milliseconds).
-                if action_info and (len(action_info) == 2):
-                    remaining_ms = action_info[1] - elapsed_ms
-                    action_info[1] = remaining_ms
-                    self.pending_spawn_actions[tile_loc_tuple] = action_info
-
-                    if remaining_ms <= 0:
-                        # Add to processing list.
-                        to_finish.append(tile_loc_tuple)
-                else:
-                    LOGGER.error("Invalid spawn action info %s.", action_info)
-                    sys.exit(3)
-
-            # Remove spawn action from the pending dict and execute
-            # the spawn action.
-            for loc_tuple in to_finish:
-                spawn_action = self.pending_spawn_actions.pop(loc_tuple, None)
-
-                if spawn_action:
-                    obj_id = spawn_action[0]
-
-                    self.execute_spawn_action(loc_tuple, obj_id)
-
-            LOGGER.debug("Remaining spawns: %d", self.pending_spawn_actions)
-
     ### CLASS METHODS ###
 
     # builds map based on given map ID. Returns map if valid map ID.
@@ -967,6 +1933,9 @@ class Map:
                     # like with the interactive objects?
 
                     if ret_map:
+                        if PRERENDER_TILE_LAYER:
+                            ret_map.build_tile_layer()
+
                         if ret_map.init_interactive_obj(
                             ret_map_data.get(
                                 mapdata.MAP_INTER_OBJ_DICT_FIELD,
@@ -981,6 +1950,8 @@ class Map:
                                 "Failed to initialize all interactive objects on map %d",
                                 map_id,
                             )
+
+                        ret_map.build_region_labels()
                         # Add map to listing,
                         # even if the objects weren't all successfully initialized.
                         Map.map_listing[map_id] = ret_map
@@ -989,47 +1960,46 @@ class Map:
 
         return ret_map
 
-    # TODO document
+    # Converts a list of Strings representing the rows of a map into a list
+    # of lists of tile IDs, using legend to map each character to a tile ID.
+    # Builds the Tiles for the tile IDs used if they have not been built yet.
+    # Returns None if a character is missing from the legend or maps to
+    # an unknown tile ID.
     @classmethod
     def parse_tile_grid(cls, tile_grid_str_list, legend):
         ret_grid = None
-        failed = False
 
         if tile_grid_str_list and legend:
-            curr_grid = []
-
-            for row_str in tile_grid_str_list:
-                curr_row = []
-                if not failed:
-                    for tile_char in row_str:
-                        curr_id = legend.get(tile_char, None)
-                        if curr_id:
-                            curr_tile = tile.Tile.get_tile(curr_id)
-                            if curr_tile:
-                                curr_row.append(curr_tile)
-                            else:
-                                LOGGER.warn("No tile found for tile id %d", curr_id)
-                                failed = True
-                                break
-                        else:
-                            LOGGER.warn("No tile id found for tile char %s", tile_char)
-                            failed = True
-                            break
-                    if curr_row:
-                        curr_grid.append(curr_row)
-                    else:
-                        LOGGER.warn("No tiles added to row")
-                        failed = True
-                        break
-            if not failed:
-                ret_grid = curr_grid
+            used_chars = set(''.join(tile_grid_str_list))
+            unknown_chars = used_chars.difference(legend)
+            unknown_ids = set(
+                legend[tile_char] for tile_char in used_chars.intersection(legend)
+                if not tile.Tile.get_tile(legend[tile_char])
+            )
+
+            if unknown_chars:
+                LOGGER.warn("No tile id found for tile chars %s", unknown_chars)
+            elif unknown_ids:
+                LOGGER.warn("No tile found for tile ids %s", unknown_ids)
+            elif not all(tile_grid_str_list):
+                LOGGER.warn("No tiles added to row")
+            else:
+                ret_grid = [
+                    [legend[tile_char] for tile_char in row_str]
+                    for row_str in tile_grid_str_list
+                ]
 
         return ret_grid
 
+    # Returns the map for the given map ID, building it first if it
+    # has not been built yet.
     @classmethod
     def get_map(cls, map_id):
         ret_map = Map.map_listing.get(map_id, None)
 
+        if (ret_map is None) and (map_id in mapdata.MAP_DATA):
+            ret_map = Map.map_factory(map_id)
+
         if not ret_map:
             LOGGER.warn(
                 "Get_map: No map found for map id %d",
@@ -1051,6 +2021,5 @@ class Map:
                 sys.exit(2)
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
@@ -0,0 +1,471 @@
+# -*- coding: utf-8 -*-
+"""This module contains the ImageLoader class for loading images.
+
+Every image the game draws is loaded through ImageLoader.load_image, which
+keeps one process-wide cache of converted Surfaces. Entries are keyed by
+the image's content (a hash of the file) and conversion mode, so an image
+is decoded once however many objects or paths use it, and every user
+shares the same Surface. Users that are done with an image hand it back
+with release_image. Images nobody holds stay cached until the cache grows
+past its size budget, at which point the least recently used of them are
+dropped.
+
+Held images are never dropped, whatever the budget. Tiles, interactive
+objects and displays are built once and kept for the whole session, so
+their images stay held and cached until the game exits. The budget only
+bounds images that have been released, such as menu icons (see
+viewingicon.ViewingIcon.unload_images), and images the asset loader
+decoded ahead of time that nothing has loaded yet.
+
+If the image was packed into a texture atlas by atlas.py, it comes back as
+a subsurface of its atlas sheet, so each sheet is opened and decoded once
+and the images on it share one block of pixel memory. Images that are not
+in the atlas, or every image if no atlas has been built, are loaded from
+their own files.
+
+Cached Surfaces are shared, so callers must not draw onto them.
+
+While assetloader.AssetLoader is running, files it has already decoded on
+its worker threads are taken from it rather than decoded again.
+"""
+
+import collections
+import hashlib
+import io
+import json
+import logging
+import os
+import pygame
+
+# Location of the atlas sheets and index written by atlas.py.
+ATLAS_DIR = "images/atlas/"
+ATLAS_INDEX_PATH = ATLAS_DIR + "atlas_index.json"
+ATLAS_FORMAT_VERSION = 1
+
+### CONVERSION MODES ###
+# Surface.convert_alpha, keeping per-pixel alpha.
+CONVERT_ALPHA = 0x1
+# Surface.convert, dropping alpha.
+CONVERT_OPAQUE = 0x2
+# No conversion.
+CONVERT_NONE = 0x3
+
+# Size budget in megabytes for the image cache. Images that are still held
+# are never dropped, so the cache can grow past this.
+DEFAULT_CACHE_BUDGET_MB = 64
+
+class ImageLoader(object):
+    """Loads and caches images, from texture atlas sheets where possible.
+
+    The user should not generate ImageLoader objects, as the class
+    is primarily for class methods related to loading images.
+    """
+
+    # If False, images are always loaded from their own files.
+    use_atlas = True
+
+    # Size budget in bytes for the image cache.
+    cache_budget_bytes = DEFAULT_CACHE_BUDGET_MB * 1024 * 1024
+
+    # Maps image paths to (sheet index, (x, y, width, height)) tuples for
+    # the images in the atlas, or None if the index has not been read yet.
+    _atlas_index = None
+
+    # List of atlas sheet file paths, and a dict mapping sheet indices to
+    # their converted Surfaces once loaded. Sheets stay loaded.
+    _atlas_sheet_paths = []
+    _atlas_sheets = {}
+
+    # Maps (image path, conversion mode) tuples to cache keys.
+    _path_keys = {}
+
+    # Maps cache keys to [Surface, reference count, size in bytes] lists,
+    # least recently used first. Cache keys are (file content hash,
+    # conversion mode) tuples for images loaded from their own files, and
+    # (sheet index, image rect tuple) tuples for atlas images. Atlas images
+    # count as 0 bytes, since their pixels belong to the sheet.
+    _cache = collections.OrderedDict()
+
+    # Total size in bytes of the cached images.
+    _cache_bytes = 0
+
+    # Callable that takes a file path and returns a (content hash,
+    # unconverted Surface) tuple for it if it was decoded ahead of time, or
+    # None. None to always decode files here.
+    _decoded_image_source = None
+
+    # Number of loads served from the cache, number of image files and
+    # atlas sheets decoded, and number of images dropped from the cache.
+    _num_cache_hits = 0
+    _num_file_loads = 0
+    _num_atlas_loads = 0
+    _num_sheet_loads = 0
+    _num_evictions = 0
+
+    @classmethod
+    def _read_atlas_index(cls):
+        """Reads the atlas index, if there is a usable one."""
+
+        cls._atlas_index = {}
+        cls._atlas_sheet_paths = []
+        cls._atlas_sheets = {}
+
+        if not (cls.use_atlas and os.path.isfile(ATLAS_INDEX_PATH)):
+            return
+
+        with open(ATLAS_INDEX_PATH, 'r') as index_file:
+            index_data = json.load(index_file)
+
+        if index_data.get('version') != ATLAS_FORMAT_VERSION:
+            LOGGER.warning(
+                "Ignoring atlas index %s with format version %s",
+                ATLAS_INDEX_PATH,
+                index_data.get('version'),
+            )
+            return
+
+        cls._atlas_sheet_paths = [
+            os.path.join(ATLAS_DIR, sheet_name)
+            for sheet_name in index_data['sheets']
+        ]
+
+        for image_path, image_entry in index_data['images'].items():
+            cls._atlas_index[image_path] = (image_entry[0], tuple(image_entry[1:]))
+
+        LOGGER.info(
+            "Read atlas index with %d images on %d sheets",
+            len(cls._atlas_index),
+            len(cls._atlas_sheet_paths),
+        )
+
+    @classmethod
+    def reset(cls):
+        """Drops the image cache, the atlas index and the loaded sheets, so
+        that images are loaded again and the index is read again on the next
+        load.
+
+        Surfaces already handed out stay usable.
+        """
+
+        cls._atlas_index = None
+        cls._atlas_sheet_paths = []
+        cls._atlas_sheets = {}
+        cls._path_keys = {}
+        cls._cache = collections.OrderedDict()
+        cls._cache_bytes = 0
+
+    @classmethod
+    def set_decoded_image_source(cls, image_source):
+        """Sets the callable to take images decoded ahead of time from.
+
+        Args:
+            cls: class object.
+            image_source: callable that takes a file path and returns a
+                (content hash, unconverted Surface) tuple, or None if the
+                file was not decoded ahead of time. None to always decode
+                files when they are loaded.
+        """
+
+        cls._decoded_image_source = image_source
+
+    @classmethod
+    def _get_decoded_image(cls, file_path):
+        """Returns the (content hash, unconverted Surface) tuple for a file
+        from the decoded image source, or None."""
+
+        if cls._decoded_image_source:
+            return cls._decoded_image_source(file_path)
+
+        return None
+
+    @classmethod
+    def _get_atlas_sheet(cls, sheet_index):
+        """Returns the converted Surface for an atlas sheet, loading it if
+        needed."""
+
+        sheet = cls._atlas_sheets.get(sheet_index, None)
+
+        if sheet is None:
+            sheet_path = cls._atlas_sheet_paths[sheet_index]
+            decoded_image = cls._get_decoded_image(sheet_path)
+
+            if decoded_image:
+                sheet = decoded_image[1].convert_alpha()
+            else:
+                sheet = pygame.image.load(sheet_path).convert_alpha()
+
+            cls._atlas_sheets[sheet_index] = sheet
+            cls._num_sheet_loads = cls._num_sheet_loads + 1
+
+        return sheet
+
+    @classmethod
+    def _hold_entry(cls, cache_key):
+        """Adds a reference to a cached image and marks it as most recently
+        used.
+
+        Returns:
+            the cached Surface.
+        """
+
+        cache_entry = cls._cache[cache_key]
+        cache_entry[1] = cache_entry[1] + 1
+        cls._cache.move_to_end(cache_key)
+
+        return cache_entry[0]
+
+    @classmethod
+    def load_image(cls, image_path, convert_mode=CONVERT_ALPHA):
+        """Returns a shared Surface for an image file.
+
+        Each call holds a reference to the image, which the caller can hand
+        back with release_image once it no longer needs it.
+
+        Args:
+            cls: class object.
+            image_path: path of the image file, as given in imagepaths.
+            convert_mode: CONVERSION MODE for the Surface. Only
+                CONVERT_ALPHA images come from the atlas.
+        """
+
+        path_key = (image_path, convert_mode)
+        cache_key = cls._path_keys.get(path_key, None)
+
+        if cache_key in cls._cache:
+            cls._num_cache_hits = cls._num_cache_hits + 1
+
+            return cls._hold_entry(cache_key)
+
+        if cls._atlas_index is None:
+            cls._read_atlas_index()
+
+        atlas_entry = None
+        if convert_mode == CONVERT_ALPHA:
+            atlas_entry = cls._atlas_index.get(image_path, None)
+
+        if atlas_entry:
+            cache_key = atlas_entry
+            sheet_index, image_rect = atlas_entry
+
+            if cache_key not in cls._cache:
+                cls._num_atlas_loads = cls._num_atlas_loads + 1
+                cls._cache[cache_key] = [
+                    cls._get_atlas_sheet(sheet_index).subsurface(image_rect),
+                    0,
+                    0,
+                ]
+        else:
+            decoded_image = cls._get_decoded_image(image_path)
+
+            if decoded_image:
+                content_hash, image = decoded_image
+            else:
+                with open(image_path, 'rb') as image_file:
+                    image_data = image_file.read()
+
+                content_hash = hashlib.sha1(image_data).digest()
+                image = None
+
+            cache_key = (content_hash, convert_mode)
+
+            if cache_key in cls._cache:
+                # Same image content under another path.
+                cls._num_cache_hits = cls._num_cache_hits + 1
+            else:
+                cls._num_file_loads = cls._num_file_loads + 1
+
+                if image is None:
+                    image = pygame.image.load(io.BytesIO(image_data), image_path)
+
+                cls._add_entry(cache_key, image, convert_mode)
+
+        cls._path_keys[path_key] = cache_key
+        image = cls._hold_entry(cache_key)
+
+        if cls._cache_bytes > cls.cache_budget_bytes:
+            cls._evict()
+
+        return image
+
+    @classmethod
+    def _add_entry(cls, cache_key, image, convert_mode):
+        """Converts an image and adds it to the cache, unheld."""
+
+        if convert_mode == CONVERT_ALPHA:
+            image = image.convert_alpha()
+        elif convert_mode == CONVERT_OPAQUE:
+            image = image.convert()
+
+        num_bytes = image.get_width() * image.get_height() \
+            * image.get_bytesize()
+
+        cls._cache[cache_key] = [image, 0, num_bytes]
+        cls._cache_bytes = cls._cache_bytes + num_bytes
+
+    @classmethod
+    def get_source_paths(cls, image_paths):
+        """Returns a list of the files to decode to load images that are not
+        loaded yet, which are the atlas sheets for images in the atlas and
+        the images' own files otherwise.
+
+        Args:
+            cls: class object.
+            image_paths: iterable of image paths, as given in imagepaths.
+        """
+
+        if cls._atlas_index is None:
+            cls._read_atlas_index()
+
+        ret_paths = []
+        seen_paths = set()
+
+        for image_path in image_paths:
+            atlas_entry = cls._atlas_index.get(image_path, None)
+
+            if atlas_entry:
+                if atlas_entry[0] in cls._atlas_sheets:
+                    continue
+
+                source_path = cls._atlas_sheet_paths[atlas_entry[0]]
+            elif cls._path_keys.get((image_path, CONVERT_ALPHA), None) \
+                    in cls._cache:
+                continue
+            else:
+                source_path = image_path
+
+            if source_path not in seen_paths:
+                seen_paths.add(source_path)
+                ret_paths.append(source_path)
+
+        return ret_paths
+
+    @classmethod
+    def add_decoded_image(cls, source_path, content_hash, image):
+        """Converts an image or atlas sheet that was decoded ahead of time
+        and adds it to the cache, unheld, so that loading it later is a
+        cache hit.
+
+        Args:
+            cls: class object.
+            source_path: path the image was decoded from, as returned by
+                get_source_paths.
+            content_hash: SHA-1 digest of the file.
+            image: unconverted Surface.
+        """
+
+        if source_path in cls._atlas_sheet_paths:
+            sheet_index = cls._atlas_sheet_paths.index(source_path)
+
+            if sheet_index not in cls._atlas_sheets:
+                cls._atlas_sheets[sheet_index] = image.convert_alpha()
+                cls._num_sheet_loads = cls._num_sheet_loads + 1
+
+            return
+
+        path_key = (source_path, CONVERT_ALPHA)
+        cache_key = (content_hash, CONVERT_ALPHA)
+
+        if cls._path_keys.get(path_key, None) in cls._cache:
+            return
+
+        if cache_key not in cls._cache:
+            cls._num_file_loads = cls._num_file_loads + 1
+            cls._add_entry(cache_key, image, CONVERT_ALPHA)
+
+        cls._path_keys[path_key] = cache_key
+
+        if cls._cache_bytes > cls.cache_budget_bytes:
+            cls._evict()
+
+    @classmethod
+    def release_image(cls, image_path, convert_mode=CONVERT_ALPHA):
+        """Hands back a reference to an image from load_image.
+
+        The image stays cached, and is dropped only once nothing holds it
+        and the cache is over its budget. Owners that live for the whole
+        session never call this, so their images are never dropped.
+        """
+
+        cache_key = cls._path_keys.get((image_path, convert_mode), None)
+        cache_entry = cls._cache.get(cache_key, None)
+
+        if cache_entry and (cache_entry[1] > 0):
+            cache_entry[1] = cache_entry[1] - 1
+
+            if (cache_entry[1] == 0) \
+                    and (cls._cache_bytes > cls.cache_budget_bytes):
+                cls._evict()
+        else:
+            LOGGER.warning("Releasing image %s that is not held", image_path)
+
+    @classmethod
+    def _evict(cls):
+        """Drops the least recently used images that nothing holds until
+        the cache is within its budget."""
+
+        evicted_keys = set()
+
+        for cache_key, cache_entry in list(cls._cache.items()):
+            if cls._cache_bytes <= cls.cache_budget_bytes:
+                break
+
+            if cache_entry[1] == 0:
+                del cls._cache[cache_key]
+                cls._cache_bytes = cls._cache_bytes - cache_entry[2]
+                cls._num_evictions = cls._num_evictions + 1
+                evicted_keys.add(cache_key)
+
+        if evicted_keys:
+            cls._path_keys = dict(
+                (path_key, cache_key)
+                for path_key, cache_key in cls._path_keys.items()
+                if cache_key not in evicted_keys
+            )
+
+    @classmethod
+    def set_cache_budget_mb(cls, budget_mb):
+        """Sets the size budget of the image cache in megabytes, dropping
+        images that nothing holds if the cache is over it."""
+
+        cls.cache_budget_bytes = int(budget_mb * 1024 * 1024)
+
+        if cls._cache_bytes > cls.cache_budget_bytes:
+            cls._evict()
+
+    @classmethod
+    def get_load_counts(cls):
+        """Returns a dict with the number of loads served from the cache,
+        the number of images loaded from their own files and from atlas
+        sheets, the number of sheets loaded, and the number of images
+        dropped from the cache."""
+
+        return {
+            'cache_hits': cls._num_cache_hits,
+            'file_loads': cls._num_file_loads,
+            'atlas_loads': cls._num_atlas_loads,
+            'sheet_loads': cls._num_sheet_loads,
+            'evictions': cls._num_evictions,
+        }
+
+    @classmethod
+    def get_cache_stats(cls):
+        """Returns a dict with the number of cached images, the number held,
+        and the cache size and the size of the held images in bytes, not
+        counting atlas sheets. Held images cannot be evicted."""
+
+        return {
+            'images': len(cls._cache),
+            'held_images': sum(
+                1 for cache_entry in cls._cache.values() if cache_entry[1]
+            ),
+            'bytes': cls._cache_bytes,
+            'held_bytes': sum(
+                cache_entry[2] for cache_entry in cls._cache.values()
+                if cache_entry[1]
+            ),
+            'budget_bytes': cls.cache_budget_bytes,
+        }
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
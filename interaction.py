@@ -1,9 +1,11 @@
 import pygame
+import compositor
 import interactiondata
 import resource
 import entity
 import language
 import display
+import replay
 import timekeeper
 import random
 import skills
@@ -13,6 +15,7 @@ import items
 import itemdata
 import logging
 import objdata
+import profiling
 
 GATHERING_START_DELAY_MS = 500
 GATHERING_EXHAUST_DELAY_MS = 1000
@@ -129,6 +132,7 @@ class Interaction():
 
     # Main skilling text must be 1 page or less.
     @classmethod
+    @profiling.profile_scope('Interaction.gathering_interaction')
     def gathering_interaction(
             cls,
             interaction_id,
@@ -243,7 +247,7 @@ class Interaction():
 
                     # Check if user is ending early by pressing a valid key.
                     exit_key_pressed = False
-                    for events in pygame.event.get():
+                    for events in replay.Replay.get_events():
                         if events.type == pygame.QUIT:
                             LOGGER.info("Quitting.")
                             pygame.quit()
@@ -375,7 +379,7 @@ class Interaction():
 
         # Update overworld and display.
         game_object.refresh_and_blit_overworld_viewing()
-        pygame.display.update()
+        compositor.Compositor.present()
 
     @classmethod
     def chop_tree_interaction(
@@ -715,6 +719,5 @@ ID_TO_METHOD_MAPPING = {
 }
 
 # Set up logger.
-logging.basicConfig(level=logging.INFO)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
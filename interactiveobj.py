@@ -1,10 +1,13 @@
 import pygame
+import imageloader
 import imagepaths
 import objdata
 import logging
 import interactiondata
 import imageids
 import language
+import tile
+import tracelog
 
 ### IMAGE FLAGS ###
 #IMAGE_F_OVERWORLD = 0x1 # sets overworld images
@@ -14,6 +17,10 @@ class InteractiveObject(pygame.sprite.Sprite):
     # maps interactive obj ID to interactive obj
     interactive_obj_listing = {}
 
+    # list of (object data dict, factory method) tuples for making objects
+    # that are asked for before they have been made
+    _object_factories = []
+
     # examine_info maps language IDs to an examine string.
     def __init__(
             self,
@@ -58,9 +65,9 @@ class InteractiveObject(pygame.sprite.Sprite):
             image_list = []
 
             if isinstance(image_sequence_info, str):
-                loaded_image = pygame.image.load(
+                loaded_image = imageloader.ImageLoader.load_image(
                     image_sequence_info
-                ).convert_alpha()
+                )
 
                 if loaded_image:
                     self.image_sequence_dict[image_sequence_id] = [loaded_image]
@@ -72,7 +79,7 @@ class InteractiveObject(pygame.sprite.Sprite):
                     image_sequence_duration
 
                 for image_path in image_path_list:
-                    loaded_image = pygame.image.load(image_path).convert_alpha()
+                    loaded_image = imageloader.ImageLoader.load_image(image_path)
                     if loaded_image:
                         image_list.append(loaded_image)
 
@@ -110,42 +117,12 @@ class InteractiveObject(pygame.sprite.Sprite):
             blit_time_ms=None,
         ):
         if self and surface and (bottom_left_pixel or top_left_pixel):
-            id_to_use = None
-            image_to_blit = None
             top_left = None
-
-            if image_sequence_id:
-                id_to_use = image_sequence_id
-            else:
-                id_to_use = self.curr_image_sequence
-
-            image_list = self.image_sequence_dict.get(
-                id_to_use,
-                None
+            image_to_blit = self.get_image(
+                image_sequence_id=image_sequence_id,
+                blit_time_ms=blit_time_ms,
             )
 
-            if self.in_adhoc_animation:
-                image_to_blit = image_list[
-                    self.adhoc_animation_index % len(image_list)
-                ]
-            else:
-                individual_image_duration = self._individual_image_duration_dict.get(
-                    id_to_use,
-                    None
-                )
-
-                # Get image to blit.
-                if image_list:
-                    if not individual_image_duration:
-                        image_to_blit = image_list[0]
-                    elif not blit_time_ms:
-                        image_to_blit = image_list[0]
-                    else:
-                        image_to_blit = image_list[
-                            (blit_time_ms // individual_image_duration) \
-                            % len(image_list)
-                        ]
-
             if image_to_blit:
                 if bottom_left_pixel:
                     # get image dimensions
@@ -159,6 +136,67 @@ class InteractiveObject(pygame.sprite.Sprite):
                 if top_left:
                     surface.blit(image_to_blit, top_left)
 
+    # Returns the image that blit_onto_surface would blit for the
+    # given image sequence ID and blit time, or None if there is no such
+    # image.
+    def get_image(self, image_sequence_id=None, blit_time_ms=None):
+        image_to_blit = None
+        id_to_use = None
+
+        if image_sequence_id:
+            id_to_use = image_sequence_id
+        else:
+            id_to_use = self.curr_image_sequence
+
+        image_list = self.image_sequence_dict.get(
+            id_to_use,
+            None
+        )
+
+        if self.in_adhoc_animation:
+            image_to_blit = image_list[
+                self.adhoc_animation_index % len(image_list)
+            ]
+        else:
+            individual_image_duration = self._individual_image_duration_dict.get(
+                id_to_use,
+                None
+            )
+
+            # Get image to blit.
+            if image_list:
+                if not individual_image_duration:
+                    image_to_blit = image_list[0]
+                elif not blit_time_ms:
+                    image_to_blit = image_list[0]
+                else:
+                    image_to_blit = image_list[
+                        (blit_time_ms // individual_image_duration) \
+                        % len(image_list)
+                    ]
+
+        return image_to_blit
+
+    # Returns the time in milliseconds after curr_time_ms at which get_image
+    # will next return a different image for the current image sequence,
+    # or None if the image does not change over time.
+    def get_next_image_change_ms(self, curr_time_ms):
+        if self.in_adhoc_animation:
+            return None
+
+        image_list = self.image_sequence_dict.get(self.curr_image_sequence, None)
+        individual_image_duration = self._individual_image_duration_dict.get(
+            self.curr_image_sequence,
+            None
+        )
+
+        if (not image_list) or (len(image_list) < 2) \
+                or (not individual_image_duration):
+            return None
+
+        return ((curr_time_ms // individual_image_duration) + 1) \
+            * individual_image_duration
+
     @classmethod
     def misc_interactive_object_factory(cls, obj_id):
         ret_object = None
@@ -166,7 +204,7 @@ class InteractiveObject(pygame.sprite.Sprite):
         # Make sure we are dealing with a miscellaneous object.
         if cls.is_miscellaneous_id(obj_id):
             # Check if we already have the object made.
-            obj_from_listing = cls.get_interactive_object(obj_id)
+            obj_from_listing = cls.interactive_obj_listing.get(obj_id, None)
 
             if obj_from_listing:
                 # Return the already made object.
@@ -210,7 +248,10 @@ class InteractiveObject(pygame.sprite.Sprite):
                             replacement_object_id=replacement_object_id,
                         )
 
-                        logger.debug("Made object with ID {0}".format(obj_id))
+                        tracelog.TraceLog.record(
+                            tracelog.EVENT_OBJECT_MADE,
+                            obj_id,
+                        )
 
                         # Update the interactive object mapping.
                         result = cls.add_interactive_obj_to_listing(
@@ -231,9 +272,27 @@ class InteractiveObject(pygame.sprite.Sprite):
 
         return ret_object
 
+    # Returns the interactive object for the given object ID. If the object
+    # has not been made yet, makes it with the factory method added for the
+    # object data that has the object ID.
     @classmethod
     def get_interactive_object(cls, obj_id):
-        return cls.interactive_obj_listing.get(obj_id, None)
+        ret_object = cls.interactive_obj_listing.get(obj_id, None)
+
+        if ret_object is None:
+            for object_data, factory in cls._object_factories:
+                if obj_id in object_data:
+                    ret_object = factory(obj_id)
+                    break
+
+        return ret_object
+
+    # Adds a factory method for get_interactive_object to make objects
+    # with IDs in object_data, a dict that maps object IDs to object data.
+    @classmethod
+    def add_object_factory(cls, object_data, factory):
+        if (object_data, factory) not in cls._object_factories:
+            cls._object_factories.append((object_data, factory))
 
     # Adds/updates the interactive object listing for the given object ID.
     # Returns True upon success, false otherwise.
@@ -241,7 +300,7 @@ class InteractiveObject(pygame.sprite.Sprite):
     def add_interactive_obj_to_listing(cls, obj_id, inter_obj):
         if inter_obj and (obj_id is not None):
             cls.interactive_obj_listing[obj_id] = inter_obj
-            logger.debug("Added object ID {0} to inter obj listing.".format(obj_id))
+            tracelog.TraceLog.record(tracelog.EVENT_OBJECT_LISTED, obj_id)
             return True
         else:
             return False
@@ -261,6 +320,39 @@ class InteractiveObject(pygame.sprite.Sprite):
 
         return ret_rect
 
+    # Returns a pygame Rect of tile coordinates that covers both the
+    # object's collision rectangle and the largest of its images when
+    # blitted with its bottom left corner at the given bottom left tile
+    # location.
+    def get_drawn_tile_rect(self, bottom_left_tile_loc):
+        ret_rect = None
+
+        if self and bottom_left_tile_loc:
+            ret_rect = pygame.Rect(
+                self.get_collision_tile_rect(bottom_left_tile_loc)
+            )
+
+            max_width = 0
+            max_height = 0
+            for image_list in self.image_sequence_dict.values():
+                for image in image_list:
+                    max_width = max(max_width, image.get_width())
+                    max_height = max(max_height, image.get_height())
+
+            # Round image size up to whole tiles.
+            image_tile_width = -(-max_width // tile.TILE_SIZE)
+            image_tile_height = -(-max_height // tile.TILE_SIZE)
+
+            if image_tile_width and image_tile_height:
+                ret_rect.union_ip(pygame.Rect(
+                    bottom_left_tile_loc[0],
+                    bottom_left_tile_loc[1] - image_tile_height + 1,
+                    image_tile_width,
+                    image_tile_height,
+                ))
+
+        return ret_rect
+
     # Returns set of tile coordinate tuples that make up the
     # object's collision rectangle given the object's bottom left tile
     # location
@@ -277,7 +369,11 @@ class InteractiveObject(pygame.sprite.Sprite):
                 for y in range(collision_rect[3]):
                     for x in range(collision_rect[2]):
                         collision_set.add((start_x + x, start_y + y))
-        logger.debug("Collision set: {0}".format(collision_set))
+        tracelog.TraceLog.record(
+            tracelog.EVENT_COLLISION_SET,
+            bottom_left_tile_loc,
+            len(collision_set),
+        )
         return collision_set
 
     @classmethod
@@ -314,7 +410,11 @@ class InteractiveObject(pygame.sprite.Sprite):
             if not cls.misc_interactive_object_factory(obj_id):
                 logger.error("Could not construct misc object with ID {0}".format(obj_id))
 
+InteractiveObject.add_object_factory(
+    objdata.MISC_OBJECT_DATA,
+    InteractiveObject.misc_interactive_object_factory,
+)
+
 # set up logger
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
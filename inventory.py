@@ -1,6 +1,7 @@
 import language
 import items
 import logging
+import tracelog
 
 DEFAULT_MAX_INVENT_SIZE = 120 #30 #40?
 DEFAULT_MAX_ITEM_LISTING_SIZE = 200
@@ -290,12 +291,6 @@ class Inventory(ItemListing):
                             new_quantity,
                         )
 
-                        logger.info("Prev {2} quantity: {0}. New quantity: {1}".format(
-                            old_quantity,
-                            self._item_listing_data[item_index][1],
-                            item_obj.get_name(),
-                        ))
-
                         success = True
                     elif self.is_full():
                         # Can't fit new slot.
@@ -333,10 +328,11 @@ class Inventory(ItemListing):
             logger.error("Invalid item ID {0}".format(item_id))
 
         if success:
-            logger.info("Added item {0} x{1} to inventory.".format(
-                item_obj.get_name(),
+            tracelog.TraceLog.record(
+                tracelog.EVENT_ITEM_ADDED,
+                item_id,
                 num_to_add,
-            ))
+            )
 
         return success
 
@@ -385,10 +381,15 @@ class Inventory(ItemListing):
 
                         curr_index -= 1
 
-                logger.info("Removed {0} x{1}".format(
-                    item_obj.get_name(),
-                    old_quantity - self.get_item_quantity(item_id)
-                ))
+                    # Any left to remove were not found.
+                    new_quantity = new_quantity + to_remove
+
+                tracelog.TraceLog.record(
+                    tracelog.EVENT_ITEM_REMOVED,
+                    item_id,
+                    old_quantity - new_quantity,
+                    new_quantity,
+                )
             else:
                 logger.error(
                     "Trying to remove invalid item ID from inventory.".format(
@@ -445,6 +446,5 @@ class Inventory(ItemListing):
 
 
 # set up logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
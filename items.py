@@ -117,9 +117,16 @@ class Item(viewingicon.ViewingIcon):
         else:
             return False
 
+    # Returns the item for the given item ID, making it first if it has
+    # not been made yet.
     @classmethod
     def get_item(cls, item_id):
-        return cls.item_listing.get(item_id, None)
+        ret_item = cls.item_listing.get(item_id, None)
+
+        if (ret_item is None) and (item_id in itemdata.STANDARD_ITEM_DATA):
+            ret_item = cls.standard_item_factory(item_id)
+
+        return ret_item
 
     # Adds/updates the interactive object listing for the given object ID.
     # Returns True upon success, false otherwise.
@@ -139,7 +146,7 @@ class Item(viewingicon.ViewingIcon):
         ret_item = None
 
         # Check if we already have the item made.
-        item_from_listing = cls.get_item(item_id)
+        item_from_listing = cls.item_listing.get(item_id, None)
 
         if item_from_listing:
             # Return the already made item.
@@ -358,6 +365,5 @@ class Consumable_Item(Item):
 
 
 # set up logger
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Reports the areas of each map that cannot be reached from the rest.
+
+Run from the game directory, for example:
+
+    python mapreport.py
+    python mapreport.py --map-id 10
+
+For each map in mapdata.MAP_DATA and each transportation type, lists the
+connected regions of passable tiles (with the map's initial interactive
+objects in place) other than the largest one, since anything in them can
+only be reached through a connector or an adjacent map.
+"""
+
+import argparse
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import gamemap
+import mapdata
+import tiledata
+import benchmark
+
+# Maps transportation flags to their names for the report.
+TRANSPORT_NAMES = {
+    tiledata.WALKABLE_F: 'walk',
+    tiledata.CANOEABLE_F: 'canoe',
+    tiledata.SAILABLE_F: 'sail',
+    tiledata.FLYABLE_F: 'fly',
+}
+
+def report_map(map_obj):
+    """Prints the region report for a single map."""
+
+    print("Map {0} ({1}x{2})".format(map_obj.map_id, map_obj.width, map_obj.height))
+
+    for transport_flag in gamemap.PASSABILITY_TRANSPORT_FLAGS:
+        regions = sorted(
+            map_obj.get_regions(transport_flag).values(),
+            key=len,
+            reverse=True,
+        )
+
+        if not regions:
+            print("  {0:<6} no passable tiles".format(TRANSPORT_NAMES[transport_flag]))
+            continue
+
+        print(
+            "  {0:<6} {1} region(s), largest has {2} tiles".format(
+                TRANSPORT_NAMES[transport_flag],
+                len(regions),
+                len(regions[0]),
+            )
+        )
+
+        for region_locs in regions[1:]:
+            min_x = min(tile_loc[0] for tile_loc in region_locs)
+            min_y = min(tile_loc[1] for tile_loc in region_locs)
+            max_x = max(tile_loc[0] for tile_loc in region_locs)
+            max_y = max(tile_loc[1] for tile_loc in region_locs)
+
+            print(
+                "         unreachable: {0} tiles within ({1}, {2})-({3}, {4})".format(
+                    len(region_locs),
+                    min_x,
+                    min_y,
+                    max_x,
+                    max_y,
+                )
+            )
+
+def main(argv=None):
+    """Parses the command line and prints the report."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--map-id',
+        type=int,
+        action='append',
+        help='map to report on (can be repeated; default is every map)',
+    )
+    args = parser.parse_args(argv)
+
+    benchmark.init_game_data()
+
+    for map_id in (args.map_id or sorted(mapdata.MAP_DATA)):
+        map_obj = gamemap.Map.get_map(map_id)
+
+        if map_obj:
+            report_map(map_obj)
+        else:
+            print("Map {0}: not found".format(map_id))
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
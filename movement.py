@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""This module contains the MovementController class for turning direction
+key input into protagonist steps without blocking the main loop.
+"""
+
+import collections
+import logging
+
+### MOVEMENT STATE CONSTANTS ###
+MOVE_STATE_IDLE = 0x1
+MOVE_STATE_STEPPING = 0x2
+
+# Most direction presses to remember while a step is in progress.
+INPUT_QUEUE_SIZE = 2
+
+class MovementController(object):
+    """State machine for the protagonist's tile steps.
+
+    The main loop reports direction key presses and releases, and calls
+    update once per frame. Presses made during a step are queued, so that
+    quick taps are not lost, and the next step starts in the same frame
+    that the previous one finishes, so holding a direction walks
+    continuously.
+
+    The stepper passed in does the actual moving, and must have the
+    following methods:
+        start_protagonist_step(direction): turns the protagonist and starts
+            a step in the direction. Returns True if a step started, False
+            if the protagonist could not move.
+        advance_protagonist_step(curr_time_ms): draws the step in progress
+            as of the given time, or finishes it at once if curr_time_ms
+            is None. Returns True once the step is finished.
+        end_protagonist_step(): called after each finished step.
+
+    Attributes:
+        state: one of the MOVE_STATE constants.
+    """
+
+    def __init__(self, stepper, queue_size=INPUT_QUEUE_SIZE):
+        """Creates an idle MovementController.
+
+        Args:
+            stepper: object that moves the protagonist, as described in
+                the class docstring.
+            queue_size: most direction presses to queue.
+        """
+
+        self.state = MOVE_STATE_IDLE
+        self._stepper = stepper
+
+        # Direction presses not yet acted on, oldest first.
+        self._input_queue = collections.deque(maxlen=queue_size)
+
+        # Directions whose keys are held down, most recently pressed last.
+        self._held_directions = []
+
+    def press_direction(self, direction):
+        """Records a direction key press."""
+
+        self._input_queue.append(direction)
+
+        if direction in self._held_directions:
+            self._held_directions.remove(direction)
+        self._held_directions.append(direction)
+
+    def release_direction(self, direction):
+        """Records a direction key release."""
+
+        if direction in self._held_directions:
+            self._held_directions.remove(direction)
+
+    def clear_input(self):
+        """Forgets all queued and held directions, such as after a menu
+        has taken over the keyboard."""
+
+        self._input_queue.clear()
+        self._held_directions = []
+
+    def is_idle(self):
+        """Returns True if no step is in progress."""
+
+        return self.state == MOVE_STATE_IDLE
+
+    def has_input(self):
+        """Returns True if a direction is queued or held."""
+
+        return bool(self._input_queue) or bool(self._held_directions)
+
+    def has_queued_input(self):
+        """Returns True if a direction press is queued, not counting
+        directions that are only held."""
+
+        return bool(self._input_queue)
+
+    def get_next_direction(self, include_held=True):
+        """Returns the direction for the next step, or None if no
+        direction is queued or held.
+
+        Args:
+            include_held: if False, only queued presses are used.
+        """
+
+        if self._input_queue:
+            return self._input_queue.popleft()
+
+        if include_held and self._held_directions:
+            return self._held_directions[-1]
+
+        return None
+
+    def update(self, curr_time_ms, repeat_held=True):
+        """Advances the step in progress, and starts the next step if
+        there is one to take.
+
+        Args:
+            curr_time_ms: current time in milliseconds, as given by
+                timekeeper.Timekeeper.get_time_ms.
+            repeat_held: if False, only queued presses start a step, so
+                that walking stops once the step in progress ends even if a
+                direction is held. Used to let an interaction run between
+                steps.
+        """
+
+        if self.state == MOVE_STATE_STEPPING:
+            if not self._stepper.advance_protagonist_step(curr_time_ms):
+                return
+
+            self.state = MOVE_STATE_IDLE
+            self._stepper.end_protagonist_step()
+
+        direction = self.get_next_direction(include_held=repeat_held)
+
+        if direction is not None:
+            if self._stepper.start_protagonist_step(direction):
+                self.state = MOVE_STATE_STEPPING
+                LOGGER.debug("Started step in direction %s", direction)
+
+    def complete_step(self):
+        """Finishes the step in progress at once, if there is one."""
+
+        if self.state == MOVE_STATE_STEPPING:
+            self._stepper.advance_protagonist_step(None)
+            self.state = MOVE_STATE_IDLE
+            self._stepper.end_protagonist_step()
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
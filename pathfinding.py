@@ -0,0 +1,557 @@
+# -*- coding: utf-8 -*-
+"""This module contains classes for planning paths on Maps.
+
+Paths are planned over a Map's passability plane for a transportation
+type (see gamemap.Map.get_passability_plane), with the same 4-directional
+steps that the protagonist takes in the overworld. The Pathfinder offers
+plain A* search and jump point search, which finds paths of the same length
+while expanding far fewer nodes across open ground.
+"""
+
+import collections
+import heapq
+import logging
+import directions
+
+# Maximum number of search results to keep in the path cache.
+PATH_CACHE_SIZE = 256
+
+# Number of node expansions between checks for cancellation.
+CANCEL_CHECK_INTERVAL = 128
+
+# Maps (x step, y step) tuples to the direction of the step.
+STEP_DIRECTIONS = {
+    (0, -1): directions.DIR_NORTH,
+    (1, 0): directions.DIR_EAST,
+    (0, 1): directions.DIR_SOUTH,
+    (-1, 0): directions.DIR_WEST,
+}
+
+class CancelToken(object):
+    """Used to cancel a path search that is in progress.
+
+    Searches check the token every CANCEL_CHECK_INTERVAL node expansions,
+    and give up once it has been cancelled.
+
+    Attributes:
+        cancelled: True once cancel has been called.
+    """
+
+    def __init__(self):
+        """Creates a CancelToken that has not been cancelled."""
+
+        self.cancelled = False
+
+    def cancel(self):
+        """Cancels any search using this token."""
+
+        self.cancelled = True
+
+class Pathfinder(object):
+    """Plans paths between tile locations on a single Map.
+
+    The user should not generate Pathfinder objects, as the class
+    is primarily for class methods related to path searches.
+
+    Search results are cached by Map ID and Map version, so a repeated
+    query against an unchanged Map costs a dict lookup. Any change to the
+    Map's Tiles or interactive objects bumps its version, which leaves
+    older results to age out of the cache.
+    """
+
+    # Maps (map ID, map version, start location, frozenset of
+    # destination locations, transportation flag, use_jps) tuples to
+    # the tuple of path tile locations, or None if there is no path.
+    _path_cache = collections.OrderedDict()
+
+    # Number of nodes expanded by the last search that was not served
+    # from the cache.
+    _last_expansion_count = 0
+
+    @classmethod
+    def find_path(
+            cls,
+            map_obj,
+            start_loc,
+            dest_loc,
+            transport_flag,
+            use_jps=False,
+            cancel_token=None,
+            use_cache=True,
+        ):
+        """Returns a shortest path between two tile locations on a Map.
+
+        The start location does not need to be passable, since it is
+        usually occupied by whatever is about to move.
+
+        Args:
+            map_obj: Map to plan the path on.
+            start_loc: (x, y) tile location to start from.
+            dest_loc: (x, y) tile location to reach.
+            transport_flag: transportation flag (as defined in tiledata)
+                that every tile on the path must allow.
+            use_jps: if True, use jump point search instead of
+                plain A* search.
+            cancel_token: optional CancelToken for cancelling the search.
+            use_cache: if False, skip the path cache for this search.
+
+        Returns:
+            List of (x, y) tile locations for each step of the path,
+            ending with dest_loc and not including start_loc. Returns an
+            empty list if start_loc is dest_loc, and None if there is no
+            path or if the search was cancelled.
+        """
+
+        return cls.find_path_to_nearest(
+            map_obj,
+            start_loc,
+            [dest_loc],
+            transport_flag,
+            use_jps=use_jps,
+            cancel_token=cancel_token,
+            use_cache=use_cache,
+        )
+
+    @classmethod
+    def find_path_to_nearest(
+            cls,
+            map_obj,
+            start_loc,
+            dest_locs,
+            transport_flag,
+            use_jps=False,
+            cancel_token=None,
+            use_cache=True,
+        ):
+        """Returns a shortest path to whichever destination is closest.
+
+        Useful for reaching any of several tiles, such as the free tiles
+        next to the nearest tree. Destinations that are out of bounds or
+        not passable are ignored.
+
+        Args:
+            map_obj: Map to plan the path on.
+            start_loc: (x, y) tile location to start from.
+            dest_locs: iterable of (x, y) tile locations that would each
+                end the path.
+            transport_flag: transportation flag (as defined in tiledata)
+                that every tile on the path must allow.
+            use_jps: if True, use jump point search instead of
+                plain A* search.
+            cancel_token: optional CancelToken for cancelling the search.
+            use_cache: if False, skip the path cache for this search.
+
+        Returns:
+            List of (x, y) tile locations for each step of the path,
+            not including start_loc. Returns an empty list if start_loc
+            is one of the destinations, and None if there is no path or
+            if the search was cancelled.
+        """
+
+        start_loc = tuple(start_loc)
+        dest_locs = frozenset(tuple(dest_loc) for dest_loc in dest_locs)
+
+        if not map_obj.location_within_bounds(start_loc):
+            LOGGER.warn("Path start %s is out of bounds", start_loc)
+            return None
+
+        cache_key = (
+            map_obj.map_id,
+            map_obj.version,
+            start_loc,
+            dest_locs,
+            transport_flag,
+            bool(use_jps),
+        )
+
+        if use_cache and (cache_key in cls._path_cache):
+            cls._path_cache.move_to_end(cache_key)
+            cached_path = cls._path_cache[cache_key]
+
+            if cached_path is None:
+                return None
+
+            return list(cached_path)
+
+        # Region labels tell which destinations cannot be reached at all,
+        # which would otherwise only show after searching everywhere
+        # reachable.
+        reachable_dest_locs = dest_locs
+        if transport_flag in map_obj.region_labels:
+            start_labels = map_obj.get_region_labels_from(
+                start_loc,
+                transport_flag
+            )
+            reachable_dest_locs = [
+                dest_loc for dest_loc in dest_locs
+                if map_obj.get_region_label(dest_loc, transport_flag)
+                in start_labels
+            ]
+
+        if start_loc in dest_locs:
+            path = []
+        elif not reachable_dest_locs:
+            path = None
+            cls._last_expansion_count = 0
+        else:
+            plane = map_obj.get_passability_plane(transport_flag)
+            if plane is None:
+                # Combined transportation flags have no plane of their
+                # own, so build one for this search.
+                plane = bytearray(
+                    [
+                        1 if map_obj.can_occupy((x, y), transport_flag) else 0
+                        for y in range(map_obj.height)
+                        for x in range(map_obj.width)
+                    ]
+                )
+
+            if use_jps:
+                path = cls._search_jps(
+                    plane,
+                    map_obj.width,
+                    map_obj.height,
+                    start_loc,
+                    reachable_dest_locs,
+                    cancel_token,
+                )
+            else:
+                path = cls._search_astar(
+                    plane,
+                    map_obj.width,
+                    map_obj.height,
+                    start_loc,
+                    reachable_dest_locs,
+                    cancel_token,
+                )
+
+        if cancel_token and cancel_token.cancelled:
+            LOGGER.debug("Path search from %s cancelled", start_loc)
+            return None
+
+        if use_cache:
+            cls._path_cache[cache_key] = None if path is None else tuple(path)
+            while len(cls._path_cache) > PATH_CACHE_SIZE:
+                cls._path_cache.popitem(last=False)
+
+        return path
+
+    @classmethod
+    def get_path_directions(cls, start_loc, path):
+        """Returns the direction of each step of a path.
+
+        Args:
+            start_loc: (x, y) tile location that the path starts from.
+            path: list of (x, y) tile locations as returned by find_path.
+
+        Returns:
+            List of direction IDs (as defined in directions), one for
+            each step of the path.
+        """
+
+        path_directions = []
+        prev_loc = start_loc
+
+        for tile_loc in path:
+            path_directions.append(
+                STEP_DIRECTIONS[
+                    (tile_loc[0] - prev_loc[0], tile_loc[1] - prev_loc[1])
+                ]
+            )
+            prev_loc = tile_loc
+
+        return path_directions
+
+    @classmethod
+    def get_last_expansion_count(cls):
+        """Returns the number of nodes expanded by the last search."""
+
+        return cls._last_expansion_count
+
+    @classmethod
+    def clear_cache(cls):
+        """Removes every search result from the path cache."""
+
+        cls._path_cache.clear()
+
+    @classmethod
+    def _get_dest_indices(cls, plane, width, height, dest_locs):
+        """Returns a dict mapping passable destination tile indices to
+        their (x, y) tile locations."""
+
+        dest_indices = {}
+
+        for dest_loc in dest_locs:
+            if (0 <= dest_loc[0] < width) and (0 <= dest_loc[1] < height):
+                dest_index = (dest_loc[1] * width) + dest_loc[0]
+                if plane[dest_index]:
+                    dest_indices[dest_index] = dest_loc
+
+        return dest_indices
+
+    @classmethod
+    def _search_astar(
+            cls,
+            plane,
+            width,
+            height,
+            start_loc,
+            dest_locs,
+            cancel_token,
+        ):
+        """Runs A* search over the passability plane.
+
+        Returns the list of path tile locations, or None if there is no
+        path or if the search was cancelled.
+        """
+
+        dest_indices = cls._get_dest_indices(plane, width, height, dest_locs)
+        cls._last_expansion_count = 0
+
+        if not dest_indices:
+            return None
+
+        dest_points = list(dest_indices.values())
+
+        def heuristic(x, y):
+            return min(
+                abs(x - dest_x) + abs(y - dest_y)
+                for dest_x, dest_y in dest_points
+            )
+
+        start_index = (start_loc[1] * width) + start_loc[0]
+        start_h = heuristic(start_loc[0], start_loc[1])
+
+        g_costs = {start_index: 0}
+        came_from = {start_index: None}
+
+        # Entries are (f cost, h cost, g cost, tile index). Ties on f go to
+        # the entry closer to a destination.
+        open_heap = [(start_h, start_h, 0, start_index)]
+        expansions = 0
+
+        while open_heap:
+            f_cost, h_cost, g_cost, curr_index = heapq.heappop(open_heap)
+
+            if g_cost != g_costs[curr_index]:
+                # A shorter way to this tile was found after this entry
+                # was pushed.
+                continue
+
+            if curr_index in dest_indices:
+                cls._last_expansion_count = expansions
+                return cls._build_path(came_from, curr_index, width)
+
+            expansions = expansions + 1
+            if cancel_token and (expansions % CANCEL_CHECK_INTERVAL == 0) \
+                    and cancel_token.cancelled:
+                cls._last_expansion_count = expansions
+                return None
+
+            curr_x = curr_index % width
+            curr_y = curr_index // width
+            next_g = g_cost + 1
+
+            for next_index, next_x, next_y in (
+                    (curr_index - width, curr_x, curr_y - 1),
+                    (curr_index + 1, curr_x + 1, curr_y),
+                    (curr_index + width, curr_x, curr_y + 1),
+                    (curr_index - 1, curr_x - 1, curr_y),
+                ):
+                if (0 <= next_x < width) and (0 <= next_y < height) \
+                        and plane[next_index] \
+                        and (next_g < g_costs.get(next_index, next_g + 1)):
+                    g_costs[next_index] = next_g
+                    came_from[next_index] = curr_index
+                    next_h = heuristic(next_x, next_y)
+                    heapq.heappush(
+                        open_heap,
+                        (next_g + next_h, next_h, next_g, next_index)
+                    )
+
+        cls._last_expansion_count = expansions
+        return None
+
+    @classmethod
+    def _search_jps(
+            cls,
+            plane,
+            width,
+            height,
+            start_loc,
+            dest_locs,
+            cancel_token,
+        ):
+        """Runs jump point search over the passability plane.
+
+        This is the 4-connected variant of jump point search. Paths are
+        kept in a canonical form where vertical runs may turn horizontal
+        at any tile, but horizontal runs only turn vertical at tiles with
+        a forced neighbor, meaning a tile to the side that could not have
+        been reached by turning one tile earlier. Vertical jumps stop
+        wherever a horizontal jump would find something, so the search
+        only ever expands these turning points.
+
+        Returns the list of path tile locations, or None if there is no
+        path or if the search was cancelled.
+        """
+
+        dest_indices = cls._get_dest_indices(plane, width, height, dest_locs)
+        cls._last_expansion_count = 0
+
+        if not dest_indices:
+            return None
+
+        dest_points = list(dest_indices.values())
+
+        def heuristic(x, y):
+            return min(
+                abs(x - dest_x) + abs(y - dest_y)
+                for dest_x, dest_y in dest_points
+            )
+
+        def jump_horizontal(x, y, step_x):
+            # Returns the index of the next jump point, or None.
+            index = (y * width) + x
+            while True:
+                x = x + step_x
+                index = index + step_x
+
+                if (x < 0) or (x >= width) or not plane[index]:
+                    return None
+
+                if index in dest_indices:
+                    return index
+
+                # Check for forced neighbors above and below.
+                if (y > 0) and plane[index - width] \
+                        and not plane[index - width - step_x]:
+                    return index
+
+                if (y < height - 1) and plane[index + width] \
+                        and not plane[index + width - step_x]:
+                    return index
+
+        def jump_vertical(x, y, step_y):
+            # Returns the index of the next jump point, or None.
+            step_index = step_y * width
+            index = (y * width) + x
+            while True:
+                y = y + step_y
+                index = index + step_index
+
+                if (y < 0) or (y >= height) or not plane[index]:
+                    return None
+
+                if index in dest_indices:
+                    return index
+
+                if (jump_horizontal(x, y, 1) is not None) \
+                        or (jump_horizontal(x, y, -1) is not None):
+                    return index
+
+        start_index = (start_loc[1] * width) + start_loc[0]
+        start_h = heuristic(start_loc[0], start_loc[1])
+
+        g_costs = {start_index: 0}
+        came_from = {start_index: None}
+        open_heap = [(start_h, start_h, 0, start_index)]
+        expansions = 0
+
+        while open_heap:
+            f_cost, h_cost, g_cost, curr_index = heapq.heappop(open_heap)
+
+            if g_cost != g_costs[curr_index]:
+                continue
+
+            if curr_index in dest_indices:
+                cls._last_expansion_count = expansions
+                return cls._build_path(came_from, curr_index, width)
+
+            expansions = expansions + 1
+            if cancel_token and (expansions % CANCEL_CHECK_INTERVAL == 0) \
+                    and cancel_token.cancelled:
+                cls._last_expansion_count = expansions
+                return None
+
+            curr_x = curr_index % width
+            curr_y = curr_index // width
+            parent_index = came_from[curr_index]
+
+            # Find jump points in the directions worth following.
+            jump_points = []
+            if parent_index is None:
+                jump_points.append(jump_horizontal(curr_x, curr_y, 1))
+                jump_points.append(jump_horizontal(curr_x, curr_y, -1))
+                jump_points.append(jump_vertical(curr_x, curr_y, 1))
+                jump_points.append(jump_vertical(curr_x, curr_y, -1))
+            elif (parent_index // width) == curr_y:
+                # Arrived horizontally. Keep going, and turn only
+                # towards forced neighbors.
+                step_x = 1 if (curr_x > parent_index % width) else -1
+                jump_points.append(jump_horizontal(curr_x, curr_y, step_x))
+
+                if (curr_y > 0) and plane[curr_index - width] \
+                        and not plane[curr_index - width - step_x]:
+                    jump_points.append(jump_vertical(curr_x, curr_y, -1))
+
+                if (curr_y < height - 1) and plane[curr_index + width] \
+                        and not plane[curr_index + width - step_x]:
+                    jump_points.append(jump_vertical(curr_x, curr_y, 1))
+            else:
+                # Arrived vertically. Keep going, or turn either way.
+                step_y = 1 if (curr_y > parent_index // width) else -1
+                jump_points.append(jump_vertical(curr_x, curr_y, step_y))
+                jump_points.append(jump_horizontal(curr_x, curr_y, 1))
+                jump_points.append(jump_horizontal(curr_x, curr_y, -1))
+
+            for next_index in jump_points:
+                if next_index is None:
+                    continue
+
+                next_x = next_index % width
+                next_y = next_index // width
+                next_g = g_cost + abs(next_x - curr_x) + abs(next_y - curr_y)
+
+                if next_g < g_costs.get(next_index, next_g + 1):
+                    g_costs[next_index] = next_g
+                    came_from[next_index] = curr_index
+                    next_h = heuristic(next_x, next_y)
+                    heapq.heappush(
+                        open_heap,
+                        (next_g + next_h, next_h, next_g, next_index)
+                    )
+
+        cls._last_expansion_count = expansions
+        return None
+
+    @classmethod
+    def _build_path(cls, came_from, end_index, width):
+        """Returns the list of tile locations for each step leading to
+        end_index, filling in the straight runs between jump points."""
+
+        node_indices = []
+        curr_index = end_index
+        while curr_index is not None:
+            node_indices.append(curr_index)
+            curr_index = came_from[curr_index]
+        node_indices.reverse()
+
+        path = []
+        for prev_index, next_index in zip(node_indices, node_indices[1:]):
+            prev_x = prev_index % width
+            prev_y = prev_index // width
+            next_x = next_index % width
+            next_y = next_index // width
+
+            step_x = (next_x > prev_x) - (next_x < prev_x)
+            step_y = (next_y > prev_y) - (next_y < prev_y)
+
+            for step in range(1, abs(next_x - prev_x) + abs(next_y - prev_y) + 1):
+                path.append((prev_x + (step * step_x), prev_y + (step * step_y)))
+
+        return path
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""This module contains the PerfHud class for the in-game performance
+overlay.
+
+Drawing and refresh code wraps its work in start_timer and stop_timer calls,
+which do nothing but check a flag while the overlay is off. While it is on,
+the time spent in each section is added up for every frame (from one clock
+tick to the next), and the overworld draws frame times, their percentiles
+over recent frames, and a stacked breakdown of the sections on top of the
+map. Toggle the overlay with F3 in the overworld.
+"""
+
+import collections
+import logging
+import time
+import pygame
+import timekeeper
+import viewingdata
+
+### SECTION ID NUMBERS ###
+SECTION_REFRESH_PROTAGONIST = 0x1
+SECTION_REFRESH_MAP = 0x2
+SECTION_REFRESH_TOP_DISPLAY = 0x3
+SECTION_BLIT_TILES = 0x4
+SECTION_BLIT_OBJECTS = 0x5
+SECTION_BLIT_HEALTH_DISPLAY = 0x6
+SECTION_BLIT_TEXT = 0x7
+SECTION_PRESENT = 0x8
+
+# Sections in the order they are drawn in the breakdown.
+SECTION_IDS = [
+    SECTION_REFRESH_PROTAGONIST,
+    SECTION_REFRESH_MAP,
+    SECTION_REFRESH_TOP_DISPLAY,
+    SECTION_BLIT_TILES,
+    SECTION_BLIT_OBJECTS,
+    SECTION_BLIT_HEALTH_DISPLAY,
+    SECTION_BLIT_TEXT,
+    SECTION_PRESENT,
+]
+
+SECTION_NAMES = {
+    SECTION_REFRESH_PROTAGONIST: "refresh protag",
+    SECTION_REFRESH_MAP: "refresh map",
+    SECTION_REFRESH_TOP_DISPLAY: "refresh top",
+    SECTION_BLIT_TILES: "blit tiles",
+    SECTION_BLIT_OBJECTS: "blit objects",
+    SECTION_BLIT_HEALTH_DISPLAY: "blit health",
+    SECTION_BLIT_TEXT: "blit text",
+    SECTION_PRESENT: "present",
+}
+
+SECTION_COLORS = {
+    SECTION_REFRESH_PROTAGONIST: (230, 159, 0),
+    SECTION_REFRESH_MAP: (240, 228, 66),
+    SECTION_REFRESH_TOP_DISPLAY: (255, 200, 150),
+    SECTION_BLIT_TILES: (0, 114, 178),
+    SECTION_BLIT_OBJECTS: (86, 180, 233),
+    SECTION_BLIT_HEALTH_DISPLAY: (0, 158, 115),
+    SECTION_BLIT_TEXT: (204, 121, 167),
+    SECTION_PRESENT: (213, 94, 0),
+}
+
+# Number of recent frames to keep timings for.
+FRAME_HISTORY_SIZE = 120
+
+# Percentiles of frame time to show.
+FRAME_TIME_PERCENTILES = (50, 95, 99)
+
+# Milliseconds between overlay updates while the overworld is otherwise idle.
+HUD_REFRESH_INTERVAL_MS = 250
+
+# Overlay layout. The overlay sits in the top right corner, clear of the
+# top health display.
+HUD_WIDTH = 260
+HUD_TOP_LEFT = (viewingdata.MAIN_DISPLAY_WIDTH - HUD_WIDTH - 8, 8)
+HUD_PADDING = 6
+HUD_BAR_HEIGHT = 10
+HUD_SWATCH_SIZE = 8
+HUD_BACKGROUND_COLOR = (0, 0, 0, 180)
+
+class PerfHud(object):
+    """Times sections of each frame and draws the performance overlay.
+
+    The user should not generate PerfHud objects, as the class
+    is primarily for class methods related to frame timing.
+
+    Sections may be nested, in which case the inner section's time is left
+    out of the outer section's time, so the breakdown adds up.
+    """
+
+    # Whether timing is on and the overlay is drawn.
+    enabled = False
+
+    # Per-section times in milliseconds for the frame in progress.
+    _frame_section_ms = {}
+
+    # Time in milliseconds spent in nested sections, for each open section.
+    _open_child_ms = []
+
+    # perf_counter time at the end of the previous frame.
+    _last_frame_end = None
+
+    # Frame times in milliseconds, and per-section time dicts, for recent
+    # frames.
+    _frame_times = collections.deque(maxlen=FRAME_HISTORY_SIZE)
+    _section_history = collections.deque(maxlen=FRAME_HISTORY_SIZE)
+
+    # pygame Rect of the overlay as last drawn.
+    _overlay_rect = None
+
+    @classmethod
+    def set_enabled(cls, enabled):
+        """Turns timing and the overlay on or off.
+
+        Recorded frames are dropped either way.
+        """
+
+        cls.enabled = enabled
+        cls._frame_section_ms = {}
+        cls._open_child_ms = []
+        cls._last_frame_end = None
+        cls._frame_times.clear()
+        cls._section_history.clear()
+
+        if enabled:
+            # Frames end after each tick's present.
+            timekeeper.Timekeeper.add_post_tick_callback(cls.end_frame)
+
+        LOGGER.info("Performance HUD %s", "on" if enabled else "off")
+
+    @classmethod
+    def toggle(cls):
+        """Turns timing and the overlay on if off, and off if on."""
+
+        cls.set_enabled(not cls.enabled)
+
+    @classmethod
+    def start_timer(cls):
+        """Starts timing a section.
+
+        Returns:
+            Start time to pass to stop_timer, or None if timing is off.
+        """
+
+        if not cls.enabled:
+            return None
+
+        cls._open_child_ms.append(0.0)
+
+        return time.perf_counter()
+
+    @classmethod
+    def stop_timer(cls, section_id, start_time):
+        """Adds the time since start_time to the section for this frame.
+
+        Args:
+            cls: class object.
+            section_id: SECTION ID number to add the time to.
+            start_time: value returned by the matching start_timer call.
+                If None, does nothing.
+        """
+
+        if (start_time is None) or (not cls._open_child_ms):
+            return
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        child_ms = cls._open_child_ms.pop()
+
+        cls._frame_section_ms[section_id] = \
+            cls._frame_section_ms.get(section_id, 0.0) + (elapsed_ms - child_ms)
+
+        if cls._open_child_ms:
+            cls._open_child_ms[-1] = cls._open_child_ms[-1] + elapsed_ms
+
+    @classmethod
+    def end_frame(cls):
+        """Records the frame that just ended."""
+
+        if not cls.enabled:
+            return
+
+        frame_end = time.perf_counter()
+
+        if cls._last_frame_end is not None:
+            cls._frame_times.append((frame_end - cls._last_frame_end) * 1000)
+            cls._section_history.append(cls._frame_section_ms)
+
+        cls._last_frame_end = frame_end
+        cls._frame_section_ms = {}
+
+    @classmethod
+    def get_frame_time_percentiles(cls):
+        """Returns a dict mapping each of FRAME_TIME_PERCENTILES to the
+        frame time in milliseconds at that percentile over recent frames,
+        or an empty dict if no frames were recorded."""
+
+        ret_dict = {}
+
+        if cls._frame_times:
+            sorted_times = sorted(cls._frame_times)
+            num_times = len(sorted_times)
+
+            for percentile in FRAME_TIME_PERCENTILES:
+                # Nearest-rank percentile.
+                rank = max(1, -((-percentile * num_times) // 100))
+                ret_dict[percentile] = sorted_times[rank - 1]
+
+        return ret_dict
+
+    @classmethod
+    def get_mean_section_times(cls):
+        """Returns a dict mapping section IDs to their mean time in
+        milliseconds per frame over recent frames."""
+
+        ret_dict = {}
+        num_frames = len(cls._section_history)
+
+        if num_frames:
+            for section_id in SECTION_IDS:
+                ret_dict[section_id] = sum(
+                    section_ms.get(section_id, 0.0)
+                    for section_ms in cls._section_history
+                ) / num_frames
+
+        return ret_dict
+
+    @classmethod
+    def get_overlay_rect(cls):
+        """Returns the pygame Rect of the overlay as last drawn, or None."""
+
+        return cls._overlay_rect
+
+    @classmethod
+    def blit_overlay(cls, surface, font, top_left=HUD_TOP_LEFT):
+        """Draws the overlay onto the surface.
+
+        Does not update the pygame display.
+
+        Args:
+            cls: class object.
+            surface: pygame Surface to draw on.
+            font: pygame Font for the overlay text.
+            top_left: pixel coordinates for the overlay's top left corner.
+
+        Returns:
+            pygame Rect of the area drawn over.
+        """
+
+        if not (surface and font):
+            return None
+
+        mean_frame_ms = 0.0
+        if cls._frame_times:
+            mean_frame_ms = sum(cls._frame_times) / len(cls._frame_times)
+
+        frames_per_second = 0.0
+        if mean_frame_ms:
+            frames_per_second = timekeeper.NUM_MS_SECOND / mean_frame_ms
+
+        percentiles = cls.get_frame_time_percentiles()
+        section_times = cls.get_mean_section_times()
+
+        text_lines = [
+            "frame {0:6.2f} ms {1:5.1f} fps".format(
+                mean_frame_ms,
+                frames_per_second,
+            ),
+            "  ".join(
+                "p{0} {1:.1f}".format(percentile, percentiles[percentile])
+                for percentile in FRAME_TIME_PERCENTILES
+                if percentile in percentiles
+            ),
+        ]
+        section_lines = [
+            "{0:<14} {1:6.2f} ms".format(
+                SECTION_NAMES[section_id],
+                section_times.get(section_id, 0.0),
+            )
+            for section_id in SECTION_IDS
+        ]
+
+        line_height = font.get_linesize()
+        overlay_height = (2 * HUD_PADDING) \
+            + (line_height * (len(text_lines) + len(section_lines))) \
+            + HUD_PADDING + HUD_BAR_HEIGHT
+        overlay_rect = pygame.Rect(top_left, (HUD_WIDTH, overlay_height))
+
+        background = pygame.Surface(overlay_rect.size, pygame.SRCALPHA)
+        background.fill(HUD_BACKGROUND_COLOR)
+        surface.blit(background, overlay_rect.topleft)
+
+        text_left = overlay_rect.left + HUD_PADDING
+        text_top = overlay_rect.top + HUD_PADDING
+
+        for text_line in text_lines:
+            surface.blit(
+                font.render(text_line, True, viewingdata.COLOR_WHITE),
+                (text_left, text_top),
+            )
+            text_top = text_top + line_height
+
+        for section_id, text_line in zip(SECTION_IDS, section_lines):
+            surface.fill(
+                SECTION_COLORS[section_id],
+                pygame.Rect(
+                    text_left,
+                    text_top + ((line_height - HUD_SWATCH_SIZE) // 2),
+                    HUD_SWATCH_SIZE,
+                    HUD_SWATCH_SIZE,
+                ),
+            )
+            surface.blit(
+                font.render(text_line, True, viewingdata.COLOR_WHITE),
+                (text_left + HUD_SWATCH_SIZE + HUD_PADDING, text_top),
+            )
+            text_top = text_top + line_height
+
+        # Stacked bar of the section times, where the full width is the
+        # time budget for a frame at the normal tick rate.
+        bar_width = HUD_WIDTH - (2 * HUD_PADDING)
+        bar_top = text_top + HUD_PADDING
+        bar_left = text_left
+
+        surface.fill(
+            viewingdata.COLOR_BLACK,
+            pygame.Rect(bar_left, bar_top, bar_width, HUD_BAR_HEIGHT),
+        )
+
+        for section_id in SECTION_IDS:
+            section_width = int(
+                bar_width * section_times.get(section_id, 0.0) \
+                / timekeeper.MS_PER_TICK
+            )
+            section_width = min(section_width, text_left + bar_width - bar_left)
+
+            if section_width > 0:
+                surface.fill(
+                    SECTION_COLORS[section_id],
+                    pygame.Rect(bar_left, bar_top, section_width, HUD_BAR_HEIGHT),
+                )
+                bar_left = bar_left + section_width
+
+        cls._overlay_rect = overlay_rect
+
+        return overlay_rect
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
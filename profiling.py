@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""This module contains the Profiler class for recording profiling captures.
+
+Code is instrumented with scoped timers, either by decorating a function
+with profile_scope or by wrapping a block in start_scope and end_scope
+calls, and with counters through count. Outside of a capture these only
+check a flag. During a capture, every scope and counter is recorded along
+with a cProfile session, and when the capture stops two files are written:
+
+    <prefix>.pstats      cProfile statistics, for pstats or snakeviz.
+    <prefix>.trace.json  Chrome trace of the scopes, frames and counters,
+                         for chrome://tracing or Perfetto.
+
+Start a capture with F4 in the overworld (press again to stop) or with
+the --profile command line flag of adventure.py.
+"""
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import time
+import timekeeper
+
+# Directory that captures are written to.
+PROFILE_OUTPUT_DIR = 'profiles'
+
+# Chrome trace thread IDs for scopes and for frames.
+TRACE_SCOPE_TID = 0
+TRACE_FRAME_TID = 1
+
+class Profiler(object):
+    """Records profiling captures.
+
+    The user should not generate Profiler objects, as the class
+    is primarily for class methods related to profiling.
+    """
+
+    # Whether a capture is being recorded.
+    recording = False
+
+    # cProfile Profile for the capture in progress.
+    _profile = None
+
+    # perf_counter time that the capture started at.
+    _capture_start = None
+
+    # Number of seconds to record for before stopping, or None to record
+    # until stop_capture is called.
+    _capture_duration_s = None
+
+    # File path prefix to write the capture to.
+    _output_prefix = None
+
+    # Chrome trace events recorded so far.
+    _trace_events = []
+
+    # Counter totals for the capture, and for the frame in progress.
+    _counter_totals = {}
+    _frame_counters = {}
+
+    # perf_counter time at the end of the previous frame.
+    _last_frame_end = None
+
+    @classmethod
+    def start_capture(cls, duration_s=None, output_prefix=None):
+        """Starts recording a capture.
+
+        Args:
+            cls: class object.
+            duration_s: number of seconds to record for. If None, records
+                until stop_capture is called.
+            output_prefix: file path prefix to write the capture to.
+                Defaults to a time-stamped name in PROFILE_OUTPUT_DIR.
+        """
+
+        if cls.recording:
+            LOGGER.warning("Profiling capture already in progress.")
+            return
+
+        if output_prefix is None:
+            output_prefix = os.path.join(
+                PROFILE_OUTPUT_DIR,
+                time.strftime('capture_%Y%m%d_%H%M%S'),
+            )
+
+        cls._output_prefix = output_prefix
+        cls._capture_duration_s = duration_s
+        cls._trace_events = []
+        cls._counter_totals = {}
+        cls._frame_counters = {}
+
+        # Frames end after each tick.
+        timekeeper.Timekeeper.add_post_tick_callback(cls._end_frame)
+
+        cls._capture_start = time.perf_counter()
+        cls._last_frame_end = cls._capture_start
+        cls.recording = True
+
+        cls._profile = cProfile.Profile()
+        cls._profile.enable()
+
+        LOGGER.info(
+            "Started profiling capture to %s for %s s",
+            output_prefix,
+            duration_s,
+        )
+
+    @classmethod
+    def stop_capture(cls):
+        """Stops the capture in progress and writes its files.
+
+        Returns:
+            tuple of the pstats and Chrome trace file paths, or None if no
+            capture was in progress.
+        """
+
+        if not cls.recording:
+            return None
+
+        cls._profile.disable()
+        cls.recording = False
+
+        output_dir = os.path.dirname(cls._output_prefix)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        pstats_path = cls._output_prefix + '.pstats'
+        trace_path = cls._output_prefix + '.trace.json'
+
+        cls._profile.dump_stats(pstats_path)
+
+        with open(trace_path, 'w') as trace_file:
+            json.dump(
+                {
+                    'traceEvents': cls._trace_events,
+                    'displayTimeUnit': 'ms',
+                    'otherData': {
+                        'counter_totals': cls._counter_totals,
+                        'duration_s': time.perf_counter() - cls._capture_start,
+                    },
+                },
+                trace_file,
+            )
+
+        LOGGER.info(
+            "Wrote profiling capture to %s and %s",
+            pstats_path,
+            trace_path,
+        )
+
+        cls._profile = None
+        cls._trace_events = []
+
+        return (pstats_path, trace_path)
+
+    @classmethod
+    def toggle_capture(cls, duration_s=None):
+        """Stops the capture in progress, or starts one if there is none."""
+
+        if cls.recording:
+            cls.stop_capture()
+        else:
+            cls.start_capture(duration_s=duration_s)
+
+    @classmethod
+    def _get_trace_time_us(cls, perf_time):
+        """Returns the Chrome trace timestamp for a perf_counter time."""
+
+        return (perf_time - cls._capture_start) * 1000000
+
+    @classmethod
+    def start_scope(cls):
+        """Starts timing a scope.
+
+        Returns:
+            Start time to pass to end_scope, or None if not recording.
+        """
+
+        if not cls.recording:
+            return None
+
+        return time.perf_counter()
+
+    @classmethod
+    def end_scope(cls, name, start_time):
+        """Records a scope that started at start_time and ends now.
+
+        Args:
+            cls: class object.
+            name: name of the scope to show in the trace.
+            start_time: value returned by the matching start_scope call.
+                If None, does nothing.
+        """
+
+        if (start_time is None) or (not cls.recording):
+            return
+
+        end_time = time.perf_counter()
+
+        cls._trace_events.append({
+            'name': name,
+            'ph': 'X',
+            'ts': cls._get_trace_time_us(start_time),
+            'dur': (end_time - start_time) * 1000000,
+            'pid': 0,
+            'tid': TRACE_SCOPE_TID,
+        })
+
+    @classmethod
+    def count(cls, name, amount=1):
+        """Adds amount to the named counter, if recording."""
+
+        if cls.recording:
+            cls._frame_counters[name] = cls._frame_counters.get(name, 0) + amount
+            cls._counter_totals[name] = cls._counter_totals.get(name, 0) + amount
+
+    @classmethod
+    def _end_frame(cls):
+        """Records the frame that just ended and its counters, and stops the
+        capture once its duration is up."""
+
+        if not cls.recording:
+            return
+
+        frame_end = time.perf_counter()
+
+        cls._trace_events.append({
+            'name': 'frame',
+            'ph': 'X',
+            'ts': cls._get_trace_time_us(cls._last_frame_end),
+            'dur': (frame_end - cls._last_frame_end) * 1000000,
+            'pid': 0,
+            'tid': TRACE_FRAME_TID,
+        })
+
+        if cls._frame_counters:
+            cls._trace_events.append({
+                'name': 'counters',
+                'ph': 'C',
+                'ts': cls._get_trace_time_us(frame_end),
+                'pid': 0,
+                'args': cls._frame_counters,
+            })
+            cls._frame_counters = {}
+
+        cls._last_frame_end = frame_end
+
+        if (cls._capture_duration_s is not None) \
+                and ((frame_end - cls._capture_start) >= cls._capture_duration_s):
+            cls.stop_capture()
+
+def profile_scope(name):
+    """Returns a decorator that records each call of the decorated function
+    as a scope with the given name during captures."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not Profiler.recording:
+                return func(*args, **kwargs)
+
+            start_time = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                Profiler.end_scope(name, start_time)
+
+        return wrapper
+
+    return decorator
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
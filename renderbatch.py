@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""This module contains the RenderBatch class for batched blitting.
+
+Renderers that draw many images onto the same Surface add each
+(image, destination) pair to a RenderBatch, then submit the whole batch
+with a single Surface.blits call instead of one Surface.blit call
+per image.
+"""
+
+class RenderBatch(object):
+    """A class used to collect blits for a single target Surface.
+
+    Blits are submitted in the order they were added, so later blits are
+    drawn on top of earlier ones.
+
+    Attributes:
+        use_blits: class-wide flag. If True, batches are submitted with
+            a single Surface.blits call. If False, each blit is submitted
+            with its own Surface.blit call, which is useful for comparing
+            the two.
+    """
+
+    use_blits = True
+
+    def __init__(self):
+        """Creates an empty RenderBatch."""
+
+        self._blit_sequence = []
+
+    def __len__(self):
+        """Returns the number of blits in the batch."""
+
+        return len(self._blit_sequence)
+
+    def add(self, source, dest, area=None):
+        """Adds a blit to the batch.
+
+        Args:
+            self: calling object.
+            source: pygame Surface to blit.
+            dest: (x, y) tuple or pygame Rect for the destination position.
+                Rects are copied, so the caller can reuse them.
+            area: optional pygame Rect for the portion of source to blit.
+        """
+
+        if area is None:
+            self._blit_sequence.append((source, tuple(dest[:2])))
+        else:
+            self._blit_sequence.append((source, tuple(dest[:2]), area))
+
+    def submit(self, target):
+        """Blits the whole batch onto the target Surface and empties it.
+
+        Args:
+            self: calling object.
+            target: pygame Surface to blit the batch onto.
+        """
+
+        if self._blit_sequence:
+            if RenderBatch.use_blits:
+                target.blits(self._blit_sequence, doreturn=False)
+            else:
+                for blit_info in self._blit_sequence:
+                    target.blit(*blit_info)
+
+            self._blit_sequence = []
@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""This module contains the Replay class for recording and replaying
+input.
+
+Game loops get their input events through Replay.get_events rather than
+pygame.event.get. While recording, the input events it returns are written
+to a replay file along with the clock time of every tick and the seed for
+the random module (which interaction and resources draw from). Replaying
+that file runs the clock in timekeeper.CLOCK_MODE_MANUAL with the recorded
+tick times and hands back the recorded events in the same places, so the
+session plays out the same way again.
+
+Record with adventure.py --record FILE, and replay with --replay FILE.
+
+Replay file format (integers marked varint are unsigned LEB128):
+
+    header: magic b'AGRP', format version (1 byte), seed (8 bytes,
+        little-endian)
+    records, each starting with a record type byte:
+        RECORD_TICK: milliseconds since the previous tick (varint)
+        RECORD_EVENTS: index of the get_events call within the tick
+            (varint), number of events (varint), then for each event its
+            EVENT code (1 byte), key (varint) and mod (varint)
+
+Events belong to the tick given by the number of tick records before them.
+"""
+
+import atexit
+import logging
+import os
+import random
+import struct
+import sys
+import pygame
+import timekeeper
+
+REPLAY_MAGIC = b'AGRP'
+REPLAY_FORMAT_VERSION = 1
+
+REPLAY_HEADER_FORMAT = '<4sBQ'
+
+### RECORD TYPES ###
+RECORD_TICK = 0x1
+RECORD_EVENTS = 0x2
+
+### EVENT CODES ###
+EVENT_KEYDOWN = 0x1
+EVENT_KEYUP = 0x2
+EVENT_QUIT = 0x3
+
+# Maps recorded pygame event types to event codes, and back.
+EVENT_CODES = {
+    pygame.KEYDOWN: EVENT_KEYDOWN,
+    pygame.KEYUP: EVENT_KEYUP,
+    pygame.QUIT: EVENT_QUIT,
+}
+EVENT_TYPES = dict(
+    (event_code, event_type)
+    for event_type, event_code in EVENT_CODES.items()
+)
+
+def encode_varint(value):
+    """Returns the bytes for an unsigned LEB128 integer."""
+
+    ret_bytes = bytearray()
+
+    while True:
+        byte = value & 0x7F
+        value = value >> 7
+
+        if value:
+            ret_bytes.append(byte | 0x80)
+        else:
+            ret_bytes.append(byte)
+            return bytes(ret_bytes)
+
+def decode_varint(data, offset):
+    """Reads an unsigned LEB128 integer.
+
+    Returns:
+        tuple of the integer and the offset just past it.
+    """
+
+    value = 0
+    shift = 0
+
+    while True:
+        byte = data[offset]
+        offset = offset + 1
+        value = value | ((byte & 0x7F) << shift)
+        shift = shift + 7
+
+        if not (byte & 0x80):
+            return (value, offset)
+
+class Replay(object):
+    """Records input to, and replays input from, replay files.
+
+    The user should not generate Replay objects, as the class
+    is primarily for class methods related to replays.
+    """
+
+    # Open replay file while recording.
+    _record_file = None
+
+    # Clock time in milliseconds of the last recorded tick.
+    _last_tick_time_ms = 0
+
+    # Whether a replay is in progress.
+    _replaying = False
+
+    # Recorded milliseconds between ticks, and the index of the next one.
+    _tick_lengths_ms = []
+    _next_tick_index = 0
+
+    # Maps (tick index, get_events call index) tuples to recorded events.
+    _recorded_events = {}
+
+    # If True, quit the game once the replay runs out of ticks.
+    _exit_at_end = False
+
+    # Tick count at the start of recording or replaying, the tick count
+    # that the get_events call index was last reset for, and the index.
+    _start_tick_count = 0
+    _call_tick_count = None
+    _call_index = 0
+
+    @classmethod
+    def is_recording(cls):
+        """Returns True if input is being recorded."""
+
+        return cls._record_file is not None
+
+    @classmethod
+    def is_replaying(cls):
+        """Returns True if a replay is in progress."""
+
+        return cls._replaying
+
+    @classmethod
+    def _get_call_key(cls):
+        """Returns the (tick index, get_events call index) tuple for the
+        current get_events call."""
+
+        tick_count = timekeeper.Timekeeper.get_tick_count()
+
+        if tick_count != cls._call_tick_count:
+            cls._call_tick_count = tick_count
+            cls._call_index = 0
+        else:
+            cls._call_index = cls._call_index + 1
+
+        return (tick_count - cls._start_tick_count, cls._call_index)
+
+    @classmethod
+    def start_recording(cls, replay_path, seed=None):
+        """Starts recording input to a replay file.
+
+        Call right after setting up the clock, before anything draws from
+        the random module.
+
+        Args:
+            cls: class object.
+            replay_path: path of the replay file to write.
+            seed: seed for the random module. Defaults to a random seed.
+        """
+
+        if seed is None:
+            seed = struct.unpack('<Q', os.urandom(8))[0]
+
+        random.seed(seed)
+
+        cls._record_file = open(replay_path, 'wb')
+        cls._record_file.write(
+            struct.pack(
+                REPLAY_HEADER_FORMAT,
+                REPLAY_MAGIC,
+                REPLAY_FORMAT_VERSION,
+                seed,
+            )
+        )
+
+        cls._start_tick_count = timekeeper.Timekeeper.get_tick_count()
+        cls._call_tick_count = None
+        cls._last_tick_time_ms = timekeeper.Timekeeper.get_last_tick_time_ms()
+
+        # Keep the clock time steady between ticks so that the replay,
+        # which only knows tick times, sees the same times.
+        timekeeper.Timekeeper.set_frame_locked(True)
+        timekeeper.Timekeeper.add_post_tick_callback(cls._record_tick)
+        atexit.register(cls.stop_recording)
+
+        LOGGER.info("Recording replay to %s with seed %d", replay_path, seed)
+
+    @classmethod
+    def stop_recording(cls):
+        """Stops recording and closes the replay file."""
+
+        if cls._record_file:
+            cls._record_file.close()
+            cls._record_file = None
+            timekeeper.Timekeeper.set_frame_locked(False)
+
+            LOGGER.info("Stopped recording replay.")
+
+    @classmethod
+    def _record_tick(cls):
+        """Records the time since the previous tick."""
+
+        if cls._record_file:
+            tick_time_ms = timekeeper.Timekeeper.get_last_tick_time_ms()
+
+            cls._record_file.write(
+                bytes([RECORD_TICK])
+                + encode_varint(tick_time_ms - cls._last_tick_time_ms)
+            )
+            cls._last_tick_time_ms = tick_time_ms
+
+    @classmethod
+    def start_replay(cls, replay_path, exit_at_end=False):
+        """Starts replaying a replay file.
+
+        Call at the same point that recording was started at.
+
+        Args:
+            cls: class object.
+            replay_path: path of the replay file to read.
+            exit_at_end: if True, quit the game once the replay is over.
+                Otherwise, the clock goes back to real time and input
+                comes from pygame again.
+        """
+
+        with open(replay_path, 'rb') as replay_file:
+            data = replay_file.read()
+
+        header_size = struct.calcsize(REPLAY_HEADER_FORMAT)
+        magic, version, seed = struct.unpack_from(REPLAY_HEADER_FORMAT, data)
+
+        if (magic != REPLAY_MAGIC) or (version != REPLAY_FORMAT_VERSION):
+            LOGGER.error("Invalid replay file %s", replay_path)
+            sys.exit(2)
+
+        tick_lengths_ms = []
+        recorded_events = {}
+        offset = header_size
+
+        while offset < len(data):
+            record_type = data[offset]
+            offset = offset + 1
+
+            if record_type == RECORD_TICK:
+                tick_length_ms, offset = decode_varint(data, offset)
+                tick_lengths_ms.append(tick_length_ms)
+            elif record_type == RECORD_EVENTS:
+                call_index, offset = decode_varint(data, offset)
+                num_events, offset = decode_varint(data, offset)
+                events = []
+
+                for i in range(num_events):
+                    event_code = data[offset]
+                    key, offset = decode_varint(data, offset + 1)
+                    mod, offset = decode_varint(data, offset)
+
+                    events.append(
+                        pygame.event.Event(
+                            EVENT_TYPES[event_code],
+                            key=key,
+                            mod=mod,
+                        )
+                    )
+
+                recorded_events[(len(tick_lengths_ms), call_index)] = events
+            else:
+                LOGGER.error(
+                    "Invalid record type %s in replay file %s",
+                    record_type,
+                    replay_path,
+                )
+                sys.exit(2)
+
+        random.seed(seed)
+
+        cls._tick_lengths_ms = tick_lengths_ms
+        cls._next_tick_index = 0
+        cls._recorded_events = recorded_events
+        cls._exit_at_end = exit_at_end
+        cls._start_tick_count = timekeeper.Timekeeper.get_tick_count()
+        cls._call_tick_count = None
+        cls._replaying = True
+
+        timekeeper.Timekeeper.set_clock_mode(timekeeper.CLOCK_MODE_MANUAL)
+        timekeeper.Timekeeper.set_manual_tick_source(cls._get_tick_length)
+
+        LOGGER.info(
+            "Replaying %s: %d ticks, seed %d",
+            replay_path,
+            len(tick_lengths_ms),
+            seed,
+        )
+
+    @classmethod
+    def stop_replay(cls):
+        """Stops replaying, and goes back to real time and pygame input."""
+
+        if cls._replaying:
+            cls._replaying = False
+            cls._recorded_events = {}
+
+            timekeeper.Timekeeper.set_manual_tick_source(None)
+            timekeeper.Timekeeper.set_clock_mode(timekeeper.CLOCK_MODE_REAL)
+
+            LOGGER.info("Replay finished.")
+
+    @classmethod
+    def _get_tick_length(cls, tick_amount):
+        """Returns the recorded length of the next tick."""
+
+        if cls._next_tick_index >= len(cls._tick_lengths_ms):
+            cls.stop_replay()
+
+            if cls._exit_at_end:
+                pygame.quit()
+                sys.exit(0)
+
+            return timekeeper.NUM_MS_SECOND // tick_amount
+
+        tick_length_ms = cls._tick_lengths_ms[cls._next_tick_index]
+        cls._next_tick_index = cls._next_tick_index + 1
+
+        return tick_length_ms
+
+    @classmethod
+    def get_events(cls):
+        """Returns the input events for a game loop to handle, in place of
+        pygame.event.get.
+
+        While replaying, returns the recorded events for this call, along
+        with any pygame.QUIT event so that the window can still be closed.
+        """
+
+        if cls._replaying:
+            call_key = cls._get_call_key()
+
+            events = [
+                event for event in pygame.event.get()
+                if event.type == pygame.QUIT
+            ]
+
+            return cls._recorded_events.get(call_key, []) + events
+
+        events = pygame.event.get()
+
+        if cls._record_file:
+            call_key = cls._get_call_key()
+
+            recorded_events = [
+                event for event in events
+                if event.type in EVENT_CODES
+            ]
+
+            if recorded_events:
+                record_bytes = bytearray([RECORD_EVENTS])
+                record_bytes.extend(encode_varint(call_key[1]))
+                record_bytes.extend(encode_varint(len(recorded_events)))
+
+                for event in recorded_events:
+                    record_bytes.append(EVENT_CODES[event.type])
+                    record_bytes.extend(encode_varint(getattr(event, 'key', 0)))
+                    record_bytes.extend(encode_varint(getattr(event, 'mod', 0)))
+
+                cls._record_file.write(bytes(record_bytes))
+
+        return events
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
@@ -63,7 +63,11 @@ class Resource(interactiveobj.InteractiveObject):
         # Make sure we are dealing with a resource ID
         if interactiveobj.InteractiveObject.is_resource_id(resource_id):
             # Check if we already have the resouce made
-            resource_from_listing = cls.get_resource(resource_id)
+            resource_from_listing = \
+                interactiveobj.InteractiveObject.interactive_obj_listing.get(
+                    resource_id,
+                    None
+                )
 
             if resource_from_listing:
                 # Return the already made resource
@@ -210,7 +214,7 @@ class Resource(interactiveobj.InteractiveObject):
         return ret_item_info
 
 
-    # Does not make new resource.
+    # Makes the resource first if it has not been made yet.
     @classmethod
     def get_resource(cls, resource_id):
         ret_resource = None
@@ -230,7 +234,11 @@ class Resource(interactiveobj.InteractiveObject):
                 LOGGER.error("Could not construct resource with ID {0}".format(resource_id))
                 sys.exit(2)
 
+interactiveobj.InteractiveObject.add_object_factory(
+    objdata.RESOURCE_DATA,
+    Resource.resource_factory,
+)
+
 # set up logger
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
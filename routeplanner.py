@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+"""This module contains the RoutePlanner class for planning routes that
+cross several Maps.
+
+Maps are linked by their adjacent map entries (walking past a map border)
+and by connector tiles. Rather than searching every tile of every Map, the
+RoutePlanner works on an abstract graph in the style of hierarchical
+pathfinding (HPA*):
+
+    * Each place where a route can arrive on a Map (the destination tile of
+      an adjacent map entry or of a connector) is an entrance node.
+    * Each way a route can leave a Map (a map border with an adjacent map,
+      or a connector tile) is an exit node.
+    * Entrances are linked to the exits of their Map by intra-map edges,
+      whose costs are the lengths of the paths between them. These are
+      cached for each Map until the Map's version changes.
+    * Exits are linked to the entrances they lead to on other Maps.
+
+A query searches the abstract graph, then stitches the route together from
+the Pathfinder's (cached) paths for each leg.
+"""
+
+import heapq
+import logging
+import directions
+import gamemap
+import pathfinding
+
+### NODE KIND CONSTANTS ###
+# (ENTRANCE_NODE, map ID, tile location) nodes for tiles where a
+# route arrives on a Map.
+ENTRANCE_NODE = 0x1
+
+# (BORDER_EXIT_NODE, map ID, direction) nodes for leaving a Map by walking
+# past its border in the direction.
+BORDER_EXIT_NODE = 0x2
+
+# (CONNECTOR_EXIT_NODE, map ID, tile location) nodes for leaving a Map by
+# stepping onto a connector tile.
+CONNECTOR_EXIT_NODE = 0x3
+
+# Special nodes for the start and destination of a query.
+START_NODE = (0x4,)
+DEST_NODE = (0x5,)
+
+# Cost of stepping past a map border onto the adjacent Map.
+BORDER_CROSSING_COST = 1
+
+# Cost of being moved by a connector tile.
+CONNECTOR_CROSSING_COST = 0
+
+class RoutePlanner(object):
+    """Plans routes between tile locations on any Maps.
+
+    The user should not generate RoutePlanner objects, as the class
+    is primarily for class methods related to route planning.
+
+    The links between Maps are gathered by build_world_graph the first
+    time a route is planned, which builds every Map that has not been
+    built yet. Call clear_world_graph after adding or
+    removing adjacent maps or connectors so the next query gathers them
+    again.
+
+    A route is a list of legs, one per Map it passes through. Each leg is a
+    tuple of (map ID, start tile location, path, exit), where path is a
+    list of tile locations as returned by Pathfinder.find_path, and exit
+    is the direction to walk past the border at the end of the path, or
+    None if the leg ends on a connector tile or at the destination.
+    """
+
+    # Maps map IDs to lists of (exit node, destination map ID,
+    # destination tile location) tuples for each link leaving the Map.
+    # None if the world graph has not been built.
+    _map_links = None
+
+    # Maps map IDs to sets of entrance tile locations on the Map.
+    _map_entrances = {}
+
+    # Maps (map ID, transportation flag) tuples to (map version, edge dict)
+    # tuples, where the edge dict maps entrance nodes to lists of
+    # (exit node, cost) tuples.
+    _intra_map_edges = {}
+
+    @classmethod
+    def build_world_graph(cls):
+        """Gathers the links between all Maps, building any Maps that have
+        not been built yet."""
+
+        gamemap.Map.build_maps()
+
+        cls._map_links = {}
+        cls._map_entrances = {}
+        cls._intra_map_edges = {}
+
+        for map_id, map_obj in gamemap.Map.map_listing.items():
+            links = []
+
+            for direction, adj_map_info in map_obj.adj_map_dict.items():
+                dest_map_id = adj_map_info[0]
+                dest_loc = tuple(adj_map_info[1])
+
+                if dest_map_id in gamemap.Map.map_listing:
+                    links.append(
+                        ((BORDER_EXIT_NODE, map_id, direction), dest_map_id, dest_loc)
+                    )
+                else:
+                    LOGGER.warn(
+                        "Map %s links to unknown map %s",
+                        map_id,
+                        dest_map_id,
+                    )
+
+            for tile_loc, connector_obj in map_obj.connector_tile_dict.items():
+                # Connectors name their destination Map by its ID
+                # in dest_area.
+                dest_map_id = connector_obj.dest_area
+                dest_loc = (connector_obj.dest_x_coord, connector_obj.dest_y_coord)
+
+                if dest_map_id in gamemap.Map.map_listing:
+                    links.append(
+                        (
+                            (CONNECTOR_EXIT_NODE, map_id, tuple(tile_loc)),
+                            dest_map_id,
+                            dest_loc,
+                        )
+                    )
+                else:
+                    LOGGER.warn(
+                        "Connector at %s on map %s links to unknown map %s",
+                        tile_loc,
+                        map_id,
+                        dest_map_id,
+                    )
+
+            cls._map_links[map_id] = links
+
+        for links in cls._map_links.values():
+            for exit_node, dest_map_id, dest_loc in links:
+                cls._map_entrances.setdefault(dest_map_id, set()).add(dest_loc)
+
+        LOGGER.info(
+            "Built world graph with %d links",
+            sum(len(links) for links in cls._map_links.values()),
+        )
+
+    @classmethod
+    def clear_world_graph(cls):
+        """Drops the gathered links and cached edges between Maps."""
+
+        cls._map_links = None
+        cls._map_entrances = {}
+        cls._intra_map_edges = {}
+
+    @classmethod
+    def plan_route(
+            cls,
+            start_map_id,
+            start_loc,
+            dest_map_id,
+            dest_loc,
+            transport_flag,
+        ):
+        """Returns a shortest route between tile locations on any Maps.
+
+        Args:
+            start_map_id: ID of the Map to start on.
+            start_loc: (x, y) tile location to start from.
+            dest_map_id: ID of the Map to reach.
+            dest_loc: (x, y) tile location to reach.
+            transport_flag: transportation flag (as defined in tiledata)
+                that every tile on the route must allow.
+
+        Returns:
+            List of legs as described in the class docstring, or None if
+            there is no route.
+        """
+
+        if cls._map_links is None:
+            cls.build_world_graph()
+
+        start_loc = tuple(start_loc)
+        dest_loc = tuple(dest_loc)
+        start_map = gamemap.Map.get_map(start_map_id)
+        dest_map = gamemap.Map.get_map(dest_map_id)
+
+        if (not start_map) or (not dest_map):
+            LOGGER.warn(
+                "Cannot plan route from map %s to map %s",
+                start_map_id,
+                dest_map_id,
+            )
+            return None
+
+        # Edges that only exist for this query, from the start and to the
+        # destination.
+        query_edges = {}
+
+        query_edges[START_NODE] = [
+            (exit_node, cost) for exit_node, cost in cls._get_exit_costs(
+                start_map,
+                start_loc,
+                transport_flag,
+            )
+        ]
+
+        if start_map_id == dest_map_id:
+            path = pathfinding.Pathfinder.find_path(
+                start_map,
+                start_loc,
+                dest_loc,
+                transport_flag,
+                use_jps=True,
+            )
+            if path is not None:
+                query_edges[START_NODE].append((DEST_NODE, len(path)))
+
+        for entrance_loc in cls._map_entrances.get(dest_map_id, ()):
+            path = pathfinding.Pathfinder.find_path(
+                dest_map,
+                entrance_loc,
+                dest_loc,
+                transport_flag,
+                use_jps=True,
+            )
+            if path is not None:
+                query_edges[(ENTRANCE_NODE, dest_map_id, entrance_loc)] = \
+                    [(DEST_NODE, len(path))]
+
+        node_path = cls._search_abstract_graph(query_edges, transport_flag)
+
+        if node_path is None:
+            LOGGER.debug(
+                "No route from %s on map %s to %s on map %s",
+                start_loc,
+                start_map_id,
+                dest_loc,
+                dest_map_id,
+            )
+            return None
+
+        return cls._build_route(
+            node_path,
+            start_map_id,
+            start_loc,
+            dest_loc,
+            transport_flag,
+        )
+
+    @classmethod
+    def _get_border_tiles(cls, map_obj, direction):
+        """Returns the list of tile locations along the Map's border on the
+        side of the direction."""
+
+        border_tiles = []
+
+        if direction == directions.DIR_NORTH:
+            border_tiles = [(x, 0) for x in range(map_obj.width)]
+        elif direction == directions.DIR_SOUTH:
+            border_tiles = [(x, map_obj.height - 1) for x in range(map_obj.width)]
+        elif direction == directions.DIR_WEST:
+            border_tiles = [(0, y) for y in range(map_obj.height)]
+        elif direction == directions.DIR_EAST:
+            border_tiles = [(map_obj.width - 1, y) for y in range(map_obj.height)]
+
+        return border_tiles
+
+    @classmethod
+    def _find_exit_path(cls, map_obj, start_loc, exit_node, transport_flag):
+        """Returns the Pathfinder path from start_loc to the exit node's
+        tile or border on map_obj, or None if there is no such path."""
+
+        if exit_node[0] == BORDER_EXIT_NODE:
+            return pathfinding.Pathfinder.find_path_to_nearest(
+                map_obj,
+                start_loc,
+                cls._get_border_tiles(map_obj, exit_node[2]),
+                transport_flag,
+                use_jps=True,
+            )
+
+        return pathfinding.Pathfinder.find_path(
+            map_obj,
+            start_loc,
+            exit_node[2],
+            transport_flag,
+            use_jps=True,
+        )
+
+    @classmethod
+    def _get_exit_costs(cls, map_obj, start_loc, transport_flag):
+        """Returns a list of (exit node, cost) tuples for each exit of the
+        Map that can be reached from start_loc."""
+
+        exit_costs = []
+
+        for exit_node, dest_map_id, dest_loc in cls._map_links.get(map_obj.map_id, ()):
+            path = cls._find_exit_path(map_obj, start_loc, exit_node, transport_flag)
+            if path is not None:
+                exit_costs.append((exit_node, len(path)))
+
+        return exit_costs
+
+    @classmethod
+    def _get_intra_map_edges(cls, map_id, transport_flag):
+        """Returns the dict mapping each entrance node on the Map to its
+        list of (exit node, cost) tuples, rebuilding it if the Map has
+        changed since it was cached."""
+
+        map_obj = gamemap.Map.get_map(map_id)
+        cache_key = (map_id, transport_flag)
+        cached_info = cls._intra_map_edges.get(cache_key, None)
+
+        if cached_info and (cached_info[0] == map_obj.version):
+            return cached_info[1]
+
+        edges = {}
+        for entrance_loc in cls._map_entrances.get(map_id, ()):
+            if map_obj.can_occupy(entrance_loc, transport_flag):
+                edges[(ENTRANCE_NODE, map_id, entrance_loc)] = \
+                    cls._get_exit_costs(map_obj, entrance_loc, transport_flag)
+
+        cls._intra_map_edges[cache_key] = (map_obj.version, edges)
+
+        return edges
+
+    @classmethod
+    def _get_node_edges(cls, node, query_edges, transport_flag):
+        """Returns the list of (next node, cost) tuples leaving the node."""
+
+        node_edges = list(query_edges.get(node, ()))
+
+        if node[0] == ENTRANCE_NODE:
+            node_edges.extend(
+                cls._get_intra_map_edges(node[1], transport_flag).get(node, ())
+            )
+        elif node[0] in (BORDER_EXIT_NODE, CONNECTOR_EXIT_NODE):
+            for exit_node, dest_map_id, dest_loc in cls._map_links.get(node[1], ()):
+                if exit_node == node:
+                    dest_map = gamemap.Map.get_map(dest_map_id)
+                    if dest_map.can_occupy(dest_loc, transport_flag):
+                        if node[0] == BORDER_EXIT_NODE:
+                            crossing_cost = BORDER_CROSSING_COST
+                        else:
+                            crossing_cost = CONNECTOR_CROSSING_COST
+
+                        node_edges.append(
+                            ((ENTRANCE_NODE, dest_map_id, dest_loc), crossing_cost)
+                        )
+
+        return node_edges
+
+    @classmethod
+    def _search_abstract_graph(cls, query_edges, transport_flag):
+        """Runs Dijkstra's algorithm from START_NODE to DEST_NODE over the
+        abstract graph.
+
+        Tile locations on different Maps cannot be compared, so there is
+        no distance heuristic to guide the search.
+
+        Returns the list of nodes on the cheapest route, or None if
+        DEST_NODE cannot be reached.
+        """
+
+        costs = {START_NODE: 0}
+        came_from = {START_NODE: None}
+        open_heap = [(0, 0, START_NODE)]
+        push_count = 1
+
+        while open_heap:
+            cost, order, node = heapq.heappop(open_heap)
+
+            if cost != costs[node]:
+                continue
+
+            if node == DEST_NODE:
+                node_path = []
+                while node is not None:
+                    node_path.append(node)
+                    node = came_from[node]
+                node_path.reverse()
+                return node_path
+
+            for next_node, edge_cost in cls._get_node_edges(
+                    node,
+                    query_edges,
+                    transport_flag,
+                ):
+                next_cost = cost + edge_cost
+                if next_cost < costs.get(next_node, next_cost + 1):
+                    costs[next_node] = next_cost
+                    came_from[next_node] = node
+                    # Nodes are not orderable, so break ties on cost
+                    # with the push order.
+                    heapq.heappush(open_heap, (next_cost, push_count, next_node))
+                    push_count = push_count + 1
+
+        return None
+
+    @classmethod
+    def _build_route(
+            cls,
+            node_path,
+            start_map_id,
+            start_loc,
+            dest_loc,
+            transport_flag,
+        ):
+        """Stitches the legs of a route together from the abstract nodes
+        on it."""
+
+        route = []
+        leg_map_id = start_map_id
+        leg_start_loc = start_loc
+
+        # Every leg runs from START_NODE or an entrance node to an exit
+        # node or DEST_NODE, so the nodes on the route come in pairs.
+        for leg_end_node in node_path[1::2]:
+            leg_map = gamemap.Map.get_map(leg_map_id)
+
+            if leg_end_node == DEST_NODE:
+                path = pathfinding.Pathfinder.find_path(
+                    leg_map,
+                    leg_start_loc,
+                    dest_loc,
+                    transport_flag,
+                    use_jps=True,
+                )
+                route.append((leg_map_id, leg_start_loc, path, None))
+            else:
+                path = cls._find_exit_path(
+                    leg_map,
+                    leg_start_loc,
+                    leg_end_node,
+                    transport_flag,
+                )
+
+                if leg_end_node[0] == BORDER_EXIT_NODE:
+                    route.append((leg_map_id, leg_start_loc, path, leg_end_node[2]))
+                else:
+                    route.append((leg_map_id, leg_start_loc, path, None))
+
+                for exit_node, dest_map_id, link_dest_loc in cls._map_links[leg_map_id]:
+                    if exit_node == leg_end_node:
+                        leg_map_id = dest_map_id
+                        leg_start_loc = link_dest_loc
+                        break
+
+        return route
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
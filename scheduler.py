@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""This module contains the Scheduler class for timed world events.
+
+Events are kept in a binary heap keyed on the absolute game time (see
+timekeeper.Timekeeper.get_game_time_ms) they are due at, so running the due
+events costs time in proportion to the number of events that are due, not
+the number that are pending. Events belong to the world rather than to the
+current map, so timers on maps the protagonist has left keep running.
+"""
+
+import heapq
+import logging
+import timekeeper
+
+class Scheduler(object):
+    """Runs callbacks once the game time reaches their due times.
+
+    The user should not generate Scheduler objects, as the class
+    is primarily for class methods related to scheduling events.
+
+    Events are returned from schedule and schedule_at as opaque handles,
+    which can be passed to cancel.
+    """
+
+    # Heap of [due time in ms, sequence number, callback, args] lists.
+    # Cancelled events stay in the heap with their callback set to None
+    # until they come due.
+    _event_heap = []
+
+    # Sequence number for the next event, so that events due at the same
+    # time run in the order they were scheduled.
+    _next_sequence_number = 0
+
+    # Number of events in the heap that have not been cancelled.
+    _pending_count = 0
+
+    @classmethod
+    def schedule_at(cls, due_time_ms, callback, args=()):
+        """Schedules callback(*args) to run once the game time reaches
+        due_time_ms.
+
+        Args:
+            cls: class object.
+            due_time_ms: game time in milliseconds to run the callback at.
+            callback: callable to run.
+            args: tuple of arguments to pass to the callback.
+
+        Returns:
+            Handle for the event.
+        """
+
+        event = [due_time_ms, cls._next_sequence_number, callback, args]
+        cls._next_sequence_number = cls._next_sequence_number + 1
+        cls._pending_count = cls._pending_count + 1
+
+        heapq.heappush(cls._event_heap, event)
+
+        return event
+
+    @classmethod
+    def schedule(cls, delay_ms, callback, args=()):
+        """Schedules callback(*args) to run delay_ms milliseconds of game
+        time from now.
+
+        Returns:
+            Handle for the event.
+        """
+
+        return cls.schedule_at(
+            timekeeper.Timekeeper.get_game_time_ms() + delay_ms,
+            callback,
+            args,
+        )
+
+    @classmethod
+    def cancel(cls, event):
+        """Cancels a scheduled event, if it has not run yet."""
+
+        if event and (event[2] is not None):
+            event[2] = None
+            event[3] = ()
+            cls._pending_count = cls._pending_count - 1
+
+    @classmethod
+    def get_pending_count(cls):
+        """Returns the number of events that have not run or been
+        cancelled."""
+
+        return cls._pending_count
+
+    @classmethod
+    def get_next_due_time_ms(cls):
+        """Returns the game time in milliseconds that the next event is due
+        at, or None if no events are pending."""
+
+        # Drop cancelled events from the top of the heap.
+        while cls._event_heap and (cls._event_heap[0][2] is None):
+            heapq.heappop(cls._event_heap)
+
+        if cls._event_heap:
+            return cls._event_heap[0][0]
+
+        return None
+
+    @classmethod
+    def run_due_events(cls, curr_time_ms=None):
+        """Runs every event that is due, in order of due time.
+
+        Events scheduled by the callbacks run in the same call if they are
+        already due.
+
+        Args:
+            cls: class object.
+            curr_time_ms: game time in milliseconds to run events up to.
+                Defaults to the current game time.
+
+        Returns:
+            Number of events run.
+        """
+
+        if curr_time_ms is None:
+            curr_time_ms = timekeeper.Timekeeper.get_game_time_ms()
+
+        num_run = 0
+
+        while cls._event_heap and (cls._event_heap[0][0] <= curr_time_ms):
+            due_time_ms, sequence_number, callback, args = \
+                heapq.heappop(cls._event_heap)
+
+            if callback is not None:
+                cls._pending_count = cls._pending_count - 1
+                num_run = num_run + 1
+
+                LOGGER.debug(
+                    "Running event due at %d ms at %d ms",
+                    due_time_ms,
+                    curr_time_ms,
+                )
+                callback(*args)
+
+        return num_run
+
+    @classmethod
+    def clear(cls):
+        """Drops every scheduled event."""
+
+        cls._event_heap = []
+        cls._pending_count = 0
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
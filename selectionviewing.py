@@ -11,12 +11,16 @@ and spell viewings.
 import logging
 import sys
 import pygame
+import compositor
 import display
 import fontinfo
+import imageloader
 import imagepaths
 import items
 import language
 import menuoptions
+import profiling
+import replay
 import timekeeper
 import viewing
 import viewingdata
@@ -71,9 +75,9 @@ class SelectionGridViewing(viewing.Viewing):
 
         self.enlarged_selection_background = None
         if enlarged_selection_background_path:
-            self.enlarged_selection_background = pygame.image.load(
+            self.enlarged_selection_background = imageloader.ImageLoader.load_image(
                 enlarged_selection_background_path
-            ).convert_alpha()
+            )
 
         # Calculate the various base viewing rects for the inventory.
         top_display_width = int(0.6 * self.display_rect.width)
@@ -615,6 +619,7 @@ class SelectionGridViewing(viewing.Viewing):
     # the user switch from this selection grid to a different one
     # by pressing a certain key.
     # Inherited method.
+    @profiling.profile_scope('SelectionViewing.handle_selection_area')
     def handle_selection_area(
             self,
             title_info,
@@ -723,12 +728,12 @@ class SelectionGridViewing(viewing.Viewing):
                             reference_entity=reference_entity,
                         )
 
-                    pygame.display.update()
+                    compositor.Compositor.present()
 
                 while not received_input:
                     timekeeper.Timekeeper.tick()
 
-                    for events in pygame.event.get():
+                    for events in replay.Replay.get_events():
                         if events.type == pygame.QUIT:
                             pygame.quit()
                             sys.exit(0)
@@ -845,7 +850,7 @@ class SelectionGridViewing(viewing.Viewing):
                                     reference_entity=reference_entity,
                                 )
 
-                            pygame.display.update()
+                            compositor.Compositor.present()
 
                     if new_index != curr_index:
                         changed_index = True
@@ -863,14 +868,14 @@ class SelectionGridViewing(viewing.Viewing):
                 bottom_text=bottom_text,
             )
 
-            pygame.display.update()
+            compositor.Compositor.present()
 
             received_input = False
 
             while not received_input:
                 timekeeper.Timekeeper.tick()
 
-                for events in pygame.event.get():
+                for events in replay.Replay.get_events():
                     if events.type == pygame.QUIT:
                         pygame.quit()
                         sys.exit(0)
@@ -1159,6 +1164,5 @@ class ItemSelectionGridViewing(SelectionGridViewing):
         return ret_viewing
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
@@ -424,6 +424,5 @@ def get_skill_name(skill_id, language_id):
     return ret_name
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
@@ -147,9 +147,15 @@ class Spell(viewingicon.ViewingIcon):
 
     @classmethod
     def get_spell(cls, spell_id):
-        """Returns the spell object for the given spell ID."""
+        """Returns the spell object for the given spell ID, creating it
+        first if it has not been created yet."""
 
-        return cls._spell_listing.get(spell_id, None)
+        ret_spell = cls._spell_listing.get(spell_id, None)
+
+        if (ret_spell is None) and (spell_id in magicdata.SPELL_OBJECT_DATA):
+            ret_spell = cls.spell_factory(spell_id)
+
+        return ret_spell
 
     #$$ TODO change these.
     @classmethod
@@ -231,7 +237,7 @@ class Spell(viewingicon.ViewingIcon):
         ret_object = None
 
         # Check if we already have the item made.
-        spell_from_listing = cls.get_spell(spell_id)
+        spell_from_listing = cls._spell_listing.get(spell_id, None)
 
         if spell_from_listing:
             # Return the already made item.
@@ -346,6 +352,5 @@ class Spell(viewingicon.ViewingIcon):
                 sys.exit(2)
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
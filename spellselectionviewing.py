@@ -258,6 +258,5 @@ class SpellSelectionViewing(selectionviewing.SelectionGridViewing):
         return ret_viewing
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
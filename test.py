@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+"""Tests for the adventure game modules.
+
+Run with pytest from the repository root. The tests use the SDL dummy video
+driver, and build their own Tiles from an image saved to a temporary
+directory, so they do not need the game's image files.
+"""
+
+import collections
+import os
+import random
+import struct
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+import pytest
+import gamemap
+import pathfinding
+import replay
+import tile
+import tiledata
+import timekeeper
+
+# Tile IDs for the test Tiles, kept clear of the IDs in tiledata.
+TEST_OPEN_TILE_ID = 0xFF00
+TEST_BLOCKED_TILE_ID = 0xFF01
+
+# Map ID for the test Maps, which are not added to the map listing.
+TEST_MAP_ID = 0xFF00
+
+# Transportation flag that the open test Tile allows.
+TEST_TRANSPORT = tiledata.WALKABLE_F
+
+# (x step, y step) for each step a path can take.
+STEP_OFFSETS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+@pytest.fixture(scope='module', autouse=True)
+def test_tiles(tmp_path_factory):
+    """Sets up pygame and adds an open and a blocked test Tile to the tile
+    listing for the tests in this module."""
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    image_path = str(tmp_path_factory.mktemp('images') / 'tile.png')
+    pygame.image.save(
+        pygame.Surface((tile.TILE_SIZE, tile.TILE_SIZE)),
+        image_path
+    )
+
+    tile.Tile.tile_listing[TEST_OPEN_TILE_ID] = tile.Tile(
+        TEST_OPEN_TILE_ID,
+        image_path_list=[image_path],
+        allowed_transport=TEST_TRANSPORT,
+    )
+    tile.Tile.tile_listing[TEST_BLOCKED_TILE_ID] = tile.Tile(
+        TEST_BLOCKED_TILE_ID,
+        image_path_list=[image_path],
+        allowed_transport=tiledata.NO_TRANSPORT_F,
+    )
+
+    yield
+
+    del tile.Tile.tile_listing[TEST_OPEN_TILE_ID]
+    del tile.Tile.tile_listing[TEST_BLOCKED_TILE_ID]
+    pathfinding.Pathfinder.clear_cache()
+
+def get_random_tile_grid(rng, width, height, blocked_chance):
+    """Returns a tile grid of test Tiles, each blocked with the given
+    chance."""
+
+    return [
+        [
+            TEST_BLOCKED_TILE_ID if rng.random() < blocked_chance
+            else TEST_OPEN_TILE_ID
+            for x in range(width)
+        ]
+        for y in range(height)
+    ]
+
+def build_test_map(tile_grid):
+    """Returns a Map for the tile grid, with region labels built."""
+
+    map_obj = gamemap.Map(TEST_MAP_ID, tile_grid)
+    map_obj.init_interactive_obj({})
+    map_obj.build_region_labels()
+
+    return map_obj
+
+def get_bfs_distances(map_obj, start_loc):
+    """Returns a dict mapping each tile location reachable from start_loc
+    to its distance in steps, found by breadth first search.
+
+    As with the Pathfinder, the start location does not need to be
+    passable.
+    """
+
+    distances = {start_loc: 0}
+    loc_queue = collections.deque([start_loc])
+
+    while loc_queue:
+        curr_loc = loc_queue.popleft()
+
+        for step_x, step_y in STEP_OFFSETS:
+            next_loc = (curr_loc[0] + step_x, curr_loc[1] + step_y)
+
+            if (next_loc not in distances) \
+                    and map_obj.can_occupy(next_loc, TEST_TRANSPORT):
+                distances[next_loc] = distances[curr_loc] + 1
+                loc_queue.append(next_loc)
+
+    return distances
+
+def check_path(map_obj, start_loc, dest_locs, path, expected_length):
+    """Asserts that a path found by the Pathfinder matches the BFS result.
+
+    Args:
+        map_obj: Map the path was planned on.
+        start_loc: (x, y) tile location the path starts from.
+        dest_locs: list of (x, y) tile locations that would end the path.
+        path: path returned by the Pathfinder.
+        expected_length: shortest path length found by BFS, or None if
+            no destination is reachable.
+    """
+
+    if expected_length is None:
+        assert path is None
+        return
+
+    assert path is not None
+    assert len(path) == expected_length
+
+    prev_loc = start_loc
+    for tile_loc in path:
+        assert (tile_loc[0] - prev_loc[0], tile_loc[1] - prev_loc[1]) \
+            in STEP_OFFSETS
+        assert map_obj.can_occupy(tile_loc, TEST_TRANSPORT)
+        prev_loc = tile_loc
+
+    if expected_length:
+        assert path[-1] in dest_locs
+
+@pytest.mark.parametrize('use_jps', [False, True])
+def test_find_path_matches_bfs(use_jps):
+    """A* and jump point search find shortest paths, and no path when the
+    destination is blocked or cut off."""
+
+    rng = random.Random(8)
+
+    for i in range(300):
+        width = rng.randint(1, 12)
+        height = rng.randint(1, 12)
+        map_obj = build_test_map(
+            get_random_tile_grid(rng, width, height, rng.random() * 0.5)
+        )
+
+        start_loc = (rng.randrange(width), rng.randrange(height))
+        dest_loc = (rng.randrange(width), rng.randrange(height))
+        distances = get_bfs_distances(map_obj, start_loc)
+
+        path = pathfinding.Pathfinder.find_path(
+            map_obj,
+            start_loc,
+            dest_loc,
+            TEST_TRANSPORT,
+            use_jps=use_jps,
+            use_cache=False,
+        )
+
+        check_path(
+            map_obj,
+            start_loc,
+            [dest_loc],
+            path,
+            distances.get(dest_loc, None),
+        )
+
+@pytest.mark.parametrize('use_jps', [False, True])
+def test_find_path_to_nearest_matches_bfs(use_jps):
+    """Paths to several destinations reach the closest passable one."""
+
+    rng = random.Random(80)
+
+    for i in range(300):
+        width = rng.randint(1, 12)
+        height = rng.randint(1, 12)
+        map_obj = build_test_map(
+            get_random_tile_grid(rng, width, height, rng.random() * 0.5)
+        )
+
+        start_loc = (rng.randrange(width), rng.randrange(height))
+        dest_locs = [
+            (rng.randrange(width), rng.randrange(height))
+            for j in range(rng.randint(1, 4))
+        ]
+        distances = get_bfs_distances(map_obj, start_loc)
+
+        if start_loc in dest_locs:
+            expected_length = 0
+        else:
+            dest_distances = [
+                distances[dest_loc] for dest_loc in dest_locs
+                if dest_loc in distances
+            ]
+            expected_length = min(dest_distances) if dest_distances else None
+
+        path = pathfinding.Pathfinder.find_path_to_nearest(
+            map_obj,
+            start_loc,
+            dest_locs,
+            TEST_TRANSPORT,
+            use_jps=use_jps,
+            use_cache=False,
+        )
+
+        check_path(map_obj, start_loc, dest_locs, path, expected_length)
+
+@pytest.mark.parametrize('use_jps', [False, True])
+def test_find_path_to_blocked_destination(use_jps):
+    """Blocked destinations are never reached, even when next to the
+    start."""
+
+    map_obj = build_test_map([
+        [TEST_OPEN_TILE_ID, TEST_BLOCKED_TILE_ID, TEST_OPEN_TILE_ID],
+        [TEST_OPEN_TILE_ID, TEST_OPEN_TILE_ID, TEST_OPEN_TILE_ID],
+    ])
+
+    assert pathfinding.Pathfinder.find_path(
+        map_obj,
+        (0, 0),
+        (1, 0),
+        TEST_TRANSPORT,
+        use_jps=use_jps,
+        use_cache=False,
+    ) is None
+
+    # The blocked destination is skipped for the open one.
+    path = pathfinding.Pathfinder.find_path_to_nearest(
+        map_obj,
+        (0, 0),
+        [(1, 0), (2, 0)],
+        TEST_TRANSPORT,
+        use_jps=use_jps,
+        use_cache=False,
+    )
+    assert path == [(0, 1), (1, 1), (2, 1), (2, 0)]
+
+def get_region_partition(map_obj, transport_flag):
+    """Returns the Map's regions for transport_flag as a set of frozensets
+    of tile locations, leaving out the label values themselves."""
+
+    return set(
+        frozenset(region_locs)
+        for region_locs in map_obj.get_regions(transport_flag).values()
+    )
+
+def test_update_region_labels_matches_rebuild():
+    """Labels kept up to date one Tile at a time split and merge regions
+    the same way as labelling the whole Map again."""
+
+    rng = random.Random(10)
+
+    for i in range(300):
+        width = rng.randint(1, 10)
+        height = rng.randint(1, 10)
+        tile_grid = get_random_tile_grid(rng, width, height, rng.random() * 0.6)
+        map_obj = build_test_map(tile_grid)
+
+        for j in range(30):
+            tile_loc = (rng.randrange(width), rng.randrange(height))
+
+            if tile_grid[tile_loc[1]][tile_loc[0]] == TEST_OPEN_TILE_ID:
+                new_tile_id = TEST_BLOCKED_TILE_ID
+            else:
+                new_tile_id = TEST_OPEN_TILE_ID
+
+            tile_grid[tile_loc[1]][tile_loc[0]] = new_tile_id
+            assert map_obj.set_tile(tile_loc, new_tile_id)
+
+            rebuilt_map = build_test_map(tile_grid)
+
+            for transport_flag in rebuilt_map.region_labels:
+                assert get_region_partition(map_obj, transport_flag) \
+                    == get_region_partition(rebuilt_map, transport_flag)
+
+def test_varint_round_trip():
+    """Varints decode to the value they were encoded from, and end where
+    the encoding ends."""
+
+    for value in [0, 1, 127, 128, 300, 16383, 16384, 2 ** 32, 2 ** 64 - 1]:
+        data = b'\x07' + replay.encode_varint(value) + b'\x07'
+        assert replay.decode_varint(data, 1) == (value, len(data) - 1)
+
+def run_replay_session(session, post_events):
+    """Runs a game loop that calls Replay.get_events and ticks the clock.
+
+    Args:
+        session: list with an entry for each tick, holding a list with an
+            entry for each get_events call in that tick, holding a list of
+            (event type, key, mod) tuples.
+        post_events: if True, post each call's events before the call.
+
+    Returns:
+        tuple of a dict mapping (tick index, call index) tuples to the
+        (event type, key, mod) tuples returned by get_events, and the list
+        of tick times.
+    """
+
+    returned_events = {}
+    tick_times_ms = []
+
+    for tick_index, tick_calls in enumerate(session):
+        for call_index, call_events in enumerate(tick_calls):
+            pygame.event.clear()
+
+            if post_events:
+                for event_type, key, mod in call_events:
+                    pygame.event.post(
+                        pygame.event.Event(event_type, key=key, mod=mod)
+                    )
+
+            returned_events[(tick_index, call_index)] = [
+                (event.type, event.key, event.mod)
+                for event in replay.Replay.get_events()
+                if event.type in replay.EVENT_CODES
+            ]
+
+        timekeeper.Timekeeper.tick()
+        tick_times_ms.append(timekeeper.Timekeeper.get_last_tick_time_ms())
+
+    return (returned_events, tick_times_ms)
+
+def test_replay_round_trip(tmp_path):
+    """Replaying a recording gives back the recorded events for the same
+    tick and get_events call, at the same tick times, with the same
+    random seed."""
+
+    replay_path = str(tmp_path / 'session.agrp')
+    rng = random.Random(19)
+
+    tick_lengths_ms = [rng.choice([1, 33, 127, 128, 5000]) for i in range(40)]
+    session = [
+        [
+            [
+                (
+                    rng.choice([pygame.KEYDOWN, pygame.KEYUP]),
+                    rng.choice([pygame.K_a, pygame.K_RETURN, pygame.K_UP]),
+                    rng.choice([0, pygame.KMOD_LSHIFT]),
+                )
+                for k in range(rng.randint(0, 3))
+            ]
+            for j in range(rng.randint(1, 3))
+        ]
+        for i in range(len(tick_lengths_ms))
+    ]
+
+    try:
+        timekeeper.Timekeeper.init_clock(timekeeper.CLOCK_MODE_MANUAL)
+        tick_lengths_iter = iter(tick_lengths_ms)
+        timekeeper.Timekeeper.set_manual_tick_source(
+            lambda tick_amount: next(tick_lengths_iter)
+        )
+
+        replay.Replay.start_recording(replay_path, seed=1234)
+        recorded_random = random.random()
+        recorded_events, recorded_times_ms = run_replay_session(
+            session,
+            post_events=True
+        )
+        replay.Replay.stop_recording()
+
+        timekeeper.Timekeeper.init_clock(timekeeper.CLOCK_MODE_MANUAL)
+        replay.Replay.start_replay(replay_path)
+        assert replay.Replay.is_replaying()
+        assert random.random() == recorded_random
+
+        replayed_events, replayed_times_ms = run_replay_session(
+            session,
+            post_events=False
+        )
+    finally:
+        replay.Replay.stop_recording()
+        replay.Replay.stop_replay()
+        timekeeper.Timekeeper.set_manual_tick_source(None)
+        timekeeper.Timekeeper.init_clock(timekeeper.CLOCK_MODE_REAL)
+
+    for tick_index, tick_calls in enumerate(session):
+        for call_index, call_events in enumerate(tick_calls):
+            assert recorded_events[(tick_index, call_index)] == call_events
+
+    assert replayed_events == recorded_events
+    assert replayed_times_ms == recorded_times_ms
+
+@pytest.mark.parametrize('magic, version', [
+    (b'XXXX', replay.REPLAY_FORMAT_VERSION),
+    (replay.REPLAY_MAGIC, replay.REPLAY_FORMAT_VERSION + 1),
+])
+def test_replay_rejects_bad_header(tmp_path, magic, version):
+    """Replay files with the wrong magic or format version are rejected."""
+
+    replay_path = tmp_path / 'bad.agrp'
+    replay_path.write_bytes(
+        struct.pack(replay.REPLAY_HEADER_FORMAT, magic, version, 0)
+    )
+
+    with pytest.raises(SystemExit):
+        replay.Replay.start_replay(str(replay_path))
+
+    assert not replay.Replay.is_replaying()
@@ -4,6 +4,7 @@
 import logging
 import sys
 import pygame
+import imageloader
 import imagepaths
 import tiledata
 
@@ -19,10 +20,11 @@ class Tile(object):
     Each Tile ID as defined in tiledata.py should map to a single Tile object
     that should not change.
 
-    To create Tiles at the initial game loading, call the class method
-    build_tiles. To build an individual Tile, use the class factory
-    method tile_factory.  To retrieve a Tile object by a given ID, use
-    the class method get_tile.
+    To retrieve a Tile object by a given ID, use the class method
+    get_tile, which builds the Tile the first time it is asked for. To
+    build an individual Tile, use the class factory method tile_factory,
+    and to build every configured Tile up front, call the class method
+    build_tiles.
 
     Attributes:
         tile_id: integer ID number for the Tile.
@@ -83,7 +85,7 @@ class Tile(object):
         self._image_list = []
         if image_path_list:
             for image_path in image_path_list:
-                rendered_image = pygame.image.load(image_path).convert_alpha()
+                rendered_image = imageloader.ImageLoader.load_image(image_path)
                 if rendered_image:
                     self._image_list.append(rendered_image)
                 else:
@@ -95,9 +97,9 @@ class Tile(object):
         else:
             # Use default tile image.
             image_path = imagepaths.TILE_DEFAULT_PATH
-            rendered_image = pygame.image.load(
+            rendered_image = imageloader.ImageLoader.load_image(
                 image_path
-            ).convert_alpha()
+            )
 
             if rendered_image:
                 self._image_list.append(rendered_image)
@@ -136,6 +138,12 @@ class Tile(object):
         """Returns the allowed transportation for the Tile."""
         return self._allowed_transport
 
+    @property
+    def animated(self):
+        """Returns True if the Tile cycles through an image sequence."""
+        return bool(self._individual_image_duration) \
+            and (len(self._image_list) > 1)
+
     def valid_transportation(self, transportation_flag):
         """Checks if the transportation method is allowed.
 
@@ -176,22 +184,42 @@ class Tile(object):
                 will be blitted.
         """
         if self and surface and top_left_pixel_tuple:
-            # Determine image to blit.
-            image_to_blit = None
-
-            if not self._image_sequence_duration:
-                image_to_blit = self._image_list[0]
-            elif not blit_time_ms:
-                image_to_blit = self._image_list[0]
-            else:
-                image_to_blit = self._image_list[
-                    (blit_time_ms // self._individual_image_duration) \
-                    % len(self._image_list)
-                ]
+            image_to_blit = self.get_image(blit_time_ms)
 
             if image_to_blit:
                 surface.blit(image_to_blit, top_left_pixel_tuple)
 
+    def get_image(self, blit_time_ms=None):
+        """Returns the Tile image to use at the given time.
+
+        Args:
+            self: calling object.
+            blit_time_ms: the system time in milliseconds used to determine
+                which image to use from the Tile's image sequence. If None,
+                or if the Tile doesn't have an image sequence duration,
+                the first Tile image is returned.
+
+        Returns:
+            pygame Surface for the Tile image.
+        """
+        if not self._image_sequence_duration or not blit_time_ms:
+            return self._image_list[0]
+
+        return self._image_list[
+            (blit_time_ms // self._individual_image_duration) \
+            % len(self._image_list)
+        ]
+
+    def get_next_image_change_ms(self, curr_time_ms):
+        """Returns the time in milliseconds after curr_time_ms at which
+        get_image will next return a different image, or None if the Tile
+        is not animated."""
+        if not self.animated:
+            return None
+
+        return ((curr_time_ms // self._individual_image_duration) + 1) \
+            * self._individual_image_duration
+
     @classmethod
     def tile_factory(cls, tile_id):
         """Factory method for creating Tile objects.
@@ -254,10 +282,9 @@ class Tile(object):
     def get_tile(cls, tile_id):
         """Gets the Tile corresponding to the given ID.
 
-        Gets the Tile corresponding to the given ID. Returns None if such
-        a tile does not exist.
-
-        Does not create a new Tile. Use Tile.tile_factory to create a Tile.
+        Gets the Tile corresponding to the given ID, building it with
+        Tile.tile_factory if it has not been built yet. Returns None if
+        such a tile does not exist.
 
         Args:
             cls: calling Class.
@@ -268,7 +295,12 @@ class Tile(object):
             Returns None if something went wrong.
         """
 
-        return Tile.tile_listing.get(tile_id, None)
+        ret_tile = Tile.tile_listing.get(tile_id, None)
+
+        if (ret_tile is None) and (tile_id in tiledata.TILE_DATA):
+            ret_tile = Tile.tile_factory(tile_id)
+
+        return ret_tile
 
     @classmethod
     def build_tiles(cls):
@@ -286,6 +318,5 @@ class Tile(object):
                 sys.exit(1)
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
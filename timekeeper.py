@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """This module contains methods and constants for clock ticks and timing."""
 
+import logging
+import sys
 import time
 import pygame
 
@@ -13,6 +15,28 @@ NUM_MS_SECOND = 1000
 # Number of milliseconds per clock tick.
 MS_PER_TICK = NUM_MS_SECOND // CLOCK_TICK
 
+# Number of milliseconds of game time per fixed simulation step.
+SIM_STEP_MS = MS_PER_TICK
+
+# Most simulation steps to run for a single rendered frame. Steps beyond
+# this are skipped rather than run all at once after a long stall,
+# though the game time still advances.
+MAX_SIM_STEPS_PER_FRAME = 8
+
+# Longest time in milliseconds to wait for input in tick_until when nothing
+# is due sooner. Kept short enough that waking up never leaves more than
+# MAX_SIM_STEPS_PER_FRAME simulation steps to run.
+IDLE_MAX_WAIT_MS = (MAX_SIM_STEPS_PER_FRAME - 1) * SIM_STEP_MS
+
+### CLOCK MODE CONSTANTS ###
+# Clock time follows real time.
+CLOCK_MODE_REAL = 0x1
+# Clock time follows real time multiplied by a time scale.
+CLOCK_MODE_SCALED = 0x2
+# Clock time moves by exactly one tick length per tick, or when advanced by
+# advance_time, and ticks do not wait, for deterministic headless runs.
+CLOCK_MODE_MANUAL = 0x3
+
 # Number of ticks between refreshing map.
 DEFAULT_VIEWING_REFRESH_TICK_INTERVAL = 30
 OW_REFRESH_TICK_INTERVAL = 30
@@ -34,11 +58,236 @@ class Timekeeper(object):
     # Class pygame Clock object.
     _clock = None
 
+    # Number of ticks since the clock was set up.
+    _tick_count = 0
+
+    # Callables to call after each tick, such as presenting
+    # deferred display updates.
+    _post_tick_callbacks = []
+
+    # Game time in milliseconds, which advances in whole simulation steps
+    # as the clock time passes between ticks.
+    _game_time_ms = 0
+
+    # Clock time in milliseconds that has passed but not yet been added to
+    # the game time as a whole simulation step.
+    _sim_accumulator_ms = 0
+
+    # Number of simulation steps that the game time has advanced by but
+    # that have not been consumed by consume_sim_steps.
+    _pending_sim_steps = 0
+
+    # One of the CLOCK_MODE constants.
+    _clock_mode = CLOCK_MODE_REAL
+
+    # Multiplier on real time for CLOCK_MODE_SCALED.
+    _time_scale = 1.0
+
+    # Clock time in milliseconds as of the last sync, and the real time
+    # (as given by pygame.time.get_ticks) of that sync.
+    _clock_time_ms = 0
+    _last_real_ms = 0
+
+    # Clock time in milliseconds that the game time was last updated to.
+    _last_update_time_ms = 0
+
+    # If True, the clock time outside of CLOCK_MODE_MANUAL only moves on
+    # ticks, so every read between two ticks gives the same time.
+    _frame_locked = False
+    _frame_time_ms = 0
+
+    # Callable that takes the tick amount and returns the number of
+    # milliseconds from the previous tick to this one, used in place of
+    # the tick length for ticks in CLOCK_MODE_MANUAL. None to use the tick
+    # length.
+    _manual_tick_source = None
+
     @classmethod
-    def init_clock(cls):
-        """Sets up the pygame Clock object."""
+    def init_clock(cls, clock_mode=None, time_scale=None):
+        """Sets up the pygame Clock object and resets the clock and game
+        times to 0.
+
+        Args:
+            cls: class object.
+            clock_mode: CLOCK_MODE constant to use. Defaults to keeping the
+                current mode.
+            time_scale: time scale to use for CLOCK_MODE_SCALED. Defaults
+                to keeping the current time scale.
+        """
 
         cls._clock = pygame.time.Clock()
+        cls._tick_count = 0
+        cls._game_time_ms = 0
+        cls._sim_accumulator_ms = 0
+        cls._pending_sim_steps = 0
+
+        if clock_mode is not None:
+            cls._clock_mode = clock_mode
+        if time_scale is not None:
+            cls._time_scale = time_scale
+
+        cls._clock_time_ms = 0
+        cls._last_real_ms = pygame.time.get_ticks()
+        cls._last_update_time_ms = 0
+        cls._frame_time_ms = 0
+
+    @classmethod
+    def _sync_clock(cls):
+        """Folds the real time passed since the last sync into the clock
+        time."""
+
+        real_ms = pygame.time.get_ticks()
+        cls._clock_time_ms = cls.get_time_ms(real_ms)
+        cls._last_real_ms = real_ms
+
+    @classmethod
+    def set_clock_mode(cls, clock_mode, time_scale=1.0):
+        """Changes how the clock time advances from now on.
+
+        The clock time carries on from its current value, so switching
+        modes does not make it jump.
+
+        Args:
+            cls: class object.
+            clock_mode: CLOCK_MODE constant to use.
+            time_scale: multiplier on real time for CLOCK_MODE_SCALED. For
+                example, 2.0 runs the game at double speed and 0.0 pauses
+                it.
+        """
+
+        if clock_mode not in (CLOCK_MODE_REAL, CLOCK_MODE_SCALED, CLOCK_MODE_MANUAL):
+            LOGGER.error("Invalid clock mode %s", clock_mode)
+            sys.exit(2)
+
+        cls._sync_clock()
+        cls._clock_mode = clock_mode
+        cls._time_scale = time_scale
+
+        LOGGER.debug("Set clock mode to %s with time scale %s", clock_mode, time_scale)
+
+    @classmethod
+    def get_clock_mode(cls):
+        """Returns the current CLOCK_MODE constant."""
+
+        return cls._clock_mode
+
+    @classmethod
+    def get_time_ms(cls, real_ms=None):
+        """Returns the clock time in milliseconds.
+
+        The clock time is what animations, scrolling and the game time are
+        based on, and should be used in place of pygame.time.get_ticks.
+
+        Args:
+            cls: class object.
+            real_ms: real time in milliseconds to get the clock time for.
+                Defaults to the current pygame.time.get_ticks value.
+        """
+
+        if cls._clock_mode == CLOCK_MODE_MANUAL:
+            return cls._clock_time_ms
+
+        if real_ms is None:
+            if cls._frame_locked:
+                return cls._frame_time_ms
+
+            real_ms = pygame.time.get_ticks()
+
+        elapsed_ms = real_ms - cls._last_real_ms
+
+        if cls._clock_mode == CLOCK_MODE_SCALED:
+            elapsed_ms = int(elapsed_ms * cls._time_scale)
+
+        return cls._clock_time_ms + elapsed_ms
+
+    @classmethod
+    def set_frame_locked(cls, frame_locked):
+        """Sets whether the clock time outside of CLOCK_MODE_MANUAL only
+        moves on ticks.
+
+        With the clock time locked to ticks, everything drawn or simulated
+        between two ticks sees the same time, as it would in
+        CLOCK_MODE_MANUAL, so a session can be recorded and replayed
+        exactly.
+        """
+
+        cls._frame_locked = frame_locked
+        cls._frame_time_ms = cls.get_time_ms(pygame.time.get_ticks())
+
+    @classmethod
+    def set_manual_tick_source(cls, tick_source):
+        """Sets the callable that gives the length of each tick in
+        CLOCK_MODE_MANUAL.
+
+        Args:
+            cls: class object.
+            tick_source: callable that takes the tick amount and returns
+                the number of milliseconds from the previous tick to this
+                one, such as a recorded tick length. None to advance by the
+                tick length.
+        """
+
+        cls._manual_tick_source = tick_source
+
+    @classmethod
+    def get_last_tick_time_ms(cls):
+        """Returns the clock time in milliseconds of the last tick, which
+        is what the game time was last updated to."""
+
+        return cls._last_update_time_ms
+
+    @classmethod
+    def advance_time(cls, amount_ms):
+        """Moves the clock time forward without waiting, and advances the
+        game time to match.
+
+        Intended for CLOCK_MODE_MANUAL, where this is the only way the
+        clock time moves. Advancing in SIM_STEP_MS amounts and running
+        scheduler.Scheduler.run_due_events after each call fast-forwards
+        the simulation with the same results every run.
+
+        Args:
+            cls: class object.
+            amount_ms: number of milliseconds to advance by.
+        """
+
+        if amount_ms > 0:
+            cls._clock_time_ms = cls._clock_time_ms + amount_ms
+            cls._update_game_time()
+
+    @classmethod
+    def _update_game_time(cls):
+        """Advances the game time in whole simulation steps up to the
+        current clock time."""
+
+        curr_time_ms = cls.get_time_ms()
+        elapsed_ms = max(0, curr_time_ms - cls._last_update_time_ms)
+        cls._last_update_time_ms = curr_time_ms
+
+        cls._sim_accumulator_ms = cls._sim_accumulator_ms + elapsed_ms
+        num_steps = cls._sim_accumulator_ms // SIM_STEP_MS
+        cls._sim_accumulator_ms = cls._sim_accumulator_ms - (num_steps * SIM_STEP_MS)
+        cls._game_time_ms = cls._game_time_ms + (num_steps * SIM_STEP_MS)
+        cls._pending_sim_steps = cls._pending_sim_steps + num_steps
+
+    @classmethod
+    def add_post_tick_callback(cls, callback):
+        """Registers a callable to call with no arguments after each tick.
+
+        Args:
+            cls: class object.
+            callback: callable to register. Registering the same callable
+                more than once has no further effect.
+        """
+
+        if callback not in cls._post_tick_callbacks:
+            cls._post_tick_callbacks.append(callback)
+
+    @classmethod
+    def get_tick_count(cls):
+        """Returns the number of ticks since the clock was set up."""
+
+        return cls._tick_count
 
     @classmethod
     def tick(cls, tick_amount=CLOCK_TICK):
@@ -49,7 +298,123 @@ class Timekeeper(object):
             tick_amount: integer to determine the tick length. Higher tick
                 means pausing for a shorter amount of time (time paused is
                 approximately equal to 1 second / tick_amount).
-                Defaults to 30 ticks per second.
+                Defaults to 30 ticks per second. In CLOCK_MODE_MANUAL,
+                ticks advance the clock time by the tick length (or as
+                given by the manual tick source) instead of pausing.
         """
 
-        cls._clock.tick(tick_amount)
+        if cls._clock_mode != CLOCK_MODE_MANUAL:
+            cls._clock.tick(tick_amount)
+
+            if cls._frame_locked:
+                cls._frame_time_ms = cls.get_time_ms(pygame.time.get_ticks())
+        elif cls._manual_tick_source:
+            cls._clock_time_ms = cls._last_update_time_ms \
+                + cls._manual_tick_source(tick_amount)
+        else:
+            cls._clock_time_ms = cls._clock_time_ms + (NUM_MS_SECOND // tick_amount)
+        cls._tick_count = cls._tick_count + 1
+
+        cls._update_game_time()
+
+        for callback in cls._post_tick_callbacks:
+            callback()
+
+    @classmethod
+    def tick_until(cls, next_change_ms=None, tick_amount=CLOCK_TICK):
+        """Ticks, waiting until input arrives or next_change_ms comes
+        rather than for a fixed tick length.
+
+        Used when nothing visible will change before next_change_ms
+        without input, so that idle loops do not wake up every tick. The
+        wait is at least one tick length and at most IDLE_MAX_WAIT_MS.
+        Input that ends the wait is left on the pygame event queue, in the
+        order it arrived. In CLOCK_MODE_MANUAL this is the same as tick.
+
+        Callers must present any pending dirty regions first (see
+        compositor.Compositor.present), since nothing is presented until
+        the wait ends.
+
+        Args:
+            cls: class object.
+            next_change_ms: clock time in milliseconds (see get_time_ms)
+                of the next change to wake up for, or None if nothing is
+                due.
+            tick_amount: ticks per second to use for the shortest wait.
+        """
+
+        if (cls._clock_mode != CLOCK_MODE_MANUAL) \
+                and (not pygame.event.peek()):
+            wait_ms = IDLE_MAX_WAIT_MS
+
+            if next_change_ms is not None:
+                wait_ms = next_change_ms - cls.get_time_ms()
+
+                if (cls._clock_mode == CLOCK_MODE_SCALED) \
+                        and (cls._time_scale > 0):
+                    wait_ms = int(wait_ms / cls._time_scale)
+
+                wait_ms = min(wait_ms, IDLE_MAX_WAIT_MS)
+
+            # Shorter waits are left to the tick itself.
+            if wait_ms > (NUM_MS_SECOND // tick_amount):
+                event = pygame.event.wait(wait_ms)
+
+                if event.type != pygame.NOEVENT:
+                    # Post the waking event back ahead of any that arrived
+                    # since, so that a key press stays ahead of its release.
+                    for queued_event in [event] + pygame.event.get():
+                        pygame.event.post(queued_event)
+
+        cls.tick(tick_amount)
+
+    @classmethod
+    def get_clock_time_for_sim_steps(cls, num_steps):
+        """Returns the clock time in milliseconds at which the game time
+        will have advanced by num_steps more simulation steps."""
+
+        return cls._last_update_time_ms \
+            + max(0, (num_steps * SIM_STEP_MS) - cls._sim_accumulator_ms)
+
+    @classmethod
+    def get_clock_time_for_game_time(cls, game_time_ms):
+        """Returns the clock time in milliseconds at which the game time
+        will reach game_time_ms."""
+
+        num_steps = -((cls._game_time_ms - game_time_ms) // SIM_STEP_MS)
+
+        return cls.get_clock_time_for_sim_steps(num_steps)
+
+    @classmethod
+    def get_game_time_ms(cls):
+        """Returns the game time in milliseconds.
+
+        The game time follows the clock time (see get_time_ms) in whole
+        SIM_STEP_MS steps, so
+        timers based on it run at the same rate however fast frames
+        are rendered.
+        """
+
+        return cls._game_time_ms
+
+    @classmethod
+    def consume_sim_steps(cls, max_steps=MAX_SIM_STEPS_PER_FRAME):
+        """Returns the number of simulation steps to run for this frame.
+
+        Steps are counted as the game time advances, and each step is
+        returned once. If more than max_steps are due, the extra steps are
+        dropped so that a long stall does not lead to a burst of updates.
+
+        Args:
+            cls: class object.
+            max_steps: most steps to return.
+        """
+
+        num_steps = min(cls._pending_sim_steps, max_steps)
+        cls._pending_sim_steps = 0
+
+        return num_steps
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""This module contains the TraceLog class for low-overhead trace logging.
+
+Hot gameplay code records typed trace events through TraceLog.record
+instead of formatting log messages. An event is an event ID number and a
+tuple of arguments, kept as is in a fixed-size ring buffer along with the
+time and clock tick it was recorded at. Nothing is formatted until the
+buffer is dumped, and an event whose category is turned off costs a single
+set lookup.
+
+The buffer is dumped to a text file in TRACE_OUTPUT_DIR when the game
+crashes (see install_crash_dump) or when F5 is pressed in the overworld.
+Pick the categories to record with the --trace command line flag of
+adventure.py.
+"""
+
+import logging
+import os
+import sys
+import time
+import traceback
+import timekeeper
+
+# Number of events kept in the ring buffer. Must be a power of 2.
+TRACE_BUFFER_SIZE = 4096
+
+# Directory that trace dumps are written to.
+TRACE_OUTPUT_DIR = 'traces'
+
+### TRACE CATEGORY FLAGS ###
+CATEGORY_OBJECTS = 0x1
+CATEGORY_COLLISION = 0x2
+CATEGORY_INVENTORY = 0x4
+CATEGORY_TEXT = 0x8
+CATEGORY_INPUT = 0x10
+
+CATEGORY_NONE = 0x0
+CATEGORY_ALL = CATEGORY_OBJECTS | CATEGORY_COLLISION | CATEGORY_INVENTORY \
+    | CATEGORY_TEXT | CATEGORY_INPUT
+
+# Categories recorded unless set otherwise. Collision sets and text lines
+# are built often enough that they are left off.
+DEFAULT_TRACE_CATEGORIES = CATEGORY_OBJECTS | CATEGORY_INVENTORY \
+    | CATEGORY_INPUT
+
+CATEGORY_NAMES = {
+    CATEGORY_OBJECTS: 'objects',
+    CATEGORY_COLLISION: 'collision',
+    CATEGORY_INVENTORY: 'inventory',
+    CATEGORY_TEXT: 'text',
+    CATEGORY_INPUT: 'input',
+}
+
+### TRACE EVENT ID NUMBERS ###
+EVENT_OBJECT_MADE = 0x101
+EVENT_OBJECT_LISTED = 0x102
+EVENT_COLLISION_SET = 0x201
+EVENT_ITEM_ADDED = 0x401
+EVENT_ITEM_REMOVED = 0x402
+EVENT_TEXT_LINES = 0x801
+EVENT_KEY_DOWN = 0x1001
+
+# Maps event ID numbers to tuples of the event's category and the format
+# string used for its arguments in dumps.
+TRACE_EVENT_DATA = {
+    EVENT_OBJECT_MADE: (
+        CATEGORY_OBJECTS,
+        "Made object with ID {0}",
+    ),
+    EVENT_OBJECT_LISTED: (
+        CATEGORY_OBJECTS,
+        "Added object ID {0} to inter obj listing",
+    ),
+    EVENT_COLLISION_SET: (
+        CATEGORY_COLLISION,
+        "Collision set of {1} tiles for bottom left tile {0}",
+    ),
+    EVENT_ITEM_ADDED: (
+        CATEGORY_INVENTORY,
+        "Added item ID {0} x{1}",
+    ),
+    EVENT_ITEM_REMOVED: (
+        CATEGORY_INVENTORY,
+        "Removed item ID {0} x{1}, quantity now {2}",
+    ),
+    EVENT_TEXT_LINES: (
+        CATEGORY_TEXT,
+        "Split {0!r} into {1} lines of up to {2} characters",
+    ),
+    EVENT_KEY_DOWN: (
+        CATEGORY_INPUT,
+        "Key {0} pressed down",
+    ),
+}
+
+def get_category_event_ids(categories):
+    """Returns a frozenset of the event ID numbers in the categories given
+    by the categories flags."""
+
+    return frozenset(
+        event_id for event_id, event_data in TRACE_EVENT_DATA.items()
+        if event_data[0] & categories
+    )
+
+def parse_categories(category_text):
+    """Returns the category flags for a comma-separated list of category
+    names, or 'all' or 'none'.
+
+    Raises:
+        ValueError if a name is not a category name.
+    """
+
+    categories = CATEGORY_NONE
+    name_flags = dict(
+        (name, category) for category, name in CATEGORY_NAMES.items()
+    )
+
+    for name in category_text.split(','):
+        name = name.strip().lower()
+
+        if name == 'all':
+            categories = categories | CATEGORY_ALL
+        elif name in name_flags:
+            categories = categories | name_flags[name]
+        elif name and (name != 'none'):
+            raise ValueError("Unknown trace category {0}".format(name))
+
+    return categories
+
+class TraceLog(object):
+    """Records trace events to a ring buffer and dumps them.
+
+    The user should not generate TraceLog objects, as the class
+    is primarily for class methods related to trace logging.
+    """
+
+    # Category flags being recorded, and the IDs of their events.
+    enabled_categories = DEFAULT_TRACE_CATEGORIES
+    _enabled_event_ids = get_category_event_ids(DEFAULT_TRACE_CATEGORIES)
+
+    # Ring buffer of (perf_counter time, tick count, event ID, args) tuples,
+    # the index to write the next event to, and the number of events
+    # recorded since the buffer was last cleared.
+    _buffer = [None] * TRACE_BUFFER_SIZE
+    _next_index = 0
+    _num_recorded = 0
+
+    # sys.excepthook before install_crash_dump replaced it.
+    _prev_excepthook = None
+
+    @classmethod
+    def set_categories(cls, categories):
+        """Sets which categories are recorded.
+
+        Args:
+            cls: class object.
+            categories: category flags to record.
+        """
+
+        cls.enabled_categories = categories
+        cls._enabled_event_ids = get_category_event_ids(categories)
+
+        LOGGER.info(
+            "Tracing categories: %s",
+            ", ".join(
+                name for category, name in sorted(CATEGORY_NAMES.items())
+                if category & categories
+            ) or "none",
+        )
+
+    @classmethod
+    def is_enabled(cls, categories):
+        """Returns True if any of the categories are being recorded."""
+
+        return bool(cls.enabled_categories & categories)
+
+    @classmethod
+    def record(cls, event_id, *args):
+        """Records a trace event, if its category is being recorded.
+
+        The arguments are kept as they are until dumped, so they should be
+        small values such as numbers, strings and tuples rather than objects
+        that may change.
+
+        Args:
+            cls: class object.
+            event_id: TRACE EVENT ID number for the event.
+            args: arguments for the event's format string.
+        """
+
+        if event_id not in cls._enabled_event_ids:
+            return
+
+        index = cls._next_index
+        cls._buffer[index] = (
+            time.perf_counter(),
+            timekeeper.Timekeeper.get_tick_count(),
+            event_id,
+            args,
+        )
+        cls._next_index = (index + 1) & (TRACE_BUFFER_SIZE - 1)
+        cls._num_recorded = cls._num_recorded + 1
+
+    @classmethod
+    def get_records(cls):
+        """Returns a list of the recorded (perf_counter time, tick count,
+        event ID, args) tuples still in the buffer, oldest first."""
+
+        if cls._num_recorded < TRACE_BUFFER_SIZE:
+            return cls._buffer[:cls._next_index]
+
+        return cls._buffer[cls._next_index:] + cls._buffer[:cls._next_index]
+
+    @classmethod
+    def clear(cls):
+        """Drops every recorded event."""
+
+        cls._buffer = [None] * TRACE_BUFFER_SIZE
+        cls._next_index = 0
+        cls._num_recorded = 0
+
+    @classmethod
+    def get_dump_lines(cls):
+        """Returns a list of strings, one for each recorded event still in
+        the buffer, oldest first."""
+
+        ret_lines = []
+        records = cls.get_records()
+
+        if records:
+            start_time = records[0][0]
+
+            for record_time, tick_count, event_id, args in records:
+                category, format_str = TRACE_EVENT_DATA[event_id]
+
+                try:
+                    event_str = format_str.format(*args)
+                except (IndexError, ValueError) as err:
+                    event_str = "{0} (bad args {1!r}: {2})".format(
+                        format_str,
+                        args,
+                        err,
+                    )
+
+                ret_lines.append(
+                    "{0:12.3f} ms  tick {1:<8} {2:<10} {3}".format(
+                        (record_time - start_time) * 1000,
+                        tick_count,
+                        CATEGORY_NAMES[category],
+                        event_str,
+                    )
+                )
+
+        return ret_lines
+
+    @classmethod
+    def dump(cls, output_path=None, header=None):
+        """Writes the recorded events to a text file.
+
+        Args:
+            cls: class object.
+            output_path: path of the file to write. Defaults to a
+                time-stamped name in TRACE_OUTPUT_DIR.
+            header: string to write above the events, if any.
+
+        Returns:
+            Path of the file written.
+        """
+
+        if output_path is None:
+            output_path = os.path.join(
+                TRACE_OUTPUT_DIR,
+                time.strftime('trace_%Y%m%d_%H%M%S.log'),
+            )
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        with open(output_path, 'w') as output_file:
+            if header:
+                output_file.write(header.rstrip('\n') + '\n\n')
+
+            output_file.write(
+                "{0} events recorded, last {1} kept\n".format(
+                    cls._num_recorded,
+                    min(cls._num_recorded, TRACE_BUFFER_SIZE),
+                )
+            )
+
+            for line in cls.get_dump_lines():
+                output_file.write(line + '\n')
+
+        LOGGER.info("Wrote trace dump to %s", output_path)
+
+        return output_path
+
+    @classmethod
+    def _handle_uncaught_exception(cls, exc_type, exc_value, exc_traceback):
+        """Dumps the recorded events along with the traceback, then hands
+        the exception to the previous sys.excepthook."""
+
+        try:
+            cls.dump(
+                header=''.join(traceback.format_exception(
+                    exc_type,
+                    exc_value,
+                    exc_traceback,
+                )),
+            )
+        except Exception:
+            LOGGER.exception("Failed to write trace dump.")
+
+        cls._prev_excepthook(exc_type, exc_value, exc_traceback)
+
+    @classmethod
+    def install_crash_dump(cls):
+        """Sets sys.excepthook so that the recorded events are dumped when
+        the game crashes."""
+
+        if cls._prev_excepthook is None:
+            cls._prev_excepthook = sys.excepthook
+            sys.excepthook = cls._handle_uncaught_exception
+
+# Set up logger.
+LOGGER = logging.getLogger(__name__)
+LOGGER.setLevel(logging.INFO)
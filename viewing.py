@@ -11,6 +11,7 @@ upon character movement.
 import logging
 import sys
 import pygame
+import compositor
 import directions
 import display
 import fontinfo
@@ -18,6 +19,8 @@ import imageids
 import imagepaths
 import language
 import menuoptions
+import perfhud
+import replay
 import tile
 import timekeeper
 import viewingdata
@@ -32,9 +35,17 @@ WALK_SINGLE_PIXEL_SCROLL_TIME_MS = int(WALK_SINGLE_TILE_SCROLL_TIME_MS / tile.TI
 RUN_SINGLE_TILE_SCROLL_TIME_MS = int(NUM_MS_SECOND * 0.25)
 RUN_SINGLE_PIXEL_SCROLL_TIME_MS = int(RUN_SINGLE_TILE_SCROLL_TIME_MS / tile.TILE_SIZE)
 
+# Frame rate to render scrolling at. The scroll speed is set by the scroll
+# times above, so slower frames scroll by more pixels at a time.
+SCROLL_FRAME_RATE = 60
+
 
 VIEWING_TILE_PADDING = 2
 
+# If True, map scrolling shifts the previously drawn map Tiles and only
+# draws the newly exposed strip, instead of redrawing the whole map.
+SCROLL_BY_COPY = True
+
 # Base Viewing class.
 class Viewing(object):
     """Base class that handles viewing-based methods and functions.
@@ -120,6 +131,17 @@ class Viewing(object):
 
         pass
 
+    def get_next_visible_change_ms(self, curr_time_ms):
+        """Returns the time in milliseconds after curr_time_ms at which
+        blit_self will next draw something different, such as the next
+        animation frame, or None if nothing will change without a refresh.
+
+        Base parent class method returns None.
+        Child classes with animations are responsible for implementation.
+        """
+
+        return None
+
     def refresh_and_blit_self(self):
         """Updates and blits self. Does not update display.
 
@@ -158,17 +180,17 @@ class Viewing(object):
                         if i % self._reblit_tick_interval:
                             self.blit_self()
                             if not no_display_update:
-                                pygame.display.update()
+                                compositor.Compositor.present()
                 if leftover_ms:
                     pygame.time.wait(leftover_ms)
 
                     self.blit_self()
                     if not no_display_update:
-                        pygame.display.update()
+                        compositor.Compositor.present(force=True)
             else:
                 pygame.time.wait(duration_ms)
         elif not no_display_update:
-            pygame.display.update()
+            compositor.Compositor.present(force=True)
 
     def display_single_text_page(
             self,
@@ -239,7 +261,7 @@ class Viewing(object):
             )
 
             if not no_display_update:
-                pygame.display.update()
+                compositor.Compositor.present()
 
             # Pause if needed.
             if advance_delay_ms:
@@ -265,7 +287,7 @@ class Viewing(object):
                             )
 
                             if not no_display_update:
-                                pygame.display.update()
+                                compositor.Compositor.present()
                 if leftover_ms:
                     pygame.time.wait(leftover_ms)
 
@@ -280,7 +302,7 @@ class Viewing(object):
                     )
 
                     if not no_display_update:
-                        pygame.display.update()
+                        compositor.Compositor.present(force=True)
 
             if not auto_advance:
                 # Refresh and reblit self.
@@ -298,32 +320,47 @@ class Viewing(object):
                 )
 
                 if not no_display_update:
-                    pygame.display.update()
+                    compositor.Compositor.present()
 
                 # Clear event queue to prevent premature advancement.
                 pygame.event.clear()
 
-                # Wait for user to advance.
+                # Wait for user to advance. Only reblit when something on
+                # screen changes, and sleep until then.
                 advance = False
-                refresh_tick_counter = 0
-                reblit_tick_counter = 0
+                refresh_interval_ms = self._refresh_tick_interval \
+                                    * timekeeper.MS_PER_TICK
+                curr_time_ms = timekeeper.Timekeeper.get_time_ms()
+                next_refresh_ms = curr_time_ms + refresh_interval_ms
+                next_reblit_ms = self.get_next_visible_change_ms(curr_time_ms)
 
                 LOGGER.debug("Waiting to advance...")
 
                 while not advance:
-                    timekeeper.Timekeeper.tick()
-                    refresh_tick_counter = (refresh_tick_counter + 1) \
-                                    % self._refresh_tick_interval
-                    reblit_tick_counter = (reblit_tick_counter + 1) \
-                                    % self._reblit_tick_interval
+                    next_change_ms = next_reblit_ms
+                    if refresh_during and ((next_change_ms is None)
+                            or (next_refresh_ms < next_change_ms)):
+                        next_change_ms = next_refresh_ms
+
+                    # Show everything drawn so far before going idle.
+                    compositor.Compositor.present(force=True)
+                    timekeeper.Timekeeper.tick_until(next_change_ms)
+                    curr_time_ms = timekeeper.Timekeeper.get_time_ms()
+                    reblit = (next_reblit_ms is not None) \
+                                    and (curr_time_ms >= next_reblit_ms)
 
                     if refresh_during \
-                            and (refresh_tick_counter == 0):
+                            and (curr_time_ms >= next_refresh_ms):
                         # Refresh and reblit self and page.
                         LOGGER.debug("Refreshing while waiting.")
                         self.refresh_self()
+                        next_refresh_ms = curr_time_ms + refresh_interval_ms
+                        reblit = True
 
-                    if reblit_tick_counter == 0:
+                    if reblit:
+                        next_reblit_ms = self.get_next_visible_change_ms(
+                            curr_time_ms
+                        )
                         self.blit_self()
                         text_display.blit_page(
                             self._main_display_surface,
@@ -335,9 +372,9 @@ class Viewing(object):
                         )
 
                         if not no_display_update:
-                            pygame.display.update()
+                            compositor.Compositor.present()
 
-                    for events in pygame.event.get():
+                    for events in replay.Replay.get_events():
                         if events.type == pygame.QUIT:
                             pygame.quit()
                             sys.exit(0)
@@ -488,12 +525,12 @@ class Viewing(object):
                         )
 
                         if not no_display_update:
-                            pygame.display.update()
+                            compositor.Compositor.present()
 
             if refresh_after:
                 self.refresh_and_blit_self()
                 if not no_display_update:
-                    pygame.display.update()
+                    compositor.Compositor.present()
 
     def display_text_display_first_page(
             self,
@@ -633,7 +670,7 @@ class Viewing(object):
                 self.refresh_and_blit_self()
 
                 if not no_display_update:
-                    pygame.display.update()
+                    compositor.Compositor.present()
 
     def display_input_text_box(
             self,
@@ -738,7 +775,7 @@ class Viewing(object):
             )
 
             if not no_display_update:
-                pygame.display.update()
+                compositor.Compositor.present()
 
             while not done:
                 # Wait for user to give input.
@@ -776,9 +813,9 @@ class Viewing(object):
                             no_display_update=no_display_update,
                         )
                         if not no_display_update:
-                            pygame.display.update()
+                            compositor.Compositor.present()
 
-                    for events in pygame.event.get():
+                    for events in replay.Replay.get_events():
                         if events.type == pygame.QUIT:
                             pygame.quit()
                             sys.exit(0)
@@ -824,7 +861,7 @@ class Viewing(object):
                 )
 
                 if not no_display_update:
-                    pygame.display.update()
+                    compositor.Compositor.present()
 
         return user_input_str
 
@@ -936,7 +973,7 @@ class Viewing(object):
                     alternative_top_left=alternative_top_left,
                 )
 
-                pygame.display.update()
+                compositor.Compositor.present()
 
                 # Wait a bit before allowing user to select options.
                 if load_delay_ms:
@@ -961,7 +998,7 @@ class Viewing(object):
                                     alternative_top_left=alternative_top_left,
                                 )
 
-                                pygame.display.update()
+                                compositor.Compositor.present()
                     if leftover_ms:
                         pygame.time.wait(leftover_ms)
 
@@ -975,7 +1012,7 @@ class Viewing(object):
                             alternative_top_left=alternative_top_left,
                         )
 
-                        pygame.display.update()
+                        compositor.Compositor.present(force=True)
 
                 if refresh_during:
                     self.refresh_and_blit_self()
@@ -988,7 +1025,7 @@ class Viewing(object):
                         vertical_orientation=vertical_orientation,
                         alternative_top_left=alternative_top_left,
                     )
-                    pygame.display.update()
+                    compositor.Compositor.present()
 
                 LOGGER.debug("Waiting for user to select a menu option...")
                 selected = False
@@ -1018,9 +1055,9 @@ class Viewing(object):
                             vertical_orientation=vertical_orientation,
                             alternative_top_left=alternative_top_left,
                         )
-                        pygame.display.update()
+                        compositor.Compositor.present()
 
-                    for events in pygame.event.get():
+                    for events in replay.Replay.get_events():
                         if events.type == pygame.QUIT:
                             pygame.quit()
                             sys.exit(0)
@@ -1121,7 +1158,7 @@ class Viewing(object):
                             vertical_orientation=vertical_orientation,
                             alternative_top_left=alternative_top_left,
                         )
-                        pygame.display.update()
+                        compositor.Compositor.present()
 
                         # Delay before allowing user to go to next option.
                         if option_switch_delay_ms:
@@ -1146,7 +1183,7 @@ class Viewing(object):
                                             alternative_top_left=alternative_top_left,
                                         )
 
-                                        pygame.display.update()
+                                        compositor.Compositor.present()
                             if leftover_ms:
                                 pygame.time.wait(leftover_ms)
 
@@ -1160,7 +1197,7 @@ class Viewing(object):
                                     alternative_top_left=alternative_top_left,
                                 )
 
-                                pygame.display.update()
+                                compositor.Compositor.present(force=True)
 
                         if refresh_during:
                             self.refresh_and_blit_self()
@@ -1172,11 +1209,11 @@ class Viewing(object):
                                 vertical_orientation=vertical_orientation,
                                 alternative_top_left=alternative_top_left,
                             )
-                            pygame.display.update()
+                            compositor.Compositor.present()
 
         if refresh_after:
             self.refresh_and_blit_self()
-            pygame.display.update()
+            compositor.Compositor.present()
 
         return ret_option_id
 
@@ -1233,6 +1270,19 @@ class OverworldViewing(Viewing):
         self._top_health_display = None
         self._bottom_menu_display = None
 
+        # Animated Tile and object images from the last blit, and the
+        # health text from the last blit, used to find dirty regions.
+        self._last_sprite_images = {}
+        self._last_health_text = None
+
+        # Offscreen Surface holding the map Tiles in view, used for
+        # scrolling by copy.
+        self._map_scroll_buffer = None
+
+        # Dict holding the state of the single Tile scroll in progress,
+        # or None if the map is not scrolling.
+        self._scroll_step = None
+
     @property
     def curr_map(self):
         """Returns the current map object."""
@@ -1272,6 +1322,9 @@ class OverworldViewing(Viewing):
             if not self._top_health_display:
                 LOGGER.error("Failed to make top health display")
                 sys.exit(1)
+
+            # The health display is part of the overworld base layer.
+            self._top_health_display.is_overlay = False
         else:
             LOGGER.error("Top display font not found.")
             LOGGER.error("Must init fonts through display.Display.init_fonts.")
@@ -1428,6 +1481,7 @@ class OverworldViewing(Viewing):
         """
 
         if self._main_display_surface and self._top_health_display:
+            start_time = perfhud.PerfHud.start_timer()
             self.display_text_display_first_page(
                 self._top_health_display,
                 self._get_overworld_health_text(),
@@ -1438,6 +1492,10 @@ class OverworldViewing(Viewing):
                 refresh_after=False,
                 no_display_update=True,
             )
+            perfhud.PerfHud.stop_timer(
+                perfhud.SECTION_BLIT_HEALTH_DISPLAY,
+                start_time,
+            )
 
     # If refresh_after is True, refreshes
     # overworld and blits and updates display
@@ -1642,20 +1700,36 @@ class OverworldViewing(Viewing):
         """
 
         # Update protagonist.
+        start_time = perfhud.PerfHud.start_timer()
         self.refresh_protagonist()
+        perfhud.PerfHud.stop_timer(
+            perfhud.SECTION_REFRESH_PROTAGONIST,
+            start_time,
+        )
 
         # Update map.
+        start_time = perfhud.PerfHud.start_timer()
         self.refresh_map()
+        perfhud.PerfHud.stop_timer(perfhud.SECTION_REFRESH_MAP, start_time)
 
         # Update top display.
+        start_time = perfhud.PerfHud.start_timer()
         self.refresh_top_display()
+        perfhud.PerfHud.stop_timer(
+            perfhud.SECTION_REFRESH_TOP_DISPLAY,
+            start_time,
+        )
 
-    def blit_map(self):
-        """Blits the current map.
+    def get_map_viewing_rect(self):
+        """Returns the rect of Tile coordinates to blit for the current map.
 
-        Does not update the map or pygame display.
+        Returns:
+            (top left x, top left y, width, height) tuple of Tile
+            coordinates, or None if there is no current map.
         """
 
+        ret_rect = None
+
         if self._curr_map:
             # Set top left viewing tile to define what portions of map to blit
             top_left_viewing_tile_coord =                           \
@@ -1664,15 +1738,32 @@ class OverworldViewing(Viewing):
                 )
 
             # Get subset of tiles to blit.
-            tile_subset_rect = OverworldViewing.calculate_tile_viewing_rect(
+            ret_rect = OverworldViewing.calculate_tile_viewing_rect(
                 self._curr_map,
                 top_left_viewing_tile_coord
             )
 
+        return ret_rect
+
+    def blit_map(self, blit_time_ms=None):
+        """Blits the current map.
+
+        Does not update the map or pygame display.
+
+        Args:
+            blit_time_ms: the system time in milliseconds to use for
+                picking Tile and object images. If None, uses the
+                current time.
+        """
+
+        if self._curr_map:
+            if blit_time_ms is None:
+                blit_time_ms = timekeeper.Timekeeper.get_time_ms()
+
             self._curr_map.blit_map(
                 self._main_display_surface,
-                tile_subset_rect=tile_subset_rect,
-                blit_time_ms=pygame.time.get_ticks(),
+                tile_subset_rect=self.get_map_viewing_rect(),
+                blit_time_ms=blit_time_ms,
             )
 
     def display_overworld_side_menu(
@@ -1792,14 +1883,110 @@ class OverworldViewing(Viewing):
         Caller must update display if needed.
         """
 
+        blit_time_ms = timekeeper.Timekeeper.get_time_ms()
+
         # Blit background.
         self.blit_background()
 
         # Blit map and top display.
-        self.blit_map()
+        self.blit_map(blit_time_ms=blit_time_ms)
 
         self.blit_top_health_display()
 
+        self.mark_dirty_regions(blit_time_ms)
+
+        if perfhud.PerfHud.enabled:
+            self.blit_perf_hud()
+
+    def blit_perf_hud(self):
+        """Blits the performance overlay over the map and marks it as
+        dirty.
+
+        Does not update the pygame display.
+        Caller must update display if needed.
+        """
+
+        if self._main_display_surface:
+            compositor.Compositor.mark_dirty(
+                perfhud.PerfHud.blit_overlay(
+                    self._main_display_surface,
+                    display.Display.get_font(fontinfo.DEFAULT_FONT_ID),
+                )
+            )
+
+    def get_next_visible_change_ms(self, curr_time_ms):
+        """Returns the time in milliseconds after curr_time_ms at which
+        the next animated Tile or object on screen changes image, or the
+        performance overlay is due to update, or None if nothing on screen
+        changes over time."""
+
+        ret_time_ms = None
+
+        if self._curr_map:
+            ret_time_ms = self._curr_map.get_next_animation_change_ms(
+                curr_time_ms,
+                tile_subset_rect=self.get_map_viewing_rect(),
+            )
+
+        if perfhud.PerfHud.enabled:
+            hud_time_ms = curr_time_ms + perfhud.HUD_REFRESH_INTERVAL_MS
+
+            if (ret_time_ms is None) or (hud_time_ms < ret_time_ms):
+                ret_time_ms = hud_time_ms
+
+        return ret_time_ms
+
+    def mark_dirty_regions(self, blit_time_ms):
+        """Marks the regions that changed since the last blit as dirty.
+
+        If the map, its scroll position, or its Tiles changed, or if
+        something else drew over the whole display since the last blit,
+        the full frame is marked as dirty. Otherwise only the animated
+        Tiles and objects whose images changed, and the top health
+        display if its text changed, are marked.
+
+        Args:
+            blit_time_ms: the system time in milliseconds used for the blit.
+        """
+
+        sprite_images = {}
+        view_state = None
+        health_text = None
+
+        if self._curr_map:
+            sprite_images = self._curr_map.get_sprite_images(
+                tile_subset_rect=self.get_map_viewing_rect(),
+                blit_time_ms=blit_time_ms,
+            )
+            view_state = (
+                self._curr_map.map_id,
+                self._curr_map.top_left_position,
+                self._curr_map.version,
+            )
+
+        if self._protagonist:
+            health_text = self._get_overworld_health_text()
+
+        if compositor.Compositor.claim_base_layer(self, view_state):
+            for key in set(sprite_images).union(self._last_sprite_images):
+                old_info = self._last_sprite_images.get(key, None)
+                new_info = sprite_images.get(key, None)
+
+                if old_info != new_info:
+                    if old_info:
+                        compositor.Compositor.mark_dirty(old_info[1])
+                    if new_info:
+                        compositor.Compositor.mark_dirty(new_info[1])
+
+            if (health_text != self._last_health_text) \
+                    and self._top_health_display:
+                compositor.Compositor.mark_dirty(
+                    self._top_health_display.display_rect
+                )
+
+        self._last_sprite_images = sprite_images
+        self._last_health_text = health_text
+
     def refresh_top_display(self):
         """Refreshes top display.
 
@@ -1842,9 +2029,6 @@ class OverworldViewing(Viewing):
         self.refresh_map()
         self.blit_map()
 
-    # scroll map one Tile distance in the indicated direction.
-    # updates main display with each new viewpoint
-    # scroll_wait_time is the time (in milliseconds)
     def scroll_map_single_tile(
             self,
             scroll_direction,
@@ -1853,6 +2037,33 @@ class OverworldViewing(Viewing):
         ):
         """Scrolls the map while walking the main character.
 
+        Blocks until the scroll is done. See start_scroll_step for scrolling
+        without blocking.
+
+        Args:
+            scroll_direction: direction ID that indicates in which direction
+                the map should scroll.
+            char_move_direction: direction ID that indicates in which direction
+                the character should walk.
+            run: if True, have the character run. If False, have the character
+                walk.
+        """
+
+        if self.start_scroll_step(scroll_direction, char_move_direction, run=run):
+            while self.scroll_step_in_progress():
+                # Wait till next frame.
+                timekeeper.Timekeeper.tick(SCROLL_FRAME_RATE)
+                self.advance_scroll_step(timekeeper.Timekeeper.get_time_ms())
+
+    def start_scroll_step(
+            self,
+            scroll_direction,
+            char_move_direction,
+            run=False,
+        ):
+        """Starts scrolling the map one Tile while walking the main character.
+
+        The scroll is then drawn frame by frame with advance_scroll_step.
         Note that the character should walk in the opposite direction of the
         map scrolling, so for best results, ensure that scroll_direction
         and char_move_direction are opposite directions.
@@ -1864,6 +2075,9 @@ class OverworldViewing(Viewing):
                 the character should walk.
             run: if True, have the character run. If False, have the character
                 walk.
+
+        Returns:
+            True if the scroll started, False otherwise.
         """
 
         # Get top left viewing tile and tile subset rect to blit.
@@ -1891,13 +2105,13 @@ class OverworldViewing(Viewing):
         elif char_move_direction == directions.DIR_WEST:
             walk_sequence_id = imageids.SEQUENCE_ID_WALK_WEST
 
-        # Get wait time in between pixel movements.
-        wait_time = None
+        # Get time to scroll the whole Tile.
+        scroll_duration_ms = None
 
         if run:
-            wait_time = int(RUN_SINGLE_TILE_SCROLL_TIME_MS / tile.TILE_SIZE)
+            scroll_duration_ms = RUN_SINGLE_TILE_SCROLL_TIME_MS
         else:
-            wait_time = int(WALK_SINGLE_TILE_SCROLL_TIME_MS / tile.TILE_SIZE)
+            scroll_duration_ms = WALK_SINGLE_TILE_SCROLL_TIME_MS
 
         if walk_sequence_id:
             walk_sequence_images = self._protagonist.image_sequence_dict.get(
@@ -1906,47 +2120,208 @@ class OverworldViewing(Viewing):
             )
 
             if walk_sequence_images:
-                # Number of steps in the walk animation.
-                phase_duration = int(tile.TILE_SIZE / len(walk_sequence_images))
-
-                old_sequence_id = self._protagonist.curr_image_sequence
+                self._scroll_step = {
+                    'scroll_direction': scroll_direction,
+                    'tile_subset_rect': tile_subset_rect,
+                    'duration_ms': scroll_duration_ms,
+                    'start_time_ms': timekeeper.Timekeeper.get_time_ms(),
+                    'scrolled_pixels': 0,
+                    # Number of pixels per step in the walk animation.
+                    'phase_duration': int(
+                        tile.TILE_SIZE / len(walk_sequence_images)
+                    ),
+                    'old_sequence_id': self._protagonist.curr_image_sequence,
+                }
 
                 # Starting walk animation.
                 self._protagonist.in_adhoc_animation = True
                 self._protagonist.adhoc_animation_index = 0
                 self._protagonist.curr_image_sequence = walk_sequence_id
 
-                for i in range(tile.TILE_SIZE):
-                    # Get index for animation sequence.
-                    self._protagonist.adhoc_animation_index = \
-                        i // phase_duration
+                if SCROLL_BY_COPY:
+                    self.redraw_map_scroll_buffer()
 
-                    # Reset the surface screen to default to black for empty map
-                    # spaces.
-                    self.blit_background(fill_color=viewingdata.COLOR_BLACK)
+        return self._scroll_step is not None
 
-                    if self._protagonist:
-                        # scroll 1 pixel at a time
-                        self._curr_map.scroll(
-                            self._main_display_surface,
-                            scroll_direction,
-                            1,
-                            tile_subset_rect=tile_subset_rect
-                        )
+    def scroll_step_in_progress(self):
+        """Returns True if a scroll started by start_scroll_step has not
+        finished yet."""
 
-                        # Also blit the top view on top.
-                        self.blit_top_health_display()
+        return self._scroll_step is not None
 
-                        # Update main display
-                        pygame.display.update()
+    def advance_scroll_step(self, curr_time_ms=None):
+        """Draws the scroll in progress as of the given time.
 
-                        # Wait till next iteration
-                        pygame.time.wait(wait_time)
+        Scrolls by however many pixels the time since the scroll started
+        calls for, so the scroll speed does not depend on the frame rate,
+        and updates the main display.
 
-                # End walk animation.
-                self._protagonist.in_adhoc_animation = False
-                self._protagonist.adhoc_animation_index = 0
-                self._protagonist.curr_image_sequence = old_sequence_id
+        Args:
+            curr_time_ms: time in milliseconds, as given by
+                timekeeper.Timekeeper.get_time_ms. If None, finishes the
+                scroll at once.
+
+        Returns:
+            True if the scroll is finished (or if there was no scroll in
+            progress), False otherwise.
+        """
+
+        scroll_step = self._scroll_step
+
+        if scroll_step is None:
+            return True
+
+        if curr_time_ms is None:
+            target_pixels = tile.TILE_SIZE
+        else:
+            elapsed_ms = curr_time_ms - scroll_step['start_time_ms']
+            target_pixels = min(
+                tile.TILE_SIZE,
+                (elapsed_ms * tile.TILE_SIZE) // scroll_step['duration_ms']
+            )
+
+        scroll_distance = target_pixels - scroll_step['scrolled_pixels']
+
+        if scroll_distance > 0:
+            scroll_step['scrolled_pixels'] = target_pixels
+
+            # Get index for animation sequence.
+            self._protagonist.adhoc_animation_index = \
+                (target_pixels - 1) // scroll_step['phase_duration']
+
+            if SCROLL_BY_COPY:
+                # Only draw the newly exposed Tiles.
+                self.scroll_map_by_copy(
+                    scroll_step['scroll_direction'],
+                    scroll_distance,
+                    tile_subset_rect=scroll_step['tile_subset_rect'],
+                )
+            else:
+                # Reset the surface screen to default to black for
+                # empty map spaces.
+                self.blit_background(fill_color=viewingdata.COLOR_BLACK)
+
+                self._curr_map.scroll(
+                    self._main_display_surface,
+                    scroll_step['scroll_direction'],
+                    scroll_distance,
+                    tile_subset_rect=scroll_step['tile_subset_rect'],
+                )
+
+                # Also blit the top view on top.
+                self.blit_top_health_display()
+
+            # Update main display
+            compositor.Compositor.present(
+                force=True,
+                full_frame=True,
+            )
+
+        if scroll_step['scrolled_pixels'] < tile.TILE_SIZE:
+            return False
+
+        # End walk animation.
+        self._protagonist.in_adhoc_animation = False
+        self._protagonist.adhoc_animation_index = 0
+        self._protagonist.curr_image_sequence = scroll_step['old_sequence_id']
+        self._scroll_step = None
+
+        return True
+
+    def redraw_map_scroll_buffer(self):
+        """Redraws the current map's Tiles in view into the scroll buffer.
+
+        Creates the scroll buffer if needed.
+        """
+
+        if self._map_scroll_buffer is None:
+            self._map_scroll_buffer = pygame.Surface(
+                self._main_display_surface.get_size()
+            ).convert()
+
+        if self._curr_map:
+            self._curr_map.blit_tiles_in_area(
+                self._map_scroll_buffer,
+                self._map_scroll_buffer.get_rect(),
+                blit_time_ms=timekeeper.Timekeeper.get_time_ms(),
+            )
+
+    def scroll_map_by_copy(
+            self,
+            scroll_direction,
+            distance,
+            tile_subset_rect=None,
+        ):
+        """Scrolls the map by shifting the Tiles already in the scroll buffer.
+
+        Only the strip of Tiles that scrolls into view and the animated
+        Tiles are drawn into the scroll buffer. The buffer is then blitted onto the main display,
+        followed by the interactive objects and the top health display.
+        The scroll buffer must hold the map Tiles for the current map
+        position, as drawn by redraw_map_scroll_buffer or a previous call
+        to this method.
+
+        Does not update the pygame display.
+
+        Args:
+            scroll_direction: direction ID that indicates in which direction
+                the map should scroll.
+            distance: number of pixels to scroll.
+            tile_subset_rect: rect of Tile coordinates for the interactive
+                objects to blit. Setting to None will blit all the
+                objects in the map.
+        """
+
+        if self._curr_map and (distance > 0):
+            old_top_left = self._curr_map.top_left_position
+            new_top_left = self._curr_map.shift_top_left(
+                scroll_direction,
+                distance
+            )
+            shift_x = new_top_left[0] - old_top_left[0]
+            shift_y = new_top_left[1] - old_top_left[1]
+
+            # Shift the Tiles already drawn, and draw the exposed strip.
+            buffer_width, buffer_height = self._map_scroll_buffer.get_size()
+            blit_time_ms = timekeeper.Timekeeper.get_time_ms()
+            self._map_scroll_buffer.scroll(shift_x, shift_y)
+
+            if shift_x > 0:
+                exposed_rect = (0, 0, shift_x, buffer_height)
+            elif shift_x < 0:
+                exposed_rect = (
+                    buffer_width + shift_x, 0,
+                    -shift_x, buffer_height
+                )
+            elif shift_y > 0:
+                exposed_rect = (0, 0, buffer_width, shift_y)
+            else:
+                exposed_rect = (
+                    0, buffer_height + shift_y,
+                    buffer_width, -shift_y
+                )
+
+            self._curr_map.blit_tiles_in_area(
+                self._map_scroll_buffer,
+                exposed_rect,
+                blit_time_ms=blit_time_ms,
+            )
+
+            # The shifted animated Tiles still show the image they were
+            # drawn with, so bring them up to date.
+            self._curr_map.redraw_animated_tiles(
+                self._map_scroll_buffer,
+                blit_time_ms=blit_time_ms,
+            )
+
+            # Composite the Tiles, objects and top display.
+            self._main_display_surface.blit(self._map_scroll_buffer, (0, 0))
+            self._curr_map.blit_interactive_objects(
+                self._main_display_surface,
+                tile_subset_rect=tile_subset_rect,
+                blit_time_ms=blit_time_ms,
+            )
+            self.blit_top_health_display()
 
     def blit_background(self, fill_color=viewingdata.COLOR_BLACK):
         """Fills in the viewing background for the overworld.
@@ -2158,6 +2533,5 @@ class OverworldViewing(Viewing):
         return ret_viewing
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
@@ -4,6 +4,7 @@
 import logging
 import pygame
 import imageids
+import imageloader
 import language
 
 class ViewingIcon(pygame.sprite.Sprite):
@@ -20,11 +21,11 @@ class ViewingIcon(pygame.sprite.Sprite):
         icon_id: the ID number for this icon. Must be unique
             within the child class.
         icon: the pygame Surface object representing the icon image for
-            the ViewingIcon.
+            the ViewingIcon. Loaded on first access.
         enlarged_icon: pygame Surface object representing the enlarged icon
             image for the ViewingIcon object. Enlarged Icons are set to be
             twice as large (double the width and height) as the regular
-            icon.
+            icon. Made on first access.
         curr_image_id: the current image ID being used by the object.
             This value will change for animated objects that change
             sprites after a certain number of game ticks.
@@ -55,23 +56,16 @@ class ViewingIcon(pygame.sprite.Sprite):
         for lang_id, desc_str in description_info.items():
             self._description_info[lang_id] = desc_str
 
-        self._image_dict = {}
+        # Images are loaded on first use, since most icons are never shown
+        # in a session.
+        self._image_path_dict = {}
         if image_path_dict:
             for image_type_id, image_path in image_path_dict.items():
-                LOGGER.debug("Loading image from path %s", image_path)
-
-                # Convert alpha for transparency.
                 if image_path:
-                    self._image_dict[image_type_id] = \
-                        pygame.image.load(image_path).convert_alpha()
+                    self._image_path_dict[image_type_id] = image_path
 
+        self._image_dict = {}
         self._enlarged_icon = None
-        self._icon = self._image_dict.get(imageids.ICON_IMAGE_ID, None)
-        if self._icon:
-            self._enlarged_icon = pygame.transform.scale(
-                self._icon,
-                (self._icon.get_width() * 2, self._icon.get_height() * 2)
-            )
 
         self._curr_image_id = imageids.ICON_IMAGE_ID
 
@@ -111,6 +105,8 @@ class ViewingIcon(pygame.sprite.Sprite):
     def get_image(self, image_id):
         """Returns the ViewingIcon image for the specified image ID value.
 
+        The image is loaded the first time it is asked for.
+
         Args:
             image_id: image ID value to determine which image to bring back.
 
@@ -119,7 +115,93 @@ class ViewingIcon(pygame.sprite.Sprite):
             None if no corresponding image is found for the specified image
             ID.
         """
-        return self._image_dict.get(image_id, None)
+
+        image = self._image_dict.get(image_id, None)
+
+        if image is None:
+            image_path = self._image_path_dict.get(image_id, None)
+
+            if image_path:
+                LOGGER.debug("Loading image from path %s", image_path)
+                image = imageloader.ImageLoader.load_image(image_path)
+                self._image_dict[image_id] = image
+
+        return image
+
+    def load_images(self, include_enlarged=False):
+        """Loads any of the ViewingIcon's images that are not loaded yet.
+
+        Args:
+            include_enlarged: if True, also makes the enlarged icon.
+        """
+
+        for image_id in self._image_path_dict:
+            self.get_image(image_id)
+
+        if include_enlarged:
+            self.get_enlarged_icon()
+
+    def unload_images(self):
+        """Drops the ViewingIcon's loaded images and enlarged icon, handing
+        the images back to the image cache. They are loaded again on next
+        use."""
+
+        for image_id in self._image_dict:
+            imageloader.ImageLoader.release_image(
+                self._image_path_dict[image_id]
+            )
+
+        self._image_dict = {}
+        self._enlarged_icon = None
+
+    def get_enlarged_icon(self):
+        """Returns the enlarged icon, making it the first time it is asked
+        for, or None if there is no icon."""
+
+        if self._enlarged_icon is None:
+            icon = self.icon
+
+            if icon:
+                self._enlarged_icon = pygame.transform.scale(
+                    icon,
+                    (icon.get_width() * 2, icon.get_height() * 2)
+                )
+
+        return self._enlarged_icon
+
+    @classmethod
+    def prefetch_icons(cls, icon_objs, include_enlarged=False):
+        """Loads the images of ViewingIcons that are about to be shown, such
+        as the contents of a selection viewing that is opening, so that the
+        viewing does not stall on them while scrolling.
+
+        Args:
+            cls: class object.
+            icon_objs: iterable of ViewingIcon objects. None values are
+                skipped.
+            include_enlarged: if True, also makes the enlarged icons.
+        """
+
+        for icon_obj in icon_objs:
+            if icon_obj:
+                icon_obj.load_images(include_enlarged=include_enlarged)
+
+    @classmethod
+    def unload_icons(cls, icon_objs):
+        """Unloads the images of ViewingIcons that are no longer shown, such
+        as the contents of a selection viewing that has closed, so that they
+        do not stay resident for the rest of the session. This is the
+        reverse of prefetch_icons.
+
+        Args:
+            cls: class object.
+            icon_objs: iterable of ViewingIcon objects. None values are
+                skipped.
+        """
+
+        for icon_obj in icon_objs:
+            if icon_obj:
+                icon_obj.unload_images()
 
     @property
     def enlarged_icon(self):
@@ -128,13 +210,13 @@ class ViewingIcon(pygame.sprite.Sprite):
         Enlarged icons are twice as large as the standard icon.
         """
 
-        return self._enlarged_icon
+        return self.get_enlarged_icon()
 
     @property
     def icon(self):
         """Returns the regular icon for the object."""
 
-        return self._icon
+        return self.get_image(imageids.ICON_IMAGE_ID)
 
     @property
     def icon_id(self):
@@ -222,6 +304,5 @@ class ViewingIcon(pygame.sprite.Sprite):
         )
 
 # Set up logger.
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)